@@ -0,0 +1,163 @@
+# algorithms/__main__.py
+"""Headless command line runner: ``python -m algorithms``.
+
+    python -m algorithms closest-pair data/inputs_closest_pair/input_1.txt
+    python -m algorithms multiply --engine fft big.txt --json
+    cat points.txt | python -m algorithms closest-pair --trace steps.jsonl
+    python -m algorithms batch data/inputs_closest_pair/
+
+Streamlit and matplotlib are never imported, and NumPy only when an engine
+or input format needs it, so the pure-Python reference path starts in a few
+tens of milliseconds.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+REFERENCE = "reference"
+
+
+def _read_input(path):
+    if path in (None, "-"):
+        return sys.stdin.read()
+    with open(path) as f:
+        return f.read()
+
+
+def _jsonable(value):
+    """Step payloads as JSON: point tuples/arrays become lists."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (tuple, list)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, float) and value == float("inf"):
+        return None
+    return value
+
+
+def _step_line(step):
+    """One JSONL trace line for a step."""
+    return json.dumps({k: _jsonable(v) for k, v in step.items()}) + "\n"
+
+
+def _closest_pair(args, content, trace_file, stats):
+    from algorithms.closest_pair import closest_pair_iterative, parse_points_file_content, solve_closest_pair
+
+    start = time.perf_counter()
+    points = parse_points_file_content(content)
+    parsed = time.perf_counter()
+    if args.engine == REFERENCE and trace_file is not None:
+        steps = 0
+
+        def sink(step):
+            nonlocal steps
+            steps += 1
+            trace_file.write(_step_line(step))
+
+        pair, dist = closest_pair_iterative(points, sink, stats)
+    elif args.engine == REFERENCE:
+        (pair, dist), steps = closest_pair_iterative(points, stats=stats), None
+    else:
+        (pair, dist), steps = solve_closest_pair(points, args.engine, stats), None
+    done = time.perf_counter()
+    result = {"n": len(points), "pair": _jsonable(pair), "distance": _jsonable(dist)}
+    return result, steps, parsed - start, done - parsed
+
+
+def _multiply(args, content, trace_file, stats):
+    from algorithms.karatsuba import karatsuba, karatsuba_steps, parse_integers_file_content
+
+    start = time.perf_counter()
+    x, y = parse_integers_file_content(content)
+    parsed = time.perf_counter()
+    steps = None
+    if args.engine == REFERENCE and trace_file is not None:
+        from algorithms.trace import record_trace
+
+        trace = record_trace(karatsuba_steps(x, y))
+        trace_file.writelines(map(_step_line, trace))
+        product, steps = trace.result, len(trace)
+    elif args.engine == REFERENCE:
+        product = karatsuba(x, y, stats=stats)
+    else:
+        from algorithms.multiply import multiply
+
+        product = multiply(x, y, args.engine, stats)
+    done = time.perf_counter()
+    if stats is not None and steps is not None:
+        # The step generator has no counters; instrument a separate, untimed plain run
+        karatsuba(x, y, stats=stats)
+    return {"product": product}, steps, parsed - start, done - parsed
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m algorithms",
+                                     description="Run the divide-and-conquer algorithms without the UI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text, engines in (
+        ("closest-pair", "closest pair of points", "reference, auto, fast, exact, grid, parallel"),
+        ("multiply", "integer multiplication", "reference, auto, native, karatsuba, toom3, fft, parallel"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("input", nargs="?", help="input file (default: stdin)")
+        cmd.add_argument("--engine", default=REFERENCE, help=f"one of: {engines} (default: reference)")
+        cmd.add_argument("--trace", metavar="FILE", help="write the reference step trace as JSONL")
+        cmd.add_argument("--json", action="store_true", help="print one JSON object instead of text")
+        cmd.add_argument("--stats", metavar="FILE",
+                         help="instrument the selected engine and write its counters and phase timers as JSON")
+    batch = sub.add_parser("batch", help="solve every file of a directory (see python -m algorithms.batch)",
+                           add_help=False)
+    batch.add_argument("rest", nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        from algorithms.batch import main as batch_main
+
+        return batch_main(args.rest)
+
+    # Karatsuba inputs and products can exceed the default str conversion limit
+    sys.set_int_max_str_digits(0)
+    if args.trace and args.engine != REFERENCE:
+        print("--trace is only available with --engine reference", file=sys.stderr)
+        return 2
+
+    content = _read_input(args.input)
+    run = _closest_pair if args.command == "closest-pair" else _multiply
+    trace_file = open(args.trace, "w") if args.trace else None
+    stats = None
+    if args.stats:
+        from algorithms.instrument import Instrumentation
+
+        stats = Instrumentation()
+    try:
+        result, steps, parse_s, solve_s = run(args, content, trace_file, stats)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if trace_file:
+            trace_file.close()
+
+    if stats is not None:
+        with open(args.stats, "w") as f:
+            f.write(stats.to_json(indent=2))
+
+    timings = {"parse_s": parse_s, "solve_s": solve_s}
+    if args.json:
+        print(json.dumps({**result, "engine": args.engine, "steps": steps, **timings}))
+        return 0
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if steps is not None:
+        print(f"steps: {steps}")
+    print(f"engine: {args.engine}  parse: {parse_s * 1e3:.2f} ms  solve: {solve_s * 1e3:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
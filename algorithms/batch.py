@@ -0,0 +1,152 @@
+# algorithms/batch.py
+"""Batch entry points for running many closest pair / multiplication jobs.
+
+Jobs are spread over a process pool in chunks, so per-job overhead is one small
+IPC message rather than a process start or a module import. From the command
+line, every file of a directory is solved and results stream out as JSONL:
+
+    python -m algorithms.batch data/inputs_closest_pair/ --workers 4 -o results.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.closest_pair import load_points, solve_closest_pair
+from algorithms.karatsuba import parse_integers_file_content
+from algorithms.multiply import multiply
+
+# Below this many jobs the pool costs more than it saves
+BATCH_MIN_POOL_JOBS = 8
+
+
+def _chunksize(jobs, workers):
+    return max(1, jobs // (workers * 4))
+
+
+def _run_many(fn, jobs, workers, executor):
+    """Apply fn to every job, in order, serially or in a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or len(jobs) < BATCH_MIN_POOL_JOBS):
+        return map(fn, jobs)
+    chunksize = _chunksize(len(jobs), workers)
+    if executor is not None:
+        return executor.map(fn, jobs, chunksize=chunksize)
+
+    def results():
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            yield from pool.map(fn, jobs, chunksize=chunksize)
+    return results()
+
+
+def _init_worker():
+    # Products of large operands are reported in decimal
+    sys.set_int_max_str_digits(0)
+    # Pay for the NumPy import once per worker rather than inside the first job
+    import numpy  # noqa: F401
+
+
+def _closest_pair_job(job):
+    points, method = job
+    return solve_closest_pair(points, method)
+
+
+def _multiply_job(job):
+    x, y, method = job
+    return multiply(x, y, method)
+
+
+def closest_pair_many(point_sets, method="auto", workers=None, executor=None):
+    """Solve many point sets; returns a list of ``(pair, distance)`` in input order."""
+    jobs = [(points, method) for points in point_sets]
+    return list(_run_many(_closest_pair_job, jobs, workers, executor))
+
+
+def multiply_many(pairs, method="auto", workers=None, executor=None):
+    """Multiply many ``(x, y)`` pairs; returns the products in input order."""
+    jobs = [(x, y, method) for x, y in pairs]
+    return list(_run_many(_multiply_job, jobs, workers, executor))
+
+
+# ----------------------------- FILE JOBS -----------------------------
+
+def _detect_kind(path):
+    """'multiply' for two single-integer lines, otherwise 'closest-pair'."""
+    with open(path, 'rb') as f:
+        head = f.read(1 << 16)
+    lines = [line.split() for line in head.split(b'\n') if line.strip()]
+    if len(lines) == 2 and all(len(t) == 1 and t[0].lstrip(b'-').isdigit() for t in lines):
+        return 'multiply'
+    return 'closest-pair'
+
+
+def solve_file(path, kind='auto', method='auto'):
+    """Solve one input file; returns a JSON-serialisable result record."""
+    record = {"file": os.fspath(path), "kind": kind}
+    start = time.perf_counter()
+    try:
+        if kind == 'auto':
+            kind = record["kind"] = _detect_kind(path)
+        if kind == 'multiply':
+            with open(path) as f:
+                x, y = parse_integers_file_content(f.read())
+            product = multiply(x, y, method)
+            record.update(digits=[len(str(abs(x))), len(str(abs(y)))], product=str(product))
+        else:
+            points, skipped = load_points(path)
+            pair, dist = solve_closest_pair(points, method)
+            record.update(n=len(points), skipped=skipped, pair=pair,
+                          distance=dist if pair is not None else None)
+    except (OSError, ValueError) as e:
+        record["error"] = str(e)
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def _file_job(job):
+    return solve_file(*job)
+
+
+def iter_solve_files(paths, kind='auto', method='auto', workers=None):
+    """Yield result records for paths, in order, as workers finish them."""
+    jobs = [(p, kind, method) for p in paths]
+    return _run_many(_file_job, jobs, workers, None)
+
+
+def _input_files(target):
+    if os.path.isdir(target):
+        return sorted(os.path.join(target, name) for name in os.listdir(target)
+                      if os.path.isfile(os.path.join(target, name)))
+    return [target]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m algorithms.batch",
+                                     description="Solve every input file of a directory, streaming JSONL results.")
+    parser.add_argument("inputs", nargs="+", help="input files or directories")
+    parser.add_argument("--kind", choices=("auto", "closest-pair", "multiply"), default="auto")
+    parser.add_argument("--method", default="auto", help="engine name passed to the solver")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", help="write JSONL here instead of stdout")
+    args = parser.parse_args(argv)
+
+    _init_worker()
+    paths = [p for target in args.inputs for p in _input_files(target)]
+    out = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    try:
+        for record in iter_solve_files(paths, args.kind, args.method, args.workers):
+            failed += "error" in record
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# algorithms/cache.py
+"""Size-bounded LRU cache keyed by input content hashes, with an optional on-disk tier."""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Items of a long list or tuple sized individually by approximate_size; the rest are extrapolated
+SIZE_SAMPLE = 32
+# Errors raised when unpickling a truncated file or one written by older code
+_STALE_PICKLE_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+                        IndexError, TypeError, ValueError)
+
+
+def content_hash(*parts):
+    """SHA-256 hex digest over str/bytes parts (str is UTF-8 encoded)."""
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+
+def approximate_size(value):
+    """Rough size of a value in bytes, without pickling it.
+
+    Objects may report their size through an ``nbytes`` attribute or method
+    (NumPy arrays, traces); long lists and tuples are estimated from a sample.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if callable(nbytes):
+        nbytes = nbytes()
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, int):
+        return value.bit_length() // 8 + 28
+    if isinstance(value, dict):
+        return 64 + sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)) and value:
+        sample = value[:SIZE_SAMPLE]
+        return 56 + 8 * len(value) + sum(map(approximate_size, sample)) * len(value) // len(sample)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by entry count and/or total size.
+
+    ``sizeof`` gives the size charged for a value (default ``len``); values
+    larger than ``max_bytes`` on their own are not stored, and putting one
+    removes any older value of its key.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        # Drop the old value first, so a replacement too large to store is not shadowed by it
+        if key in self._data:
+            self.nbytes -= self._data.pop(key)[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._data[key] = (value, size)
+        self.nbytes += size
+        while ((self.max_entries is not None and len(self._data) > self.max_entries)
+               or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._data), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class DiskStore:
+    """Pickled values in one directory, evicted least recently used first beyond ``max_bytes``.
+
+    Files are named by the content hash of their key and written atomically, so
+    several processes may share a directory; recency is the file mtime.
+    Only point this at a directory nobody else writes to: values are unpickled.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.nbytes = sum(entry.stat().st_size for entry in self._entries())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Guards the counters and eviction; reads and temp-file writes run outside it
+        self._lock = threading.Lock()
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(self.SUFFIX)]
+
+    def _path(self, key):
+        return os.path.join(self.directory, content_hash(repr(key)) + self.SUFFIX)
+
+    def get_bytes(self, key):
+        """The pickled value stored under ``key``, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def get(self, key, default=None):
+        data = self.get_bytes(key)
+        if data is None:
+            return default
+        try:
+            return pickle.loads(data)
+        except _STALE_PICKLE_ERRORS:
+            self.discard(key)
+            return default
+
+    def discard(self, key):
+        """Delete the file stored under ``key``, e.g. one that no longer unpickles."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                return
+            self.nbytes -= size
+
+    def put_bytes(self, key, data):
+        """Store an already pickled value."""
+        if len(data) > self.max_bytes:
+            self.discard(key)
+            return
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            try:
+                self.nbytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp, path)
+            self.nbytes += len(data)
+            if self.nbytes > self.max_bytes:
+                self._evict()
+
+    def put(self, key, value):
+        self.put_bytes(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self.nbytes = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.nbytes <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.nbytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"bytes": self.nbytes, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class ResultCache:
+    """Thread-safe two-tier cache: an LRUCache in front of an optional DiskStore.
+
+    With a disk tier, values are charged at their pickled size, which is what
+    the disk stores; without one they are never pickled and are charged at
+    ``approximate_size``. Lookups are counted per kind (e.g. "parsed", "result",
+    "trace"). The lock only covers the memory tier and counters: disk reads,
+    unpickling and ``compute`` run outside it.
+    """
+
+    def __init__(self, max_bytes, disk=None):
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=lambda entry: entry[1])
+        self.disk = disk
+        self.kinds = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind, outcome):
+        counts = self.kinds.setdefault(kind, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _store(self, kind, full_key, value, size, outcome=None):
+        with self._lock:
+            if outcome is not None:
+                self._count(kind, outcome)
+            self.memory.put(full_key, (value, size))
+
+    def get_or_compute(self, kind, key, compute):
+        """Cached value of ``compute()`` for ``(kind, key)``; exceptions from compute are not cached.
+
+        Disk entries that fail to unpickle (truncated, or written by older code)
+        are deleted and recomputed.
+        """
+        full_key = (kind, key)
+        with self._lock:
+            entry = self.memory.get(full_key)
+            if entry is not None:
+                self._count(kind, "memory_hits")
+                return entry[0]
+
+        if self.disk is not None:
+            data = self.disk.get_bytes(full_key)
+            if data is not None:
+                try:
+                    value = pickle.loads(data)
+                except _STALE_PICKLE_ERRORS:
+                    self.disk.discard(full_key)
+                else:
+                    self._store(kind, full_key, value, len(data), "disk_hits")
+                    return value
+
+        with self._lock:
+            self._count(kind, "misses")
+        # Concurrent misses on one key may compute twice
+        value = compute()
+        if self.disk is None:
+            size = approximate_size(value)
+        else:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            size = len(data)
+            self.disk.put_bytes(full_key, data)
+        self._store(kind, full_key, value, size)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"kinds": {kind: dict(counts) for kind, counts in self.kinds.items()},
+                    "memory": self.memory.stats(),
+                    "disk": self.disk.stats() if self.disk is not None else None}
@@ -1,39 +1,233 @@
+import io
 import math
+import mmap
+import os
+import stat
+import warnings
+from time import perf_counter
 
 def parse_points_file_content(content: str):
-    points = []
-    lines = content.strip().splitlines()
+    """Parse "N then x y" or plain "x y" text into a list of (x, y) tuples."""
+    if len(content) < BULK_PARSE_MIN_CHARS:
+        # Small inputs parse faster in pure Python and need no NumPy import
+        lines = content.strip().splitlines()
+        first = lines[0].split() if lines else []
+        if len(first) == 1 and first[0].isdigit():
+            lines = lines[1:1 + int(first[0])]
+        return _parse_lines(lines)[0]
+    points, _ = load_points(io.BytesIO(content.encode()))
+    return [tuple(p) for p in points.tolist()]
+
+
+def parse_vectors_file_content(content: str):
+    """Parse rows of d whitespace-separated coordinates (optionally after an N line) into an (N, d) array."""
+    import numpy as np
+
+    lines = [line for line in content.strip().splitlines() if line.strip()]
+    first = lines[0].split() if lines else []
+    if len(first) == 1 and first[0].isdigit() and int(first[0]) == len(lines) - 1:
+        lines = lines[1:]
+    rows = [line.split() for line in lines]
+    if not rows:
+        return np.empty((0, 2))
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("Every line must have the same number of coordinates")
+    return np.array(rows, dtype=np.float64)
+
+
+# ----------------------------- BULK POINT LOADING -----------------------------
+# Text files are memory-mapped and parsed a chunk of whole lines at a time with
+# NumPy, so a large file is never held as a str or split into Python lines.
+
+LOAD_CHUNK_BYTES = 1 << 26
+BULK_PARSE_MIN_CHARS = 1 << 16
+
+_RAW_EXTENSIONS = ('.bin', '.raw', '.f64')
+_NPY_MAGIC = b'\x93NUMPY'
 
-    # Case 1: First line is N (# of points)
+
+def _source_buffer(source):
+    """Return a read-only byte buffer for a path or binary file object (mmapped when it is a regular file at offset 0)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return _source_buffer(f)
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer()
     try:
-        first = lines[0].strip().split()
-        if len(first) == 1 and first[0].isdigit():
-            N = int(first[0])
-            for line in lines[1:1+N]:
-                try:
-                    x, y = map(float, line.split())
-                    points.append((x, y))
-                except:
-                    continue
-            return points
-    except:
-        pass
-
-    # Case 2: Format is just many "x y" lines
+        fileno = source.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return source.read()
+    st = os.fstat(fileno)
+    if not stat.S_ISREG(st.st_mode) or source.tell() != 0:
+        # Pipes, sockets and partly consumed files are read from the current position
+        return source.read()
+    if st.st_size == 0:
+        return b''
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+def _source_format(source, buf):
+    """Guess the file format from the path extension or the numpy magic bytes."""
+    if isinstance(source, (str, os.PathLike)):
+        ext = os.path.splitext(os.fspath(source))[1].lower()
+        if ext == '.npy':
+            return 'npy'
+        if ext in _RAW_EXTENSIONS:
+            return 'raw'
+    return 'npy' if bytes(buf[:len(_NPY_MAGIC)]) == _NPY_MAGIC else 'text'
+
+
+def _load_binary_points(buf, fmt):
+    """Zero-copy view of .npy data or raw little-endian float64 x, y pairs."""
+    import numpy as np
+
+    offset = 0
+    dtype = np.dtype('<f8')
+    if fmt == 'npy':
+        header = io.BytesIO(bytes(buf[:4096]))
+        if np.lib.format.read_magic(header) == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+        if fortran_order or len(shape) != 2 or shape[1] != 2:
+            raise ValueError(f"Expected a C-ordered (N, 2) .npy array, got shape {shape}")
+        offset = header.tell()
+    if (len(buf) - offset) % (2 * dtype.itemsize):
+        raise ValueError("Binary point data must be a whole number of (x, y) pairs")
+    arr = np.frombuffer(buf, dtype=dtype, offset=offset).reshape(-1, 2)
+    return arr if dtype == np.float64 else arr.astype(np.float64)
+
+
+def _parse_lines(lines):
+    """Pure-Python "x y" parsing of str or bytes lines; returns (points, skipped lines)."""
+    values = []
+    skipped = 0
     for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
         try:
-            x, y = map(float, line.strip().split())
-            points.append((x, y))
-        except:
+            x, y = map(float, parts)
+        except ValueError:
+            skipped += 1
             continue
+        values.append((x, y))
+    return values, skipped
+
+
+def _parse_text_chunk(chunk):
+    """Parse whole lines of "x y" text; returns (flat float64 values, skipped lines)."""
+    import numpy as np
+
+    b = np.frombuffer(chunk, dtype=np.uint8)
+    newline = b == 10
+    sep = newline | (b == 32) | (b == 9) | (b == 13)
+    starts = ~sep
+    starts[1:] &= sep[:-1]
+    breaks = np.flatnonzero(newline)
+    line_of_token = np.searchsorted(breaks, np.flatnonzero(starts))
+    tokens = np.bincount(line_of_token, minlength=len(breaks) + 1)
+
+    bad = np.flatnonzero((tokens != 0) & (tokens != 2))
+    skipped = len(bad)
+    if skipped:
+        # Blank out malformed lines so the bulk parse only sees "x y" pairs
+        line_start = np.concatenate(([0], breaks + 1))
+        line_end = np.append(breaks, len(b))
+        marks = np.zeros(len(b) + 1, dtype=np.int64)
+        np.add.at(marks, line_start[bad], 1)
+        np.add.at(marks, line_end[bad], -1)
+        b = b.copy()
+        b[np.cumsum(marks[:-1]) > 0] = 32
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(b.tobytes(), sep=' ')
+    except (ValueError, DeprecationWarning):
+        values = None
+    if values is None or len(values) != 2 * int((tokens == 2).sum()):
+        # Fall back to line-by-line parsing for chunks NumPy cannot read in bulk
+        rows, skipped = _parse_lines(bytes(chunk).splitlines())
+        return np.array(rows, dtype=np.float64).reshape(-1), skipped
+    return values, skipped
+
+
+def _load_text_points(buf):
+    import numpy as np
+
+    if not isinstance(buf, (bytes, mmap.mmap)):
+        buf = bytes(buf)
+    size = len(buf)
+
+    # Optional header: first non-blank line holding a single integer N
+    pos = 0
+    while pos < size and buf[pos] in b' \t\r\n':
+        pos += 1
+    remaining = None
+    nl = buf.find(b'\n', pos)
+    first = buf[pos:nl if nl >= 0 else size].split()
+    if len(first) == 1 and first[0].isdigit():
+        pos = nl + 1 if nl >= 0 else size
+        remaining = int(first[0])
+
+    parts = []
+    skipped = 0
+    while pos < size and remaining != 0:
+        stop = min(pos + LOAD_CHUNK_BYTES, size)
+        if stop < size:
+            nl = buf.rfind(b'\n', pos, stop)
+            if nl < 0:
+                nl = buf.find(b'\n', stop)
+            stop = nl + 1 if nl >= 0 else size
+        chunk = buf[pos:stop]
+        if remaining is not None:
+            # Only the N lines after the header belong to the input
+            breaks = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+            if remaining <= len(breaks):
+                chunk = chunk[:breaks[remaining - 1] + 1]
+            remaining -= min(remaining, len(breaks) + (stop == size))
+        values, bad = _parse_text_chunk(chunk)
+        parts.append(values)
+        skipped += bad
+        pos = stop
+
+    if not parts:
+        return np.empty((0, 2)), skipped
+    return np.concatenate(parts).reshape(-1, 2), skipped
+
 
-    return points
+def load_points(source, fmt=None):
+    """Load points from a path or binary file object into a float64 (N, 2) array.
+
+    ``fmt`` is ``"text"`` ("N then x y" or plain "x y" lines), ``"npy"`` or
+    ``"raw"`` (little-endian float64 x, y pairs); by default it is inferred from
+    the extension or the .npy magic. Binary formats are returned as zero-copy
+    read-only views. Returns ``(points, skipped)`` where ``skipped`` counts
+    malformed text lines.
+    """
+    buf = _source_buffer(source)
+    fmt = fmt or _source_format(source, buf)
+    if fmt in ('npy', 'raw'):
+        return _load_binary_points(buf, fmt), 0
+    if fmt != 'text':
+        raise ValueError(f"Unknown point file format: {fmt!r}")
+    return _load_text_points(buf)
 
 
 # ----------------------------- DIVIDE AND CONQUER IMPLEMENTATION -----------------------------
 def closest_pair(points, visualize=False):
-    """Divide-and-conquer closest pair algorithm with visualization."""
+    """Divide-and-conquer closest pair algorithm with visualization.
+
+    This is a generator function either way: the ``(pair, distance)`` result is
+    its return value (``StopIteration.value``). Without ``visualize`` nothing is
+    yielded and that value is computed by ``closest_pair_iterative``; call it
+    directly to get the tuple without a generator.
+    """
     
+    if not visualize:
+        return closest_pair_iterative(points)
+
     if len(points) < 2:
         if visualize:
             yield {
@@ -217,3 +411,1312 @@ def closest_pair(points, visualize=False):
         }
     
     return best_pair, best_dist
+
+
+# ----------------------------- ITERATIVE IMPLEMENTATION -----------------------------
+# The same divide-and-conquer steps as ``closest_pair`` without recursion: the
+# split tree is listed level by level as (lo, hi) ranges of the x-sorted points
+# and solved deepest level first. Since the x order is fixed, a strip is a
+# contiguous range found by binary search and only that range is sorted by y;
+# no merge-sort y order is carried up the levels, so no level scans all of its
+# points. Steps go to an optional callback instead of being yielded.
+
+def closest_pair_iterative(points, sink=None, stats=None):
+    """Bottom-up closest pair over index ranges with bounded stack use.
+
+    Returns the same ``(pair, distance)`` as ``closest_pair``, ties included.
+    If ``sink`` is given it is called with the step dicts of
+    ``closest_pair(points, visualize=True)``, equal as a multiset but not in the
+    same order: subproblems are solved deepest level first, and a split step
+    arrives when its halves are combined rather than before them. Only the
+    final result step is in the same place.
+
+    ``stats`` is an optional ``instrument.Instrumentation``. Counters: points,
+    calls, base_cases, comparisons, strip_points. Maxima: depth, strip_size.
+    Phases: sort_x, split, brute_force, strip_build, strip_sort, strip_scan.
+    """
+    from bisect import bisect_left, bisect_right
+
+    n = len(points)
+    if stats is not None:
+        stats.count("points", n)
+    if n < 2:
+        if sink:
+            sink({"type": "result", "pair": None, "best": float('inf')})
+        return None, float('inf')
+
+    t = perf_counter() if stats is not None else 0.0
+    pts = sorted(points, key=lambda p: p[0])
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    if stats is not None:
+        t = stats.lap("sort_x", t)
+
+    # Subproblems of the top-down split tree, one left-to-right list per depth
+    levels = [[(0, n)]]
+    while True:
+        below = []
+        for lo, hi in levels[-1]:
+            if hi - lo > 3:
+                mid = lo + (hi - lo) // 2
+                below += [(lo, mid), (mid, hi)]
+        if not below:
+            break
+        levels.append(below)
+    if stats is not None:
+        stats.lap("split", t)
+        stats.count("calls", sum(map(len, levels)))
+        stats.observe_max("depth", len(levels) - 1)
+
+    solved = {}
+    for level in reversed(levels):
+        for lo, hi in level:
+            if hi - lo <= 3:
+                if stats is not None:
+                    t = perf_counter()
+                min_d, best = float('inf'), None
+                if sink:
+                    sink({"type": "bruteforce", "points": pts[lo:hi], "best": min_d})
+                for i in range(lo, hi):
+                    for j in range(i + 1, hi):
+                        d = math.dist(pts[i], pts[j])
+                        if sink:
+                            sink({"type": "compare", "pair": (pts[i], pts[j]), "dist": d})
+                        if d < min_d:
+                            min_d, best = d, (i, j)
+                if sink:
+                    sink({"type": "bruteforce", "points": pts[lo:hi], "best": min_d})
+                solved[lo, hi] = (min_d, best)
+                if stats is not None:
+                    stats.count("base_cases")
+                    stats.count("comparisons", (hi - lo) * (hi - lo - 1) // 2)
+                    stats.lap("brute_force", t)
+                continue
+
+            mid = lo + (hi - lo) // 2
+            mid_x = xs[mid]
+            if sink:
+                sink({"type": "split", "x": mid_x, "left": pts[lo:mid], "right": pts[mid:hi]})
+            left_d, left = solved.pop((lo, mid))
+            right_d, right = solved.pop((mid, hi))
+            min_d, best = (left_d, left) if left_d < right_d else (right_d, right)
+
+            if stats is not None:
+                t = perf_counter()
+            # Positions with abs(x - mid_x) < min_d; the bisection bounds are nudged so
+            # rounding in mid_x -/+ min_d cannot make them differ from that test
+            start = bisect_right(xs, mid_x - min_d, lo, mid)
+            while start > lo and mid_x - xs[start - 1] < min_d:
+                start -= 1
+            while start < mid and mid_x - xs[start] >= min_d:
+                start += 1
+            stop = bisect_left(xs, mid_x + min_d, mid, hi)
+            while stop < hi and xs[stop] - mid_x < min_d:
+                stop += 1
+            while stop > mid and xs[stop - 1] - mid_x >= min_d:
+                stop -= 1
+            if stats is not None:
+                t = stats.lap("strip_build", t)
+            strip = sorted(range(start, stop), key=ys.__getitem__)
+            if stats is not None:
+                t = stats.lap("strip_sort", t)
+                compared = 0
+            if sink and len(strip) > 1:
+                sink({"type": "strip", "pair": None, "x": mid_x, "strip": [pts[i] for i in strip], "best": min_d})
+            for a, i in enumerate(strip):
+                y = ys[i]
+                window = strip[a + 1:a + 8]
+                for j in window:
+                    if ys[j] - y >= min_d:
+                        # Comparisons are counted per window, outside the per-pair loop
+                        if stats is not None:
+                            compared += window.index(j)
+                        break
+                    d = math.dist(pts[i], pts[j])
+                    if sink:
+                        sink({"type": "compare", "pair": (pts[i], pts[j]), "dist": d})
+                    if d < min_d:
+                        min_d, best = d, (i, j)
+                        if sink:
+                            sink({"type": "strip", "pair": (pts[i], pts[j]), "x": mid_x,
+                                  "strip": [pts[k] for k in strip], "best": min_d})
+                else:
+                    if stats is not None:
+                        compared += len(window)
+            solved[lo, hi] = (min_d, best)
+            if stats is not None:
+                stats.count("comparisons", compared)
+                stats.count("strip_points", len(strip))
+                stats.observe_max("strip_size", len(strip))
+                stats.lap("strip_scan", t)
+
+    min_d, best = solved[0, n]
+    pair = (pts[best[0]], pts[best[1]])
+    if sink:
+        sink({"type": "result", "pair": pair, "best": min_d})
+    return pair, min_d
+
+
+# ----------------------------- COMPACT TRACE RECORDING -----------------------------
+def record_closest_pair(points, max_depth=None, min_size=0, progress=None):
+    """Run the divide-and-conquer algorithm once, recording its steps compactly.
+
+    Produces the same step sequence as ``closest_pair(points, visualize=True)``
+    as a ``ClosestPairTrace`` whose events index into one x-sorted point array.
+
+    Level of detail: subproblems deeper than ``max_depth`` (the root is depth 0)
+    or smaller than ``min_size`` points are still solved exactly but emit a
+    single ``summary`` event with their comparison count, total strip size and
+    number of recursive calls instead of individual steps.
+
+    ``progress``, if given, is called after every base case with the fraction
+    of points solved so far; an exception raised from it aborts the recording.
+    """
+    import numpy as np
+    from algorithms.trace import ClosestPairTrace
+
+    T = ClosestPairTrace
+    pts = sorted(points, key=lambda p: p[0])
+    trace = ClosestPairTrace(np.asarray(pts, dtype=np.float64).reshape(-1, 2))
+
+    if len(pts) < 2:
+        trace.add(T.RESULT, value=float('inf'))
+        trace.result = (None, float('inf'))
+        return trace
+
+    def rec(lo, hi, depth, stats):
+        """stats is None while recording, else [comparisons, strip points, calls]."""
+        n = hi - lo
+        if stats is None and ((max_depth is not None and depth > max_depth) or n < min_size):
+            stats = [0, 0, 0]
+            best, min_d = rec(lo, hi, depth, stats)
+            p, q = best if best else (-1, -1)
+            trace.add_summary(lo, hi, p, q, min_d, depth, *stats)
+            return best, min_d
+
+        record = stats is None
+        if not record:
+            stats[2] += 1
+
+        if n <= 3:
+            min_d = float('inf')
+            best = None
+            if record and n > 1:
+                trace.add(T.BRUTEFORCE, lo, hi, value=min_d)
+            for i in range(lo, hi):
+                for j in range(i + 1, hi):
+                    d = math.dist(pts[i], pts[j])
+                    if record:
+                        trace.add(T.COMPARE, p=i, q=j, value=d)
+                    else:
+                        stats[0] += 1
+                    if d < min_d:
+                        min_d = d
+                        best = (i, j)
+            if record and n > 1:
+                trace.add(T.BRUTEFORCE, lo, hi, value=min_d)
+            if progress is not None:
+                progress(hi / len(pts))
+            return best, min_d
+
+        mid = lo + n // 2
+        mid_x = pts[mid][0]
+        if record:
+            trace.add(T.SPLIT, lo, hi, x=mid_x)
+        left, left_d = rec(lo, mid, depth + 1, stats)
+        right, right_d = rec(mid, hi, depth + 1, stats)
+        best, min_d = (left, left_d) if left_d < right_d else (right, right_d)
+
+        strip = sorted((i for i in range(lo, hi) if abs(pts[i][0] - mid_x) < min_d),
+                       key=lambda i: pts[i][1])
+        if record:
+            offset = trace.add_strip(strip)
+            if len(strip) > 1:
+                trace.add(T.STRIP, offset, len(strip), x=mid_x, value=min_d)
+        else:
+            stats[1] += len(strip)
+        for a in range(len(strip)):
+            for b in range(a + 1, min(a + 8, len(strip))):
+                i, j = strip[a], strip[b]
+                if pts[j][1] - pts[i][1] >= min_d:
+                    break
+                d = math.dist(pts[i], pts[j])
+                if record:
+                    trace.add(T.COMPARE, p=i, q=j, value=d)
+                else:
+                    stats[0] += 1
+                if d < min_d:
+                    min_d = d
+                    best = (i, j)
+                    if record:
+                        trace.add(T.STRIP, offset, len(strip), i, j, x=mid_x, value=min_d)
+        return best, min_d
+
+    best, best_d = rec(0, len(pts), 0, None)
+    trace.add(T.RESULT, p=best[0], q=best[1], value=best_d)
+    trace.result = ((pts[best[0]], pts[best[1]]), best_d)
+    return trace
+
+
+# ----------------------------- FAST NUMPY IMPLEMENTATION -----------------------------
+# Non-visual engine for real workloads. Points are presorted by x (to define the
+# splits) and by y exactly once; every recursion level partitions the y-ordered
+# index array instead of re-sorting strips, so the whole run is O(n log n).
+
+FAST_LEAF_SIZE = 64
+
+_triu_cache = {}
+
+
+def _as_point_array(points):
+    """Convert points to a float64 (N, 2) NumPy array."""
+    import numpy as np
+
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 2)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array")
+    return arr
+
+
+def _triu(n):
+    """Cached upper-triangle index pairs used by the brute-force leaves."""
+    import numpy as np
+
+    if n not in _triu_cache:
+        _triu_cache[n] = np.triu_indices(n, 1)
+    return _triu_cache[n]
+
+
+def _fast_rec(sx, sy, lo, hi, by_y, stats=None):
+    """Closest pair among x-sorted positions [lo, hi); by_y lists them in y order.
+
+    Returns (i, j, squared distance) with i, j positions in the x-sorted arrays.
+    """
+    import numpy as np
+
+    n = hi - lo
+    if stats is not None:
+        stats.count("calls")
+        t = perf_counter()
+    if n <= FAST_LEAF_SIZE:
+        a, b = _triu(n)
+        px = sx[lo:hi]
+        py = sy[lo:hi]
+        d2 = (px[a] - px[b]) ** 2 + (py[a] - py[b]) ** 2
+        k = int(np.argmin(d2))
+        if stats is not None:
+            stats.count("base_cases")
+            stats.count("comparisons", len(d2))
+            stats.lap("brute_force", t)
+        return lo + int(a[k]), lo + int(b[k]), float(d2[k])
+
+    mid = lo + n // 2
+    mid_x = sx[mid]
+    in_left = by_y < mid
+    left_y, right_y = by_y[in_left], by_y[~in_left]
+    if stats is not None:
+        stats.lap("split", t)
+        stats.descend()
+    left = _fast_rec(sx, sy, lo, mid, left_y, stats)
+    right = _fast_rec(sx, sy, mid, hi, right_y, stats)
+    best = left if left[2] <= right[2] else right
+    best_i, best_j, best_d2 = best
+    if stats is not None:
+        stats.ascend()
+        t = perf_counter()
+
+    # Combine: the strip keeps y order for free because by_y is already sorted
+    delta = math.sqrt(best_d2)
+    strip = by_y[np.abs(sx[by_y] - mid_x) < delta]
+    if stats is not None:
+        t = stats.lap("strip_build", t)
+        stats.count("strip_points", len(strip))
+        stats.observe_max("strip_size", len(strip))
+    if len(strip) < 2:
+        return best
+
+    stx = sx[strip]
+    sty = sy[strip]
+    # Comparing each strip point with its next 7 neighbours, one shift at a time
+    for k in range(1, min(8, len(strip))):
+        dy = sty[k:] - sty[:-k]
+        if dy.min() >= delta:
+            break
+        d2 = (stx[k:] - stx[:-k]) ** 2 + dy ** 2
+        if stats is not None:
+            stats.count("comparisons", len(d2))
+        a = int(np.argmin(d2))
+        if d2[a] < best_d2:
+            best_i, best_j, best_d2 = int(strip[a]), int(strip[a + k]), float(d2[a])
+    if stats is not None:
+        stats.lap("strip_scan", t)
+    return best_i, best_j, best_d2
+
+
+def _closest_pair_indices(pts, stats=None):
+    """Return (i, j, squared distance) of the closest pair in an (N, 2) array, N >= 2."""
+    import numpy as np
+
+    t = perf_counter() if stats is not None else 0.0
+    order = np.argsort(pts[:, 0], kind="stable")
+    sx = pts[order, 0]
+    sy = pts[order, 1]
+    by_y = np.argsort(sy, kind="stable")
+    if stats is not None:
+        stats.lap("sort", t)
+    i, j, d2 = _fast_rec(sx, sy, 0, len(pts), by_y, stats)
+    i, j = int(order[i]), int(order[j])
+    return min(i, j), max(i, j), d2
+
+
+def closest_pair_fast(points, stats=None):
+    """Non-visual O(n log n) closest pair on an (N, 2) array.
+
+    Returns the same ``(pair, distance)`` tuple as ``closest_pair``. ``stats``
+    (an optional ``instrument.Instrumentation``) receives the counters of
+    ``closest_pair_iterative`` with leaves of up to ``FAST_LEAF_SIZE`` points
+    as base cases, and sort/split/brute_force/strip phase times.
+    """
+    pts = _as_point_array(points)
+    if stats is not None:
+        stats.count("points", len(pts))
+    if len(pts) < 2:
+        return None, float('inf')
+    i, j, d2 = _closest_pair_indices(pts, stats)
+    p, q = tuple(pts[i].tolist()), tuple(pts[j].tolist())
+    return (p, q), math.dist(p, q)
+
+
+# ----------------------------- EXACT INTEGER IMPLEMENTATION -----------------------------
+# Divide and conquer on int64 coordinates that compares squared distances only,
+# so results are exact and reproducible: among pairs at the minimum distance the
+# one with the smallest (i, j) input indices wins. Points are sorted once by a
+# 62-bit x-then-y key, which also puts identical points side by side: one O(n)
+# neighbour comparison finds them and answers distance 0 without recursing.
+
+EXACT_MAX_COORD = (1 << 30) - 1
+# Strips up to this size are scanned in plain Python, below NumPy's per-call overhead
+EXACT_SMALL_STRIP = 32
+
+
+def _as_exact_array(points):
+    """Convert integral points to an int64 (N, 2) array; squared distances of these never overflow."""
+    import numpy as np
+
+    arr = np.asarray(points)
+    if arr.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array")
+    if arr.dtype.kind == 'f' and not (np.isfinite(arr).all() and (arr == np.round(arr)).all()):
+        raise ValueError("Exact mode needs integer coordinates")
+    try:
+        out_of_range = arr.min() < -EXACT_MAX_COORD or arr.max() > EXACT_MAX_COORD
+    except TypeError:
+        raise ValueError("Exact mode needs integer coordinates") from None
+    if out_of_range:
+        raise ValueError(f"Exact mode supports coordinates up to ±{EXACT_MAX_COORD}")
+    return arr.astype(np.int64)
+
+
+def _point_keys(pts):
+    """One non-negative 62-bit key per point, ordered by x, then y."""
+    return ((pts[:, 0] + EXACT_MAX_COORD) << 31) | (pts[:, 1] + EXACT_MAX_COORD)
+
+
+def _duplicate_pair(keys, sorted_keys):
+    """Smallest index pair (i, j) of two identical points, or None.
+
+    ``sorted_keys`` are the ``_point_keys`` in sorted order, so identical points
+    are adjacent and one comparison of neighbours finds them all.
+    """
+    import numpy as np
+
+    same = sorted_keys[1:] == sorted_keys[:-1]
+    if not same.any():
+        return None
+    i = int(np.flatnonzero(np.isin(keys, sorted_keys[1:][same]))[0])
+    return i, int(np.flatnonzero(keys == keys[i])[1])
+
+
+def _exact_best(d2, a, b, order, best):
+    """Fold candidate pairs (input indices order[a[k]], order[b[k]] at squared distance d2[k]) into best = (d2, i, j)."""
+    import numpy as np
+
+    k = int(d2.argmin())
+    m = int(d2[k])
+    if m > best[0]:
+        return best
+    hit = np.flatnonzero(d2 == m)
+    if len(hit) == 1:
+        i, j = sorted((int(order[a[k]]), int(order[b[k]])))
+        return min(best, (m, i, j))
+    oa, ob = order[a[hit]], order[b[hit]]
+    lo, hi = np.minimum(oa, ob), np.maximum(oa, ob)
+    i = int(lo.min())
+    return min(best, (m, i, int(hi[lo == i].min())))
+
+
+def _exact_rec(sx, sy, order, lo, hi, by_y, stats=None):
+    """Exact closest pair among x-sorted positions [lo, hi) as (squared distance, i, j) in input indices."""
+    n = hi - lo
+    if stats is not None:
+        stats.count("calls")
+        t = perf_counter()
+    if n <= FAST_LEAF_SIZE:
+        a, b = _triu(n)
+        # In input index order the upper triangle lists pairs by (i, j), so the
+        # first minimum argmin finds is already the tie-break winner
+        idx = order[lo:hi]
+        by_index = idx.argsort()
+        px = sx[lo:hi][by_index]
+        py = sy[lo:hi][by_index]
+        d2 = (px[a] - px[b]) ** 2 + (py[a] - py[b]) ** 2
+        k = int(d2.argmin())
+        best = int(d2[k]), int(idx[by_index[a[k]]]), int(idx[by_index[b[k]]])
+        if stats is not None:
+            stats.count("base_cases")
+            stats.count("comparisons", len(d2))
+            stats.lap("brute_force", t)
+        return best
+
+    mid = lo + n // 2
+    mid_x = sx[mid]
+    in_left = by_y < mid
+    left_y, right_y = by_y[in_left], by_y[~in_left]
+    if stats is not None:
+        stats.lap("split", t)
+        stats.descend()
+    best = min(_exact_rec(sx, sy, order, lo, mid, left_y, stats),
+               _exact_rec(sx, sy, order, mid, hi, right_y, stats))
+    if stats is not None:
+        stats.ascend()
+        t = perf_counter()
+
+    # Closed strip so that pairs tying with the best are still compared
+    strip = by_y[(sx[by_y] - mid_x) ** 2 <= best[0]]
+    if len(strip) > max(EXACT_SMALL_STRIP, n // 2):
+        # Mostly shared x values: the halves are then mostly apart in y instead
+        strip = _exact_cross_band(strip, sy, mid, best[0])
+    if stats is not None:
+        t = stats.lap("strip_build", t)
+        stats.count("strip_points", len(strip))
+        stats.observe_max("strip_size", len(strip))
+    if len(strip) <= EXACT_SMALL_STRIP:
+        best, compared = _exact_small_strip(sx[strip].tolist(), sy[strip].tolist(),
+                                            (strip < mid).tolist(), order[strip].tolist(), best)
+        if stats is not None:
+            stats.count("comparisons", compared)
+            stats.lap("strip_scan", t)
+        return best
+    sty = sy[strip]
+    left = strip < mid
+    # No fixed 7-neighbour window: points are distinct here, so every window of
+    # height delta holds O(1) strip points and the shifts stop after a few rounds.
+    # Pairs on one side of the split were compared by the recursion already.
+    for k in range(1, len(strip)):
+        if ((sty[k:] - sty[:-k]) ** 2).min() > best[0]:
+            break
+        cross = left[:-k] != left[k:]
+        a, b = strip[:-k][cross], strip[k:][cross]
+        if not len(a):
+            continue
+        d2 = (sx[a] - sx[b]) ** 2 + (sy[a] - sy[b]) ** 2
+        if stats is not None:
+            stats.count("comparisons", len(d2))
+        best = _exact_best(d2, a, b, order, best)
+    if stats is not None:
+        stats.lap("strip_scan", t)
+    return best
+
+
+def _exact_cross_band(strip, sy, mid, d2):
+    """Cut a y-ordered strip to the y range where a left and a right point can be within sqrt(d2)."""
+    import numpy as np
+
+    sty = sy[strip]
+    left = strip < mid
+    left_y, right_y = sty[left], sty[~left]
+    if not len(left_y) or not len(right_y):
+        return strip[:0]
+    reach = math.isqrt(d2)
+    lo = np.searchsorted(sty, max(left_y[0], right_y[0]) - reach, side="left")
+    hi = np.searchsorted(sty, min(left_y[-1], right_y[-1]) + reach, side="right")
+    return strip[lo:hi]
+
+
+def _exact_small_strip(xs, ys, left, idx, best):
+    """Scan a short y-ordered strip in plain Python; only pairs across the split are compared.
+
+    Returns (best, comparisons) with best = (d2, i, j) in input indices.
+    """
+    d2_best, i_best, j_best = best
+    compared = 0
+    n = len(xs)
+    for u in range(n - 1):
+        xu, yu, side, iu = xs[u], ys[u], left[u], idx[u]
+        for v in range(u + 1, n):
+            dy = ys[v] - yu
+            if dy * dy > d2_best:
+                break
+            if left[v] == side:
+                continue
+            dx = xs[v] - xu
+            d2 = dx * dx + dy * dy
+            compared += 1
+            if d2 <= d2_best:
+                i, j = (iu, idx[v]) if iu < idx[v] else (idx[v], iu)
+                if (d2, i, j) < (d2_best, i_best, j_best):
+                    d2_best, i_best, j_best = d2, i, j
+    return (d2_best, i_best, j_best), compared
+
+
+def _exact_indices(pts, stats=None):
+    """Return (i, j, squared distance) of the closest pair in an int64 (N, 2) array, N >= 2."""
+    import numpy as np
+
+    t = perf_counter() if stats is not None else 0.0
+    keys = _point_keys(pts)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    if stats is not None:
+        t = stats.lap("sort", t)
+    dup = _duplicate_pair(keys, sorted_keys)
+    if stats is not None:
+        t = stats.lap("duplicates", t)
+    if dup is not None:
+        return dup[0], dup[1], 0
+    sx = pts[order, 0]
+    sy = pts[order, 1]
+    # Ties in y may come in any order: the strip scan compares every pair within range
+    by_y = np.argsort(sy)
+    if stats is not None:
+        stats.lap("sort", t)
+    d2, i, j = _exact_rec(sx, sy, order, 0, len(pts), by_y, stats)
+    return i, j, d2
+
+
+def closest_pair_exact(points, squared=False, stats=None):
+    """Exact closest pair of integer points with deterministic tie-breaking.
+
+    Coordinates must be integers (integral floats are accepted) within
+    ``EXACT_MAX_COORD``. Returns the same ``(pair, distance)`` tuple as
+    ``closest_pair``, or the exact integer squared distance when ``squared``.
+    ``stats`` is instrumented as in ``closest_pair_fast``, plus a duplicates phase.
+    About as fast as ``closest_pair_fast`` on distinct points and several times
+    faster when points repeat; slower when most pairs tie (a full lattice),
+    since every tied pair across a split is compared for the tie-break.
+    """
+    pts = _as_exact_array(points)
+    if stats is not None:
+        stats.count("points", len(pts))
+    if len(pts) < 2:
+        return None, float('inf')
+    i, j, d2 = _exact_indices(pts, stats)
+    pair = (tuple(pts[i].tolist()), tuple(pts[j].tolist()))
+    return pair, (d2 if squared else math.sqrt(d2))
+
+
+# ----------------------------- RANDOMIZED GRID IMPLEMENTATION -----------------------------
+# Rabin-style expected O(n) closest pair: the closest pair of a random sample gives
+# an upper bound delta on the answer, so hashing every point into delta-sized cells
+# guarantees the true pair sits in the same or a neighbouring cell.
+
+GRID_PAIR_CHUNK = 1 << 22
+GRID_MAX_PAIRS_PER_POINT = 32
+GRID_MIN_POINTS = 5_000
+
+# Forward neighbour offsets; (0, 0) is the cell itself
+_GRID_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def _cell_pairs_min(sx, sy, start_a, count_a, start_b, count_b, same_cell):
+    """Best pair over all point pairs between matched cells (a[k], b[k])."""
+    import numpy as np
+
+    best = (-1, -1, float('inf'))
+    totals = count_a * count_b
+    ends = np.cumsum(totals)
+    first = 0
+    while first < len(totals):
+        # Take as many cell pairs as fit in one chunk of expanded point pairs
+        base = ends[first - 1] if first else 0
+        last = max(int(np.searchsorted(ends, base + GRID_PAIR_CHUNK, side="right")), first + 1)
+        t = totals[first:last]
+        rep = np.repeat(np.arange(first, last), t)
+        local = np.arange(int(t.sum())) - np.repeat(ends[first:last] - t - base, t)
+        i = start_a[rep] + local // count_b[rep]
+        j = start_b[rep] + local % count_b[rep]
+        if same_cell:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        if len(i):
+            d2 = (sx[i] - sx[j]) ** 2 + (sy[i] - sy[j]) ** 2
+            k = int(np.argmin(d2))
+            if d2[k] < best[2]:
+                best = (int(i[k]), int(j[k]), float(d2[k]))
+        first = last
+    return best
+
+
+def _grid_indices(pts, rng, stats=None):
+    """Return (i, j, squared distance) of the closest pair, or None if the grid degenerates."""
+    import numpy as np
+
+    n = len(pts)
+    m = min(n, max(2, int(n ** (2 / 3))))
+    t = perf_counter() if stats is not None else 0.0
+    sample = rng.choice(n, size=m, replace=False) if m < n else np.arange(n)
+    si, sj, d2 = _closest_pair_indices(pts[sample])
+    if stats is not None:
+        t = stats.lap("sample", t)
+        stats.count("sample_points", m)
+    if d2 == 0.0:
+        i, j = int(sample[si]), int(sample[sj])
+        return min(i, j), max(i, j), 0.0
+
+    delta = math.sqrt(d2)
+    lo = pts.min(axis=0)
+    cells = np.floor((pts - lo) / delta).astype(np.int64)
+    ny = int(cells[:, 1].max()) + 2
+    if (int(cells[:, 0].max()) + 2) * ny >= 1 << 62:
+        return None
+    keys = cells[:, 0] * ny + cells[:, 1]
+
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    sx = pts[order, 0]
+    sy = pts[order, 1]
+    cell_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+
+    matches = []
+    total = 0
+    for dx, dy in _GRID_OFFSETS:
+        target = cell_keys + (dx * ny + dy)
+        pos = np.searchsorted(cell_keys, target)
+        pos[pos == len(cell_keys)] = 0
+        hit = np.nonzero(cell_keys[pos] == target)[0]
+        matches.append((hit, pos[hit], dx == 0 and dy == 0))
+        total += int((counts[hit] * counts[pos[hit]]).sum())
+    if stats is not None:
+        t = stats.lap("grid", t)
+        stats.count("cells", len(cell_keys))
+    if total > GRID_MAX_PAIRS_PER_POINT * n:
+        # Heavily clustered input: the grid would approach quadratic work
+        return None
+
+    best = (-1, -1, float('inf'))
+    for a, b, same_cell in matches:
+        cand = _cell_pairs_min(sx, sy, starts[a], counts[a], starts[b], counts[b], same_cell)
+        if cand[2] < best[2]:
+            best = cand
+    if stats is not None:
+        stats.lap("scan", t)
+        stats.count("comparisons", total)
+    if best[0] < 0:
+        # No pair in neighbouring cells: cell sizing broke down (e.g. rounding at huge coordinates)
+        return None
+    i, j = int(order[best[0]]), int(order[best[1]])
+    return min(i, j), max(i, j), best[2]
+
+
+def closest_pair_grid(points, seed=None, stats=None):
+    """Randomized grid closest pair in expected O(n) time.
+
+    Returns the same ``(pair, distance)`` tuple as ``closest_pair``; falls back to
+    ``closest_pair_fast`` on inputs too clustered for the grid to pay off, or
+    when rounding leaves no candidate pair in neighbouring cells.
+    ``stats`` (an optional ``instrument.Instrumentation``) counts points,
+    sample_points, cells, comparisons (point pairs between neighbouring cells)
+    and fallbacks, and times the sample, grid and scan phases; a fallback adds
+    the counters of ``closest_pair_fast``.
+    """
+    import numpy as np
+
+    pts = _as_point_array(points)
+    if stats is not None:
+        stats.count("points", len(pts))
+    if len(pts) < 2:
+        return None, float('inf')
+    found = _grid_indices(pts, np.random.default_rng(seed), stats)
+    if found is None and stats is not None:
+        stats.count("fallbacks")
+    i, j, d2 = found if found is not None else _closest_pair_indices(pts, stats)
+    p, q = tuple(pts[i].tolist()), tuple(pts[j].tolist())
+    return (p, q), math.dist(p, q)
+
+
+# ----------------------------- PARALLEL IMPLEMENTATION -----------------------------
+# The x-sorted coordinates are placed in shared memory once; each worker process
+# solves one contiguous x slab on a zero-copy view of it, and the parent merges
+# the slab boundaries with a strip pass, exactly like one D&C combine step.
+
+PARALLEL_MIN_POINTS = 200_000
+
+
+def _indices_auto(pts, seed=None, stats=None):
+    """(i, j, squared distance) using the grid engine for large inputs, D&C otherwise."""
+    import numpy as np
+
+    if len(pts) >= GRID_MIN_POINTS:
+        found = _grid_indices(pts, np.random.default_rng(seed), stats)
+        if found is not None:
+            return found
+        if stats is not None:
+            stats.count("fallbacks")
+    return _closest_pair_indices(pts, stats)
+
+
+def _slab_worker(shm_name, n, lo, hi):
+    """Closest pair inside x-sorted positions [lo, hi) of the shared coordinate array."""
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        coords = np.ndarray((n, 2), dtype=np.float64, buffer=shm.buf)
+        i, j, d2 = _indices_auto(coords[lo:hi], seed=lo)
+        # The view must be released before the segment can be closed
+        del coords
+    finally:
+        shm.close()
+    return lo + i, lo + j, d2
+
+
+def _merge_slabs(sx, bounds, best):
+    """Check pairs straddling slab boundaries; best is (i, j, d2) in x-sorted positions."""
+    import numpy as np
+
+    delta = math.sqrt(best[2])
+    ranges = []
+    for b in bounds:
+        lo = np.searchsorted(sx[:, 0], sx[b, 0] - delta, side="right")
+        hi = np.searchsorted(sx[:, 0], sx[b, 0] + delta, side="left")
+        ranges.append(np.arange(lo, max(hi, b + 1)))
+    band = np.unique(np.concatenate(ranges)) if ranges else np.empty(0, dtype=np.int64)
+    if len(band) < 2:
+        return best
+    i, j, d2 = _indices_auto(sx[band])
+    if d2 < best[2]:
+        return int(band[i]), int(band[j]), d2
+    return best
+
+
+def closest_pair_parallel(points, workers=None, slabs=None, executor=None,
+                          min_points=PARALLEL_MIN_POINTS, stats=None):
+    """Closest pair with x slabs solved in a process pool.
+
+    ``slabs`` defaults to ``workers`` (default: CPU count). Pass a
+    ``concurrent.futures.ProcessPoolExecutor`` as ``executor`` to reuse worker
+    processes across calls. Inputs below ``min_points`` run serially.
+    Returns the same ``(pair, distance)`` tuple as ``closest_pair``.
+    ``stats`` (an optional ``instrument.Instrumentation``) counts points and
+    slabs and times the sort, slabs and merge phases; workers are not
+    instrumented, while a serial run is instrumented like ``closest_pair_grid``.
+    """
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    pts = _as_point_array(points)
+    n = len(pts)
+    if stats is not None:
+        stats.count("points", n)
+    if n < 2:
+        return None, float('inf')
+    workers = workers or os.cpu_count() or 1
+    slabs = max(1, min(slabs or workers, n // 2))
+    if n < min_points or slabs == 1:
+        i, j, _ = _indices_auto(pts, stats=stats)
+    else:
+        t = perf_counter() if stats is not None else 0.0
+        order = np.argsort(pts[:, 0], kind="stable")
+        shm = shared_memory.SharedMemory(create=True, size=pts.nbytes)
+        own_pool = executor is None
+        pool = ProcessPoolExecutor(max_workers=workers) if own_pool else executor
+        sx = np.ndarray((n, 2), dtype=np.float64, buffer=shm.buf)
+        try:
+            np.take(pts, order, axis=0, out=sx)
+            if stats is not None:
+                t = stats.lap("sort", t)
+                stats.count("slabs", slabs)
+            edges = [n * s // slabs for s in range(slabs + 1)]
+            futures = [pool.submit(_slab_worker, shm.name, n, lo, hi)
+                       for lo, hi in zip(edges[:-1], edges[1:])]
+            best = min((f.result() for f in futures), key=lambda r: (r[2], r[0], r[1]))
+            if stats is not None:
+                t = stats.lap("slabs", t)
+            i, j, _ = _merge_slabs(sx, edges[1:-1], best)
+            if stats is not None:
+                stats.lap("merge", t)
+            i, j = int(order[i]), int(order[j])
+        finally:
+            if own_pool:
+                pool.shutdown()
+            del sx
+            shm.close()
+            shm.unlink()
+    i, j = min(i, j), max(i, j)
+    p, q = tuple(pts[i].tolist()), tuple(pts[j].tolist())
+    return (p, q), math.dist(p, q)
+
+
+# ----------------------------- NEIGHBOUR QUERIES -----------------------------
+# A balanced k-d tree is built level by level with vectorized median splits, so
+# every leaf is a contiguous run of the permuted points. Queries walk the tree
+# for a whole block of points at once, pruning children whose bounding box lies
+# outside each point's search radius, then brute-force the surviving leaves.
+# Points may have any dimension; distances are compared in a reduced form
+# (squared for euclidean) that is monotone in the metric.
+
+KD_LEAF_SIZE = 16
+KD_QUERY_BLOCK = 1 << 14
+# Up to this many neighbours per point are selected without sorting candidates
+KD_SELECT_ROUNDS = 8
+
+METRICS = ("euclidean", "manhattan", "chebyshev")
+
+
+def _check_metric(metric):
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric!r}")
+
+
+def _reduce(parts, metric):
+    """Combine per-axis absolute differences into a reduced distance."""
+    import numpy as np
+
+    if metric == "chebyshev":
+        total = parts[0]
+        for part in parts[1:]:
+            total = np.maximum(total, part)
+        return total
+    if metric == "manhattan":
+        return sum(parts[1:], parts[0])
+    total = parts[0] * parts[0]
+    for part in parts[1:]:
+        total = total + part * part
+    return total
+
+
+def _unreduce(value, metric):
+    """Reduced distance(s) back to the metric's distance."""
+    import numpy as np
+
+    return np.sqrt(value) if metric == "euclidean" else value
+
+
+def _as_vector_array(points):
+    """Convert points to a float64 (N, d) NumPy array."""
+    import numpy as np
+
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, arr.shape[-1] if arr.ndim == 2 else 2)
+    if arr.ndim != 2 or arr.shape[1] < 1:
+        raise ValueError("points must be an (N, d) array")
+    return arr
+
+
+class _KDTree:
+    """Perfect binary k-d tree over an (N, d) array; level l has 2**l nodes."""
+
+    def __init__(self, pts, leaf_size=KD_LEAF_SIZE, metric="euclidean"):
+        import numpy as np
+
+        n, dim = pts.shape
+        self.metric = metric
+        self.height = int(math.log2(n / leaf_size)) if n >= 2 * leaf_size else 0
+        ranks = np.empty((dim, n), dtype=np.int64)
+        for axis in range(dim):
+            ranks[axis, np.argsort(pts[:, axis], kind="stable")] = np.arange(n)
+        perm = np.arange(n)
+        for level in range(self.height):
+            edges = self._edges(n, level)
+            seg = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+            spreads = []
+            for axis in range(dim):
+                col = pts[perm, axis]
+                spreads.append(np.maximum.reduceat(col, edges[:-1]) - np.minimum.reduceat(col, edges[:-1]))
+            # Sorting each segment along its widest axis puts the median split at its midpoint
+            widest = np.argmax(spreads, axis=0)
+            perm = perm[np.argsort(seg * n + ranks[widest[seg], perm])]
+
+        self.perm = perm
+        self.cols = [pts[perm, axis] for axis in range(dim)]
+        self.bounds = []
+        for level in range(self.height + 1):
+            starts = self._edges(n, level)[:-1]
+            self.bounds.append([(np.minimum.reduceat(col, starts), np.maximum.reduceat(col, starts))
+                                for col in self.cols])
+        self.leaf_edges = self._edges(n, self.height)
+
+    def __len__(self):
+        return len(self.perm)
+
+    @staticmethod
+    def _edges(n, level):
+        import numpy as np
+
+        return (np.arange((1 << level) + 1, dtype=np.int64) * n) >> level
+
+    def columns(self, positions):
+        """Coordinate columns of the points at the given tree positions."""
+        return [col[positions] for col in self.cols]
+
+    def _gap(self, level, node, qcols):
+        """Reduced distance from each query point to the bounding box of its node."""
+        import numpy as np
+
+        parts = [np.maximum(lo[node] - q, 0) + np.maximum(q - hi[node], 0)
+                 for (lo, hi), q in zip(self.bounds[level], qcols)]
+        return _reduce(parts, self.metric)
+
+    def dist(self, qcols, qi, j):
+        """Reduced distances between query points qi and tree positions j."""
+        import numpy as np
+
+        return _reduce([np.abs(q[qi] - col[j]) for q, col in zip(qcols, self.cols)], self.metric)
+
+    def leaf_of(self, positions):
+        import numpy as np
+
+        return np.searchsorted(self.leaf_edges, positions, side="right") - 1
+
+    def descend(self, qcols):
+        """Leaf reached by walking each query point towards the nearer child box."""
+        import numpy as np
+
+        node = np.zeros(len(qcols[0]), dtype=np.int64)
+        for level in range(1, self.height + 1):
+            left, right = 2 * node, 2 * node + 1
+            node = np.where(self._gap(level, right, qcols) < self._gap(level, left, qcols), right, left)
+        return node
+
+    def leaf_points(self, leaves):
+        """Expand leaves into their points: (index into leaves k, point position j) pairs."""
+        import numpy as np
+
+        starts = self.leaf_edges[leaves]
+        counts = self.leaf_edges[leaves + 1] - starts
+        k = np.repeat(np.arange(len(leaves)), counts)
+        j = starts[k] + np.arange(len(k)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return k, j
+
+    def within(self, qcols, radius):
+        """All (query, point position, distance) triples within each query's reduced radius."""
+        import numpy as np
+
+        fq, node = np.arange(len(qcols[0])), np.zeros(len(qcols[0]), dtype=np.int64)
+        for level in range(1, self.height + 1):
+            fq = np.repeat(fq, 2)
+            node = 2 * np.repeat(node, 2)
+            node[1::2] += 1
+            keep = self._gap(level, node, [q[fq] for q in qcols]) <= radius[fq]
+            fq, node = fq[keep], node[keep]
+        k, j = self.leaf_points(node)
+        qi = fq[k]
+        d = self.dist(qcols, qi, j)
+        keep = d <= radius[qi]
+        return qi[keep], j[keep], d[keep]
+
+
+def _distinct_rows(pts):
+    """Group the identical rows of an (N, d) array.
+
+    Returns ``(first, group, members, starts)`` with the distinct rows numbered in
+    order of first occurrence: ``first[g]`` is the lowest index of row g,
+    ``group[i]`` the row of point i and ``members[starts[g]:starts[g + 1]]`` the
+    points of row g in increasing index order.
+    """
+    import numpy as np
+
+    n = len(pts)
+    order = np.lexsort(pts.T[::-1])
+    ordered = pts[order]
+    new = np.ones(n, dtype=bool)
+    new[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    # lexsort is stable, so each run of equal rows starts at its lowest index
+    heads = order[new]
+    relabel = np.empty(len(heads), dtype=np.int64)
+    relabel[np.argsort(heads)] = np.arange(len(heads))
+    sorted_group = relabel[np.cumsum(new) - 1]
+    group = np.empty(n, dtype=np.int64)
+    group[order] = sorted_group
+    members = order[np.argsort(sorted_group, kind="stable")]
+    starts = np.concatenate(([0], np.cumsum(np.bincount(group, minlength=len(heads)))))
+    return np.sort(heads), group, members, starts
+
+
+def _smallest_per_query(q, j, d, m, nq, tiebreak):
+    """The m nearest candidates of each of nq queries as (nq, m) arrays, ties by ``tiebreak[j]``.
+
+    ``q`` must be sorted and hold every query 0..nq-1 at least m times.
+    """
+    import numpy as np
+
+    if m > KD_SELECT_ROUNDS:
+        order = np.lexsort((tiebreak[j], d, q))
+        j, d = j[order], d[order]
+        rank = np.arange(len(q)) - np.searchsorted(q, q)
+        keep = rank < m
+        return j[keep].reshape(nq, m), d[keep].reshape(nq, m)
+
+    # Few neighbours: m rounds of per-query minimum are far cheaper than a sort
+    starts = np.searchsorted(q, np.arange(nq))
+    counts = np.diff(np.append(starts, len(q)))
+    d = d.copy()
+    tb = tiebreak[j]
+    out_j = np.empty((nq, m), dtype=np.int64)
+    out_d = np.empty((nq, m))
+    for r in range(m):
+        best = np.repeat(np.minimum.reduceat(d, starts), counts)
+        tied = np.where(d == best, tb, len(tiebreak))
+        chosen = np.flatnonzero(tied == np.repeat(np.minimum.reduceat(tied, starts), counts))
+        out_j[:, r] = j[chosen]
+        out_d[:, r] = d[chosen]
+        d[chosen] = np.inf
+    return out_j, out_d
+
+
+def _query_blocks(n):
+    import numpy as np
+
+    for lo in range(0, n, KD_QUERY_BLOCK):
+        yield np.arange(lo, min(lo + KD_QUERY_BLOCK, n))
+
+
+def _knn_positions(tree, m):
+    """m nearest neighbours of every tree point, in tree positions: (N, m) index and reduced distances."""
+    import numpy as np
+
+    n = len(tree)
+    nbr = np.empty((n, m), dtype=np.int64)
+    nbr_d = np.empty((n, m))
+    for q in _query_blocks(n):
+        qcols = tree.columns(q)
+        # Own-leaf neighbours give every query a finite starting radius
+        qi, j = tree.leaf_points(tree.leaf_of(q))
+        other = q[qi] != j
+        qi, j = qi[other], j[other]
+        radius = _smallest_per_query(qi, j, tree.dist(qcols, qi, j), m, len(q), tree.perm)[1][:, -1]
+        qi, j, d = tree.within(qcols, radius)
+        other = q[qi] != j
+        nbr[q], nbr_d[q] = _smallest_per_query(qi[other], j[other], d[other], m, len(q), tree.perm)
+    return nbr, nbr_d
+
+
+def all_nearest_neighbors(points, metric="euclidean"):
+    """Nearest neighbour of every point of an (N, d) array.
+
+    Returns ``(neighbors, distances)`` NumPy arrays: ``neighbors[i]`` is the index
+    of the point closest to point i (ties broken by lower index) and
+    ``distances[i]`` its distance under ``metric`` (one of ``METRICS``).
+    Duplicated points are each other's neighbours at distance 0. Fewer than 2
+    points give index -1 and distance inf.
+    """
+    import numpy as np
+
+    _check_metric(metric)
+    pts = _as_vector_array(points)
+    n = len(pts)
+    if n < 2:
+        return np.full(n, -1, dtype=np.int64), np.full(n, np.inf)
+    # Identical points would all fall within each other's zero radius, so the
+    # tree only holds distinct rows; in first-occurrence order, ties by tree
+    # position are ties by lowest index
+    first, group, members, starts = _distinct_rows(pts)
+    neighbors = np.empty(n, dtype=np.int64)
+    distances = np.zeros(n)
+    if len(first) >= 2:
+        tree = _KDTree(pts[first], metric=metric)
+        nbr, nbr_d = _knn_positions(tree, 1)
+        row_nbr = np.empty(len(first), dtype=np.int64)
+        row_d = np.empty(len(first))
+        row_nbr[tree.perm] = first[tree.perm[nbr[:, 0]]]
+        row_d[tree.perm] = _unreduce(nbr_d[:, 0], metric)
+        neighbors, distances = row_nbr[group], row_d[group]
+    dup = np.flatnonzero(np.diff(starts)[group] > 1)
+    g = group[dup]
+    neighbors[dup] = np.where(dup == first[g], members[starts[g] + 1], first[g])
+    distances[dup] = 0
+    return neighbors, distances
+
+
+def _pairs_within_kth(pts, k, metric):
+    """(i, j, reduced distance) of every pair i < j within the k-th smallest pair distance.
+
+    Rows must be distinct, so no radius collapses to zero.
+    """
+    import numpy as np
+
+    n = len(pts)
+    m = -(-2 * k // n)
+    if m >= n // 4:
+        i, j = np.triu_indices(n, 1)
+        d = _reduce([np.abs(pts[i, a] - pts[j, a]) for a in range(pts.shape[1])], metric)
+        keep = d <= np.partition(d, k - 1)[k - 1]
+        return i[keep], j[keep], d[keep]
+    # Each point's m nearest neighbours hold at least k distinct pairs, so the
+    # k-th smallest of those bounds the answer; collect every pair within it.
+    tree = _KDTree(pts, max(KD_LEAF_SIZE, 2 * m), metric)
+    nbr, nbr_d = _knn_positions(tree, m)
+    a = np.repeat(np.arange(n), m)
+    b = nbr.ravel()
+    _, first = np.unique(np.minimum(a, b) * n + np.maximum(a, b), return_index=True)
+    bound = np.partition(nbr_d.ravel()[first], k - 1)[k - 1]
+    found = []
+    for q in _query_blocks(n):
+        qi, j, d = tree.within(tree.columns(q), np.full(len(q), bound))
+        i, j = tree.perm[q[qi]], tree.perm[j]
+        keep = i < j
+        found.append((i[keep], j[keep], d[keep]))
+    return tuple(np.concatenate(parts) for parts in zip(*found))
+
+
+def _pairs_with_copies(pts, k, metric, distinct):
+    """Candidate pairs (i, j, reduced distance), i < j, holding the k closest, for repeated rows.
+
+    ``distinct`` is ``_distinct_rows(pts)``. Candidates come as runs: point a with
+    the copies of row v above a, i.e. ``members[lo:lo + count]``, so heavily
+    repeated rows never expand beyond the k pairs needed.
+    """
+    import numpy as np
+
+    n = len(pts)
+    first, group, members, starts = distinct
+    sizes = np.diff(starts)
+    # Copies of one row pair at distance 0
+    point_a, rows_v, run_d = [np.arange(n)], [group], [np.zeros(n)]
+    zero = int((sizes * (sizes - 1) // 2).sum())
+    rows = len(first)
+    if zero < k and rows >= 2:
+        # k - zero distinct-row pairs cover at least that many point pairs
+        u, v, d = _pairs_within_kth(pts[first], min(k - zero, rows * (rows - 1) // 2), metric)
+        for x, y in ((u, v), (v, u)):
+            run = np.repeat(np.arange(len(x)), sizes[x])
+            offset = np.arange(len(run)) - np.repeat(np.cumsum(sizes[x]) - sizes[x], sizes[x])
+            point_a.append(members[starts[x][run] + offset])
+            rows_v.append(y[run])
+            run_d.append(d[run])
+    a, v, d = (np.concatenate(parts) for parts in (point_a, rows_v, run_d))
+    lo = np.searchsorted(group[members] * n + members, v * n + a, side="right")
+    count = starts[v + 1] - lo
+    live = count > 0
+    a, d, lo, count = a[live], d[live], lo[live], count[live]
+
+    # Runs in (distance, a) order, up to the (distance, a) group that reaches k
+    order = np.lexsort((a, d))
+    a, d, lo, count = a[order], d[order], lo[order], count[order]
+    last = int(np.searchsorted(np.cumsum(count), k))
+    stop = last + int(np.count_nonzero((d[last:] == d[last]) & (a[last:] == a[last])))
+    take = np.minimum(count[:stop], k)
+    run = np.repeat(np.arange(stop), take)
+    offset = np.arange(len(run)) - np.repeat(np.cumsum(take) - take, take)
+    return a[run], members[lo[run] + offset], d[run]
+
+
+def _k_closest_indices(pts, k, metric):
+    """(i, j, reduced distance) arrays of the k closest pairs, i < j, sorted by (distance, i, j)."""
+    import numpy as np
+
+    distinct = _distinct_rows(pts)
+    if len(distinct[0]) == len(pts):
+        i, j, d = _pairs_within_kth(pts, k, metric)
+    else:
+        i, j, d = _pairs_with_copies(pts, k, metric, distinct)
+    order = np.lexsort((j, i, d))[:k]
+    return i[order], j[order], d[order]
+
+
+def k_closest_pairs(points, k, metric="euclidean"):
+    """The k closest pairs of an (N, d) array in increasing distance.
+
+    Returns a list of ``((p, q), distance)`` in the format of ``closest_pair``'s
+    result; pairs are distinct by index, so duplicated points pair at distance 0.
+    Ties are broken by point index. k is capped at N*(N-1)/2.
+    """
+    _check_metric(metric)
+    pts = _as_vector_array(points)
+    n = len(pts)
+    k = min(int(k), n * (n - 1) // 2)
+    if k <= 0:
+        return []
+    i, j, d = _k_closest_indices(pts, k, metric)
+    p, q = pts[i].tolist(), pts[j].tolist()
+    return [((tuple(a), tuple(b)), float(dist)) for a, b, dist in zip(p, q, _unreduce(d, metric).tolist())]
+
+
+def _closest_pair_nd_indices(pts, metric):
+    """(i, j, reduced distance) of the closest pair of an (N, d) array, N >= 2, i < j."""
+    import numpy as np
+
+    tree = _KDTree(pts, metric=metric)
+    n = len(tree)
+    # The closest pair inside any leaf bounds the answer; then only pairs within
+    # that bound are visited, which prunes almost every box
+    bound = np.inf
+    for q in _query_blocks(n):
+        qi, j = tree.leaf_points(tree.leaf_of(q))
+        forward = q[qi] < j
+        qi, j = qi[forward], j[forward]
+        if len(qi):
+            bound = min(bound, float(tree.dist(tree.columns(q), qi, j).min()))
+    if bound == 0:
+        # Duplicates: every pair within a zero bound would be listed, quadratic in
+        # the copies, so take the lowest-index identical pair directly
+        first, _, members, starts = _distinct_rows(pts)
+        g = int(np.flatnonzero(np.diff(starts) > 1)[0])
+        return int(first[g]), int(members[starts[g] + 1]), 0.0
+
+    best = (n, n, np.inf)
+    for q in _query_blocks(n):
+        qi, j, d = tree.within(tree.columns(q), np.full(len(q), bound))
+        a, b = tree.perm[q[qi]], tree.perm[j]
+        keep = a < b
+        a, b, d = a[keep], b[keep], d[keep]
+        if len(d):
+            k = np.lexsort((b, a, d))[0]
+            best = min(best, (int(a[k]), int(b[k]), float(d[k])), key=lambda r: (r[2], r[0], r[1]))
+    return best
+
+
+def closest_pair_nd(points, metric="euclidean"):
+    """Closest pair of an (N, d) array under the euclidean, manhattan or chebyshev metric.
+
+    Works for any dimension and stays O(n log n)-ish for small d. Returns the
+    ``(pair, distance)`` format of ``closest_pair`` with d-tuples as points; ties
+    go to the lowest (i, j) index pair.
+    """
+    _check_metric(metric)
+    pts = _as_vector_array(points)
+    if len(pts) < 2:
+        return None, float('inf')
+    i, j, d = _closest_pair_nd_indices(pts, metric)
+    return (tuple(pts[i].tolist()), tuple(pts[j].tolist())), float(_unreduce(d, metric))
+
+
+CLOSEST_PAIR_METHODS = {
+    "fast": closest_pair_fast,
+    "exact": closest_pair_exact,
+    "grid": closest_pair_grid,
+    "parallel": closest_pair_parallel,
+}
+
+
+def solve_closest_pair(points, method="auto", stats=None):
+    """Non-visual closest pair with a selectable engine.
+
+    ``method`` is a key of ``CLOSEST_PAIR_METHODS`` or ``"auto"``, which uses the
+    grid engine from ``GRID_MIN_POINTS`` points upwards and divide and conquer below.
+    ``stats`` is passed on to the engine when given.
+    """
+    if method == "auto":
+        method = "grid" if len(points) >= GRID_MIN_POINTS else "fast"
+    try:
+        engine = CLOSEST_PAIR_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown closest pair method: {method!r}") from None
+    return engine(points) if stats is None else engine(points, stats=stats)
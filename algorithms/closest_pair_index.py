@@ -0,0 +1,330 @@
+# algorithms/closest_pair_index.py
+"""Dynamic closest pair under batched point insertions and deletions.
+
+Every live point records its nearest neighbour at the time it was inserted, or
+at the time its recorded neighbour was deleted. A pair (a, b) is covered by the
+record of whichever point arrived later, which is never larger than d(a, b).
+So the smallest live record is always the current closest pair, and a
+tournament tree over the records answers queries.
+
+Nearest-neighbour lookups go to a logarithmic set of static k-d trees
+(Bentley-Saxe): inserts add a small tree and merge trees of similar size, and
+deleted points stay in their tree as tombstones until it is more than half
+dead and gets rebuilt.
+
+All per-point state lives in flat NumPy arrays indexed by point ID: the
+coordinates, the records, the tree each point belongs to, and intrusive linked
+lists of the points whose record names a given point.
+"""
+
+import math
+
+import numpy as np
+
+from algorithms.closest_pair import KD_QUERY_BLOCK, _KDTree
+
+NO_POINT = -1
+_INITIAL_CAPACITY = 64
+
+
+class _Bucket:
+    """A static k-d tree over a fixed set of point IDs."""
+
+    def __init__(self, uid, ids, xs, ys):
+        self.uid = uid
+        self.ids = ids
+        self.tree = _KDTree(np.column_stack([xs[ids], ys[ids]]))
+        # Point ID at each tree position
+        self.tree_ids = ids[self.tree.perm]
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, qx, qy, qid, alive, best_d2, best_id):
+        """Improve (best_d2, best_id) in place with the live points of this bucket."""
+        tree = self.tree
+        qcols = [qx, qy]
+        # Seed each query's radius with the live points of the leaf it falls into
+        k, j = tree.leaf_points(tree.descend(qcols))
+        radius2 = best_d2.copy()
+        ok = alive[self.tree_ids[j]] & (self.tree_ids[j] != qid[k])
+        k, j = k[ok], j[ok]
+        np.minimum.at(radius2, k, tree.dist(qcols, k, j))
+
+        qi, j, d2 = tree.within(qcols, radius2)
+        ids = self.tree_ids[j]
+        ok = alive[ids] & (ids != qid[qi])
+        qi, ids, d2 = qi[ok], ids[ok], d2[ok]
+        if not len(qi):
+            return
+        # Per query: smallest distance, then smallest ID
+        order = np.lexsort((ids, d2, qi))
+        qi, ids, d2 = qi[order], ids[order], d2[order]
+        first = np.flatnonzero(np.r_[True, qi[1:] != qi[:-1]])
+        qi, ids, d2 = qi[first], ids[first], d2[first]
+        better = (d2 < best_d2[qi]) | ((d2 == best_d2[qi]) & (ids < best_id[qi]))
+        best_d2[qi[better]] = d2[better]
+        best_id[qi[better]] = ids[better]
+
+
+class ClosestPairIndex:
+    """Set of 2D points that keeps its closest pair current under inserts and deletes.
+
+    Points are stored in flat coordinate arrays and addressed by integer IDs
+    returned from ``insert``/``insert_many``; IDs of deleted points are reused
+    once their tombstones are purged.
+    An insert costs one nearest-neighbour query per point plus O(log^2 n)
+    amortized tree rebuilding. A delete re-queries every live point whose
+    record names the deleted point. That is usually a handful, but nothing
+    bounds it below n - 1: points inserted one by one at shrinking distances
+    around a centre all record the centre. So deletes have no polylogarithmic
+    bound. ``closest_pair`` is O(1).
+    """
+
+    def __init__(self, points=None):
+        self._x = np.empty(_INITIAL_CAPACITY)
+        self._y = np.empty(_INITIAL_CAPACITY)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._nn = np.full(_INITIAL_CAPACITY, NO_POINT, dtype=np.int64)
+        self._nn_d2 = np.full(_INITIAL_CAPACITY, np.inf)
+        self._bucket_of = np.full(_INITIAL_CAPACITY, NO_POINT, dtype=np.int64)
+        # Linked lists of owners: the points whose recorded neighbour is a given point
+        self._owner_head = np.full(_INITIAL_CAPACITY, NO_POINT, dtype=np.int64)
+        self._owner_next = np.full(_INITIAL_CAPACITY, NO_POINT, dtype=np.int64)
+        self._owner_prev = np.full(_INITIAL_CAPACITY, NO_POINT, dtype=np.int64)
+        self._free = []
+        self._end = 0
+        self._count = 0
+        # Merge stack of trees, and the same trees by their uid
+        self._buckets = []
+        self._bucket_by_uid = {}
+        self._next_uid = 0
+        self._rebuild_tournament()
+        if points is not None:
+            self.insert_many(points)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, point_id):
+        return 0 <= point_id < self._end and bool(self._alive[point_id])
+
+    def point(self, point_id):
+        if point_id not in self:
+            raise KeyError(point_id)
+        return float(self._x[point_id]), float(self._y[point_id])
+
+    def ids(self):
+        return np.flatnonzero(self._alive[:self._end])
+
+    # ----------------------------- storage -----------------------------
+
+    def _reserve(self, n):
+        """Return n free slot IDs, growing the arrays by doubling when needed."""
+        reused = [self._free.pop() for _ in range(min(n, len(self._free)))]
+        fresh = n - len(reused)
+        if self._end + fresh > len(self._x):
+            capacity = len(self._x)
+            while capacity < self._end + fresh:
+                capacity *= 2
+            for name, fill in (("_x", 0.0), ("_y", 0.0), ("_alive", False), ("_nn", NO_POINT),
+                               ("_nn_d2", np.inf), ("_bucket_of", NO_POINT), ("_owner_head", NO_POINT),
+                               ("_owner_next", NO_POINT), ("_owner_prev", NO_POINT)):
+                old = getattr(self, name)
+                grown = np.full(capacity, fill, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+            self._rebuild_tournament()
+        ids = np.array(reused + list(range(self._end, self._end + fresh)), dtype=np.int64)
+        self._end += fresh
+        return ids
+
+    def _build_bucket(self, ids):
+        """Tree over the live IDs; tombstones are dropped and their slots become reusable."""
+        live = self._alive[ids]
+        self._free.extend(ids[~live].tolist())
+        if not live.any():
+            return None
+        bucket = _Bucket(self._next_uid, ids[live], self._x, self._y)
+        self._next_uid += 1
+        self._bucket_by_uid[bucket.uid] = bucket
+        self._bucket_of[bucket.ids] = bucket.uid
+        return bucket
+
+    def _retire_bucket(self, bucket):
+        del self._bucket_by_uid[bucket.uid]
+
+    def _add_bucket(self, ids):
+        bucket = self._build_bucket(ids)
+        if bucket is not None:
+            self._buckets.append(bucket)
+        # Merge trees of similar size so there are O(log n) of them
+        while len(self._buckets) >= 2 and len(self._buckets[-2]) <= 2 * len(self._buckets[-1]):
+            b = self._buckets.pop()
+            a = self._buckets.pop()
+            self._retire_bucket(a)
+            self._retire_bucket(b)
+            merged = self._build_bucket(np.concatenate([a.ids, b.ids]))
+            if merged is not None:
+                self._buckets.append(merged)
+
+    # ----------------------------- records -----------------------------
+    # A tournament tree over the record distances: node k holds the ID with the
+    # smallest record among its two children, leaf capacity + i stands for ID i,
+    # and node 1 is the current closest pair.
+
+    def _rebuild_tournament(self):
+        capacity = len(self._x)
+        self._tournament = np.empty(2 * capacity, dtype=np.int64)
+        self._tournament[capacity:] = np.arange(capacity)
+        lo = capacity // 2
+        while lo >= 1:
+            nodes = np.arange(lo, 2 * lo)
+            self._tournament[nodes] = self._winners(nodes)
+            lo //= 2
+
+    def _winners(self, nodes):
+        left = self._tournament[2 * nodes]
+        right = self._tournament[2 * nodes + 1]
+        return np.where(self._nn_d2[right] < self._nn_d2[left], right, left)
+
+    def _update_tournament(self, ids):
+        if not len(ids):
+            return
+        nodes = np.unique((ids + len(self._x)) // 2)
+        while True:
+            self._tournament[nodes] = self._winners(nodes)
+            if nodes[0] == 1:
+                break
+            # Halving keeps the nodes sorted, so duplicates are adjacent
+            nodes = nodes // 2
+            nodes = nodes[np.r_[True, nodes[1:] != nodes[:-1]]]
+
+    def _link_owners(self, owners, partners):
+        """Push each owner onto the owner list of its partner."""
+        order = np.argsort(partners, kind="stable")
+        owners, partners = owners[order], partners[order]
+        starts = np.r_[True, partners[1:] != partners[:-1]]
+        ends = np.r_[starts[1:], True]
+        head, nxt, prev = self._owner_head, self._owner_next, self._owner_prev
+        # Chain each partner's new owners in a row, then put the row in front of its list
+        nxt[owners[:-1]] = owners[1:]
+        prev[owners[1:]] = owners[:-1]
+        old = head[partners[ends]]
+        nxt[owners[ends]] = old
+        prev[owners[starts]] = NO_POINT
+        has_old = old != NO_POINT
+        prev[old[has_old]] = owners[ends][has_old]
+        head[partners[starts]] = owners[starts]
+
+    def _unlink_owner(self, owner):
+        head, nxt, prev = self._owner_head, self._owner_next, self._owner_prev
+        before, after = prev[owner], nxt[owner]
+        if before != NO_POINT:
+            nxt[before] = after
+        else:
+            head[self._nn[owner]] = after
+        if after != NO_POINT:
+            prev[after] = before
+
+    def _find_neighbors(self, ids):
+        """Exact nearest live neighbour of each ID; records and links it."""
+        best_d2 = np.full(len(ids), np.inf)
+        best_id = np.full(len(ids), NO_POINT, dtype=np.int64)
+        # Blocks of queries bound the size of the candidate lists
+        for lo in range(0, len(ids), KD_QUERY_BLOCK):
+            block = slice(lo, lo + KD_QUERY_BLOCK)
+            qids = ids[block]
+            qx, qy = self._x[qids], self._y[qids]
+            for bucket in self._buckets:
+                bucket.nearest(qx, qy, qids, self._alive, best_d2[block], best_id[block])
+        self._nn[ids] = best_id
+        self._nn_d2[ids] = best_d2
+        found = best_id != NO_POINT
+        if found.any():
+            self._link_owners(ids[found], best_id[found])
+        self._update_tournament(ids)
+
+    # ----------------------------- updates -----------------------------
+
+    def insert(self, point):
+        """Add one (x, y) point; returns its ID."""
+        return int(self.insert_many([point])[0])
+
+    def insert_many(self, points):
+        """Add an (N, 2) batch of points; returns their IDs."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if not len(pts):
+            return np.empty(0, dtype=np.int64)
+        ids = self._reserve(len(pts))
+        self._x[ids] = pts[:, 0]
+        self._y[ids] = pts[:, 1]
+        self._alive[ids] = True
+        self._count += len(ids)
+        self._add_bucket(ids)
+        self._find_neighbors(ids)
+        return ids
+
+    def delete(self, point_id):
+        self.delete_many([point_id])
+
+    def delete_many(self, ids):
+        """Remove points by ID; unknown or already deleted IDs raise KeyError."""
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        if not len(ids):
+            return
+        for point_id in ids.tolist():
+            if point_id not in self:
+                raise KeyError(point_id)
+        self._alive[ids] = False
+        self._count -= len(ids)
+
+        # Deleted points stay in their tree as tombstones until it is half dead
+        for uid, dead in zip(*np.unique(self._bucket_of[ids], return_counts=True)):
+            bucket = self._bucket_by_uid[int(uid)]
+            bucket.dead += int(dead)
+            if 2 * bucket.dead > len(bucket):
+                position = self._buckets.index(bucket)
+                self._retire_bucket(bucket)
+                rebuilt = self._build_bucket(bucket.ids)
+                if rebuilt is not None:
+                    self._buckets[position] = rebuilt
+                else:
+                    del self._buckets[position]
+
+        # Deleted points leave their partners' owner lists; their own owners are orphaned
+        for point_id in ids.tolist():
+            if self._nn[point_id] != NO_POINT:
+                self._unlink_owner(point_id)
+        orphans = []
+        for point_id in ids.tolist():
+            owner = self._owner_head[point_id]
+            while owner != NO_POINT:
+                orphans.append(owner)
+                owner = self._owner_next[owner]
+            self._owner_head[point_id] = NO_POINT
+        self._nn[ids] = NO_POINT
+        self._nn_d2[ids] = np.inf
+        self._update_tournament(ids)
+        if orphans:
+            self._find_neighbors(np.array(orphans, dtype=np.int64))
+
+    # ----------------------------- queries -----------------------------
+
+    def closest_pair_ids(self):
+        """(i, j, distance) of the current closest pair with i < j, or None with fewer than 2 points."""
+        owner = int(self._tournament[1])
+        d2 = float(self._nn_d2[owner])
+        if d2 == math.inf:
+            return None
+        partner = int(self._nn[owner])
+        return min(owner, partner), max(owner, partner), math.sqrt(d2)
+
+    def closest_pair(self):
+        """Current closest pair in the ``(pair, distance)`` format of ``closest_pair``."""
+        found = self.closest_pair_ids()
+        if found is None:
+            return None, float('inf')
+        i, j, dist = found
+        return (self.point(i), self.point(j)), dist
@@ -0,0 +1,53 @@
+# algorithms/instrument.py
+"""Opt-in counters and phase timers for the algorithms.
+
+The engines take an optional ``stats`` argument, like the step ``sink`` of
+``closest_pair_iterative``: pass an ``Instrumentation`` to collect counters,
+maxima and phase times; leave it ``None`` and they only pay ``is None``
+checks per call, per vectorized batch or per strip window, never per
+compared pair.
+"""
+
+import json
+from time import perf_counter
+
+
+class Instrumentation:
+    """Named counters, running maxima and accumulated phase times."""
+
+    def __init__(self):
+        self.counters = {}
+        self.maxima = {}
+        self.timers = {}
+        self.depth = 0
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe_max(self, name, value):
+        if name not in self.maxima or value > self.maxima[name]:
+            self.maxima[name] = value
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def lap(self, name, start):
+        """Charge the time since ``start`` to phase ``name``; returns the current time."""
+        now = perf_counter()
+        self.add_time(name, now - start)
+        return now
+
+    def descend(self):
+        """Enter a recursion level; the deepest level reached is the ``depth`` maximum."""
+        self.depth += 1
+        self.observe_max("depth", self.depth)
+
+    def ascend(self):
+        self.depth -= 1
+
+    def as_dict(self):
+        return {"counters": dict(self.counters), "maxima": dict(self.maxima),
+                "timers_s": dict(self.timers)}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
@@ -1,4 +1,6 @@
 # algorithms/karatsuba.py
+from time import perf_counter
+
 
 def parse_integers_file_content(file_content: str):
     """Parse content with exactly two integers, one per line."""
@@ -10,18 +12,50 @@ def parse_integers_file_content(file_content: str):
     return x, y
 
 
-def karatsuba(x: int, y: int) -> int:
-    """Recursive Karatsuba multiplication."""
+def karatsuba(x: int, y: int, memo=None, stats=None) -> int:
+    """Recursive Karatsuba multiplication.
+
+    ``memo`` is an optional subproduct cache such as ``multiply.KaratsubaMemo``.
+    ``stats`` is an optional ``instrument.Instrumentation``. Counters: calls,
+    base_cases, memo_hits. Maxima: depth, digits. Phases: digit_count
+    (``len(str(...))``), split (``divmod`` by ``10**m``), recombine.
+    """
+    if stats is not None:
+        stats.count("calls")
     if x < 10 or y < 10:
+        if stats is not None:
+            stats.count("base_cases")
         return x * y
+    key = memo.key(x, y) if memo is not None else None
+    if key is not None:
+        product = memo.get(key)
+        if product is not None:
+            if stats is not None:
+                stats.count("memo_hits")
+            return product
+    t = perf_counter() if stats is not None else 0.0
     n = max(len(str(x)), len(str(y)))
+    if stats is not None:
+        t = stats.lap("digit_count", t)
+        stats.observe_max("digits", n)
     m = n // 2
     high1, low1 = divmod(x, 10**m)
     high2, low2 = divmod(y, 10**m)
-    z0 = karatsuba(low1, low2)
-    z1 = karatsuba(low1 + high1, low2 + high2)
-    z2 = karatsuba(high1, high2)
-    return (z2 * 10**(2*m)) + ((z1 - z2 - z0) * 10**m) + z0
+    if stats is not None:
+        stats.lap("split", t)
+        stats.descend()
+    z0 = karatsuba(low1, low2, memo, stats)
+    z1 = karatsuba(low1 + high1, low2 + high2, memo, stats)
+    z2 = karatsuba(high1, high2, memo, stats)
+    if stats is not None:
+        stats.ascend()
+        t = perf_counter()
+    product = (z2 * 10**(2*m)) + ((z1 - z2 - z0) * 10**m) + z0
+    if stats is not None:
+        stats.lap("recombine", t)
+    if key is not None:
+        memo.put(key, product)
+    return product
 
 
 def karatsuba_steps(x: int, y: int):
@@ -55,3 +89,56 @@ def karatsuba_steps(x: int, y: int):
            "product": product}
 
     return product
+
+
+# Recursion depth down to which record_karatsuba reports progress
+PROGRESS_DEPTH = 8
+
+
+def record_karatsuba(x: int, y: int, progress=None):
+    """Run Karatsuba once, recording the ``karatsuba_steps`` sequence as a compact KaratsubaTrace.
+
+    ``progress``, if given, is called with the estimated fraction of the
+    recursion tree done, counting each finished subtree at depth d as 3^-d; an
+    exception raised from it aborts the recording.
+    """
+    from algorithms.trace import KaratsubaTrace
+
+    T = KaratsubaTrace
+    trace = KaratsubaTrace()
+    done = 0.0
+
+    def advance(depth):
+        nonlocal done
+        done += 3.0 ** -depth
+        progress(done)
+
+    def rec(x, y, parent, depth):
+        node = trace.add_node(x, y, parent, depth)
+        if x < 10 or y < 10:
+            trace.add(T.BASE, node)
+            if progress is not None and depth <= PROGRESS_DEPTH:
+                advance(depth)
+            return node, x * y
+
+        n = max(len(str(x)), len(str(y)))
+        m = n // 2
+        high1, low1 = divmod(x, 10**m)
+        high2, low2 = divmod(y, 10**m)
+        trace.split_digits[node] = m
+        trace.add(T.SPLIT, node)
+
+        low_node, z0 = rec(low1, low2, node, depth + 1)
+        high_node, z2 = rec(high1, high2, node, depth + 1)
+        mid_node, z1 = rec(low1 + high1, low2 + high2, node, depth + 1)
+        trace.child_low[node] = low_node
+        trace.child_high[node] = high_node
+        trace.child_mid[node] = mid_node
+
+        trace.add(T.COMBINE, node)
+        if progress is not None and depth == PROGRESS_DEPTH:
+            advance(depth)
+        return node, (z2 * 10**(2*m)) + ((z1 - z2 - z0) * 10**m) + z0
+
+    trace.result = rec(x, y, -1, 0)[1]
+    return trace
@@ -0,0 +1,505 @@
+# algorithms/multiply.py
+"""Production integer multiplication engines sharing one ``multiply`` API.
+
+``karatsuba.karatsuba`` is kept as the readable decimal reference; the engines
+here split on binary limbs (``bit_length``, shifts and masks) and hand small
+operands to Python's native multiply.
+"""
+
+from time import perf_counter
+
+from algorithms.cache import LRUCache
+from algorithms.karatsuba import karatsuba
+
+# Below these operand sizes (in bits) the recursion hands over to ``x * y``
+KARATSUBA_CUTOFF_BITS = 1 << 12
+TOOM3_CUTOFF_BITS = 1 << 15
+
+# ``multiply(method="auto")`` thresholds on the smaller operand, in bits
+AUTO_TOOM3_MIN_BITS = 1 << 15
+AUTO_FFT_MIN_BITS = 1 << 16
+
+# Largest acceptable rounding error before an FFT product is rejected
+_FFT_MAX_ERROR = 0.25
+
+
+def _split(x, m):
+    """Split x into (high, low) at bit m."""
+    return x >> m, x & ((1 << m) - 1)
+
+
+def _base_case(x, y, stats):
+    if stats is not None:
+        t = perf_counter()
+        product = x * y
+        stats.count("base_cases")
+        stats.observe_max("base_bits", max(x.bit_length(), y.bit_length()))
+        stats.lap("base_multiply", t)
+        return product
+    return x * y
+
+
+def karatsuba_binary(x: int, y: int, cutoff: int = KARATSUBA_CUTOFF_BITS, stats=None) -> int:
+    """Karatsuba on binary limbs for non-negative integers.
+
+    ``stats`` (an optional ``instrument.Instrumentation``) counts calls and
+    base_cases, tracks depth and base_bits and times the native base_multiply.
+    """
+    if stats is not None:
+        stats.count("calls")
+    n = max(x.bit_length(), y.bit_length())
+    if n <= cutoff or min(x.bit_length(), y.bit_length()) <= cutoff // 2:
+        return _base_case(x, y, stats)
+    m = n // 2
+    high1, low1 = _split(x, m)
+    high2, low2 = _split(y, m)
+    if stats is not None:
+        stats.descend()
+    z0 = karatsuba_binary(low1, low2, cutoff, stats)
+    z1 = karatsuba_binary(low1 + high1, low2 + high2, cutoff, stats)
+    z2 = karatsuba_binary(high1, high2, cutoff, stats)
+    if stats is not None:
+        stats.ascend()
+    return (z2 << (2 * m)) + ((z1 - z2 - z0) << m) + z0
+
+
+def toom3(x: int, y: int, cutoff: int = TOOM3_CUTOFF_BITS, stats=None) -> int:
+    """Toom-Cook 3-way multiplication (Bodrato interpolation sequence).
+
+    ``stats`` is instrumented as in ``karatsuba_binary``.
+    """
+    if (x < 0) != (y < 0):
+        return -toom3(abs(x), abs(y), cutoff, stats)
+    x, y = abs(x), abs(y)
+    if stats is not None:
+        stats.count("calls")
+    n = max(x.bit_length(), y.bit_length())
+    if n <= cutoff or min(x.bit_length(), y.bit_length()) <= cutoff // 3:
+        return _base_case(x, y, stats)
+
+    k = (n + 2) // 3
+    mask = (1 << k) - 1
+    x0, x1, x2 = x & mask, (x >> k) & mask, x >> (2 * k)
+    y0, y1, y2 = y & mask, (y >> k) & mask, y >> (2 * k)
+
+    # Evaluate at 0, 1, -1, -2 and infinity
+    if stats is not None:
+        stats.descend()
+    px, py = x0 + x2, y0 + y2
+    r0 = toom3(x0, y0, cutoff, stats)
+    r1 = toom3(px + x1, py + y1, cutoff, stats)
+    rm1 = toom3(px - x1, py - y1, cutoff, stats)
+    rm2 = toom3(((px - x1 + x2) << 1) - x0, ((py - y1 + y2) << 1) - y0, cutoff, stats)
+    rinf = toom3(x2, y2, cutoff, stats)
+    if stats is not None:
+        stats.ascend()
+
+    # Interpolate (all divisions are exact)
+    r3 = (rm2 - r1) // 3
+    r1 = (r1 - rm1) >> 1
+    r2 = rm1 - r0
+    r3 = ((r2 - r3) >> 1) + (rinf << 1)
+    r2 = r2 + r1 - rinf
+    r1 = r1 - r3
+    return r0 + (r1 << k) + (r2 << (2 * k)) + (r3 << (3 * k)) + (rinf << (4 * k))
+
+
+def _to_limbs(x):
+    """Little-endian 8-bit limbs of a non-negative integer as a NumPy array."""
+    import numpy as np
+
+    return np.frombuffer(x.to_bytes(max(1, (x.bit_length() + 7) // 8), 'little'), dtype=np.uint8)
+
+
+def _from_coefficients(coeffs):
+    """Recombine int64 limb coefficients (base 256) into a Python int."""
+    import numpy as np
+
+    columns = coeffs.astype('<u8').view(np.uint8).reshape(-1, 8)
+    result = 0
+    for j in range(8):
+        col = columns[:, j]
+        if col.any():
+            result += int.from_bytes(col.tobytes(), 'little') << (8 * j)
+    return result
+
+
+def _fft_size(n):
+    return 1 << (n - 1).bit_length()
+
+
+def _spectrum_product(a, spectrum, n, size):
+    """Exact product of limbs ``a`` and the operand whose rfft is ``spectrum``, or None if precision runs out."""
+    import numpy as np
+
+    conv = np.fft.irfft(np.fft.rfft(a, size) * spectrum, size)[:n]
+    coeffs = np.rint(conv)
+    if np.abs(conv - coeffs).max() > _FFT_MAX_ERROR:
+        return None
+    return _from_coefficients(coeffs.astype(np.int64))
+
+
+def _fft_product(x, y):
+    """Exact product via a float64 FFT convolution of byte limbs, or None if precision runs out."""
+    import numpy as np
+
+    a = _to_limbs(x)
+    b = _to_limbs(y)
+    n = len(a) + len(b) - 1
+    size = _fft_size(n)
+    return _spectrum_product(a, np.fft.rfft(b, size), n, size)
+
+
+def fft_multiply(x: int, y: int, stats=None) -> int:
+    """FFT-based multiplication for very large operands.
+
+    Operands too large for double-precision convolution are split once more
+    Karatsuba-style until each FFT is exact. ``stats`` is instrumented as in
+    ``karatsuba_binary``, plus ffts and precision_splits counters and an fft phase.
+    """
+    if (x < 0) != (y < 0):
+        return -fft_multiply(abs(x), abs(y), stats)
+    x, y = abs(x), abs(y)
+    if stats is not None:
+        stats.count("calls")
+    if min(x.bit_length(), y.bit_length()) <= KARATSUBA_CUTOFF_BITS:
+        return _base_case(x, y, stats)
+    t = perf_counter() if stats is not None else 0.0
+    product = _fft_product(x, y)
+    if stats is not None:
+        stats.count("ffts")
+        stats.lap("fft", t)
+    if product is not None:
+        return product
+    m = max(x.bit_length(), y.bit_length()) // 2
+    high1, low1 = _split(x, m)
+    high2, low2 = _split(y, m)
+    if stats is not None:
+        stats.count("precision_splits")
+        stats.descend()
+    z0 = fft_multiply(low1, low2, stats)
+    z1 = fft_multiply(low1 + high1, low2 + high2, stats)
+    z2 = fft_multiply(high1, high2, stats)
+    if stats is not None:
+        stats.ascend()
+    return (z2 << (2 * m)) + ((z1 - z2 - z0) << m) + z0
+
+
+# ----------------------------- PARALLEL KARATSUBA -----------------------------
+# The top ``depth`` Karatsuba levels are expanded in the parent into 3**depth
+# independent subproducts, which are multiplied concurrently in worker processes
+# and recombined on the way back up.
+
+PARALLEL_MIN_BITS = 1 << 20
+PARALLEL_DEPTH = 1
+
+_pool = None
+
+
+def worker_pool(workers=None):
+    """Process pool shared by parallel multiplications, created on first use."""
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _leaf_product(x, y, method):
+    return multiply(x, y, method)
+
+
+def _plan(x, y, depth, min_bits, leaves):
+    """Expand Karatsuba levels into leaf operand pairs; returns a recombination tree."""
+    if depth == 0 or min(x.bit_length(), y.bit_length()) < min_bits:
+        leaves.append((x, y))
+        return len(leaves) - 1
+    m = max(x.bit_length(), y.bit_length()) // 2
+    high1, low1 = _split(x, m)
+    high2, low2 = _split(y, m)
+    return (m,
+            _plan(low1, low2, depth - 1, min_bits, leaves),
+            _plan(low1 + high1, low2 + high2, depth - 1, min_bits, leaves),
+            _plan(high1, high2, depth - 1, min_bits, leaves))
+
+
+def _recombine(node, products):
+    if isinstance(node, int):
+        return products[node]
+    m, low, mid, high = node
+    z0 = _recombine(low, products)
+    z1 = _recombine(mid, products)
+    z2 = _recombine(high, products)
+    return (z2 << (2 * m)) + ((z1 - z2 - z0) << m) + z0
+
+
+def karatsuba_parallel(x: int, y: int, depth: int = PARALLEL_DEPTH,
+                       min_bits: int = PARALLEL_MIN_BITS, executor=None, leaf_method: str = "auto",
+                       stats=None) -> int:
+    """Karatsuba whose top ``depth`` levels of subproducts run in a process pool.
+
+    Subproducts with an operand under ``min_bits`` bits are not split further;
+    leaves are multiplied with ``multiply(..., leaf_method)``. ``executor``
+    defaults to the shared ``worker_pool()`` so workers are reused across calls.
+    ``stats`` (an optional ``instrument.Instrumentation``) counts leaves and
+    times the plan, leaves and recombine phases; workers are not instrumented,
+    while a single-leaf run is instrumented by its ``leaf_method``.
+    """
+    if (x < 0) != (y < 0):
+        return -karatsuba_parallel(abs(x), abs(y), depth, min_bits, executor, leaf_method, stats)
+    x, y = abs(x), abs(y)
+    t = perf_counter() if stats is not None else 0.0
+    leaves = []
+    tree = _plan(x, y, depth, min_bits, leaves)
+    if len(leaves) == 1:
+        return multiply(x, y, leaf_method, stats)
+    pool = executor or worker_pool()
+    if stats is not None:
+        t = stats.lap("plan", t)
+        stats.count("leaves", len(leaves))
+    futures = [pool.submit(_leaf_product, a, b, leaf_method) for a, b in leaves]
+    products = [f.result() for f in futures]
+    if stats is not None:
+        t = stats.lap("leaves", t)
+    product = _recombine(tree, products)
+    if stats is not None:
+        stats.lap("recombine", t)
+    return product
+
+
+# ----------------------------- MEMOIZED KARATSUBA -----------------------------
+# Subproducts whose smaller operand has at least ``min_bits`` bits are cached by
+# operand pair in a byte-bounded LRU, so repeated digit patterns and repeated
+# calls with the same operands reuse earlier work. ``FixedMultiplier`` also keeps
+# the Karatsuba split tree of one constant so it is never re-split, and for
+# large constants the constant's FFT spectrum, so each call pays for two of the
+# three transforms of an FFT product.
+
+MEMO_MIN_BITS = KARATSUBA_CUTOFF_BITS
+MEMO_MAX_BYTES = 64 << 20
+# FixedMultiplier goes through the cached spectrum once both operands reach this size
+FIXED_FFT_MIN_BITS = AUTO_FFT_MIN_BITS
+
+_memo = None
+
+
+def _entry_bytes(product):
+    # The product plus its two operand keys take about twice the product's size
+    return 2 * ((product.bit_length() + 7) // 8) + 64
+
+
+class KaratsubaMemo(LRUCache):
+    """LRU of Karatsuba subproducts, charged by operand size and bounded by ``max_bytes``."""
+
+    def __init__(self, max_bytes=MEMO_MAX_BYTES, min_bits=MEMO_MIN_BITS):
+        super().__init__(max_bytes=max_bytes, sizeof=_entry_bytes)
+        self.min_bits = min_bits
+
+    def key(self, x, y):
+        """Cache key for x*y, or None when the subproduct is too small to be worth caching."""
+        if min(x.bit_length(), y.bit_length()) < self.min_bits:
+            return None
+        return (x, y) if x <= y else (y, x)
+
+
+def shared_memo():
+    """Memo shared by ``multiply(method="memo")`` calls, created on first use."""
+    global _memo
+    if _memo is None:
+        _memo = KaratsubaMemo()
+    return _memo
+
+
+def _memo_rec(x, y, memo, cutoff, stats):
+    if stats is not None:
+        stats.count("calls")
+    n = max(x.bit_length(), y.bit_length())
+    if n <= cutoff or min(x.bit_length(), y.bit_length()) <= cutoff // 2:
+        return _base_case(x, y, stats)
+    key = memo.key(x, y)
+    if key is not None:
+        product = memo.get(key)
+        if product is not None:
+            if stats is not None:
+                stats.count("memo_hits")
+            return product
+    m = n // 2
+    high1, low1 = _split(x, m)
+    high2, low2 = _split(y, m)
+    if stats is not None:
+        stats.descend()
+    z0 = _memo_rec(low1, low2, memo, cutoff, stats)
+    z1 = _memo_rec(low1 + high1, low2 + high2, memo, cutoff, stats)
+    z2 = _memo_rec(high1, high2, memo, cutoff, stats)
+    if stats is not None:
+        stats.ascend()
+    product = (z2 << (2 * m)) + ((z1 - z2 - z0) << m) + z0
+    if key is not None:
+        memo.put(key, product)
+    return product
+
+
+def karatsuba_memo(x: int, y: int, memo: KaratsubaMemo = None, cutoff: int = KARATSUBA_CUTOFF_BITS,
+                   stats=None) -> int:
+    """Binary Karatsuba that reuses cached subproducts (``shared_memo()`` by default).
+
+    ``stats`` is instrumented as in ``karatsuba_binary``, plus a memo_hits counter.
+    """
+    return _memo_rec(x, y, shared_memo() if memo is None else memo, cutoff, stats)
+
+
+class FixedMultiplier:
+    """Multiplies many operands by one constant, reusing work done on the constant.
+
+    Operands and constants of at least ``FIXED_FFT_MIN_BITS`` bits are multiplied
+    by FFT against the constant's spectrum, computed once per transform size, so
+    a call costs one forward and one inverse transform instead of three.
+    Otherwise the constant is split once into a tree of (low, low + high, high)
+    parts and each call only splits the other operand at the tree's bit
+    positions; that saves little, since splitting is linear. Operands much
+    longer than the constant are cut into constant-sized blocks. ``memo``
+    optionally caches tree subproducts across calls as in ``karatsuba_memo``.
+    """
+
+    def __init__(self, constant: int, cutoff: int = KARATSUBA_CUTOFF_BITS, memo: KaratsubaMemo = None):
+        self.constant = constant
+        self.cutoff = cutoff
+        self.memo = memo
+        self.block_bits = max(abs(constant).bit_length(), 1)
+        self.tree = self._build(abs(constant))
+        self.limbs = _to_limbs(abs(constant)) if self.block_bits >= FIXED_FFT_MIN_BITS else None
+        self.spectra = {}
+        self.calls = 0
+        self.splits_reused = 0
+        self.spectra_reused = 0
+
+    def _fft_mul(self, x):
+        """x * constant against the cached constant spectrum, or None if precision runs out."""
+        import numpy as np
+
+        a = _to_limbs(x)
+        n = len(a) + len(self.limbs) - 1
+        size = _fft_size(n)
+        spectrum = self.spectra.get(size)
+        if spectrum is None:
+            spectrum = self.spectra[size] = np.fft.rfft(self.limbs, size)
+        else:
+            self.spectra_reused += 1
+        return _spectrum_product(a, spectrum, n, size)
+
+    def _build(self, c):
+        if c.bit_length() <= self.cutoff:
+            return c
+        m = c.bit_length() // 2
+        high, low = _split(c, m)
+        return (m, c, self._build(low), self._build(low + high), self._build(high))
+
+    def _mul(self, x, node):
+        if isinstance(node, int):
+            return x * node
+        m, c, low, mid, high = node
+        if x.bit_length() <= self.cutoff // 2:
+            return x * c
+        key = self.memo.key(x, c) if self.memo is not None else None
+        if key is not None:
+            product = self.memo.get(key)
+            if product is not None:
+                return product
+        self.splits_reused += 1
+        high1, low1 = _split(x, m)
+        if high1 == 0:
+            # Unbalanced: x fits below the split, so only two subproducts are needed
+            product = self._mul(x, low) + (self._mul(x, high) << m)
+        else:
+            z0 = self._mul(low1, low)
+            z1 = self._mul(low1 + high1, mid)
+            z2 = self._mul(high1, high)
+            product = (z2 << (2 * m)) + ((z1 - z2 - z0) << m) + z0
+        if key is not None:
+            self.memo.put(key, product)
+        return product
+
+    def __call__(self, x: int) -> int:
+        """Return x * constant."""
+        self.calls += 1
+        if (x < 0) != (self.constant < 0):
+            return -self._unsigned(abs(x))
+        return self._unsigned(abs(x))
+
+    def _block(self, x):
+        if self.limbs is not None and x.bit_length() >= FIXED_FFT_MIN_BITS:
+            product = self._fft_mul(x)
+            if product is not None:
+                return product
+        return self._mul(x, self.tree)
+
+    def _unsigned(self, x):
+        b = self.block_bits
+        if x.bit_length() <= 2 * b:
+            return self._block(x)
+        total, shift, mask = 0, 0, (1 << b) - 1
+        while x:
+            total += self._block(x & mask) << shift
+            x >>= b
+            shift += b
+        return total
+
+    def stats(self):
+        """Call count, precomputed split and spectrum reuse and memo hit rates as a dict."""
+        stats = {"calls": self.calls, "splits_reused": self.splits_reused, "spectra_reused": self.spectra_reused}
+        if self.memo is not None:
+            stats["memo"] = self.memo.stats()
+        return stats
+
+
+def _native(x, y, stats=None):
+    if stats is not None:
+        stats.count("calls")
+    return _base_case(x, y, stats)
+
+
+MULTIPLY_METHODS = {
+    "native": _native,
+    "reference": karatsuba,
+    "karatsuba": karatsuba_binary,
+    "toom3": toom3,
+    "fft": fft_multiply,
+    "parallel": karatsuba_parallel,
+    "memo": karatsuba_memo,
+}
+
+
+def _auto_method(x, y):
+    bits = min(x.bit_length(), y.bit_length())
+    if bits >= AUTO_FFT_MIN_BITS:
+        return "fft"
+    if bits >= AUTO_TOOM3_MIN_BITS:
+        return "toom3"
+    return "native"
+
+
+def multiply(x: int, y: int, method: str = "auto", stats=None) -> int:
+    """Multiply two integers with the selected engine.
+
+    ``method`` is a key of ``MULTIPLY_METHODS`` or ``"auto"``, which picks native,
+    Toom-3 or FFT multiplication by operand size. ``stats`` is passed on to the
+    engine when given.
+    """
+    if method == "auto":
+        method = _auto_method(abs(x), abs(y))
+    try:
+        engine = MULTIPLY_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown multiplication method: {method!r}") from None
+    kwargs = {} if stats is None else {"stats": stats}
+    if (x < 0) != (y < 0):
+        return -engine(abs(x), abs(y), **kwargs)
+    return engine(abs(x), abs(y), **kwargs)
@@ -0,0 +1,177 @@
+# algorithms/service.py
+"""Local HTTP solve service built on asyncio streams (standard library only).
+
+    python -m algorithms.service --port 8765 --workers 4
+
+POST the usual input file text to ``/closest-pair`` or ``/multiply``
+(optionally ``?engine=<name>``); the response is JSON. ``GET /stats`` reports
+cache and request counters. Solving runs in a process pool; identical
+requests in flight share one computation, and finished responses are cached
+by content hash in a size-bounded LRU.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from algorithms.cache import LRUCache, content_hash
+
+CACHE_MAX_BYTES = 64 << 20
+MAX_BODY_BYTES = 256 << 20
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large"}
+
+
+# ----------------------------- WORKER-SIDE SOLVERS -----------------------------
+
+def _init_worker():
+    sys.set_int_max_str_digits(0)
+
+
+def _solve_closest_pair(body, engine):
+    from algorithms.closest_pair import parse_points_file_content, solve_closest_pair
+
+    points = parse_points_file_content(body.decode())
+    pair, dist = solve_closest_pair(points, engine)
+    result = {"n": len(points), "pair": pair, "distance": dist if pair is not None else None}
+    return json.dumps(result).encode()
+
+
+def _solve_multiply(body, engine):
+    from algorithms.karatsuba import parse_integers_file_content
+    from algorithms.multiply import multiply
+
+    x, y = parse_integers_file_content(body.decode())
+    return json.dumps({"product": str(multiply(x, y, engine))}).encode()
+
+
+ROUTES = {
+    "/closest-pair": _solve_closest_pair,
+    "/multiply": _solve_multiply,
+}
+
+
+# ----------------------------- SERVER -----------------------------
+
+class SolveService:
+    """Request coalescing and result caching in front of a process pool."""
+
+    def __init__(self, workers=None, cache_bytes=CACHE_MAX_BYTES):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.cache = LRUCache(max_bytes=cache_bytes)
+        self.inflight = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    async def solve(self, path, engine, body):
+        key = content_hash(path, engine, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, ROUTES[path], body, engine)
+        self.inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self.inflight[key]
+        self.cache.put(key, result)
+        return result
+
+    def stats(self):
+        return {"requests": self.requests, "coalesced": self.coalesced,
+                "inflight": len(self.inflight), "cache": self.cache.stats()}
+
+    async def handle(self, method, target, body):
+        """Returns (status, JSON body bytes)."""
+        url = urlsplit(target)
+        if url.path == "/stats" and method == "GET":
+            return 200, json.dumps(self.stats()).encode()
+        if url.path not in ROUTES:
+            return 404, json.dumps({"error": f"unknown path {url.path}"}).encode()
+        if method != "POST":
+            return 405, json.dumps({"error": "use POST with the input file as body"}).encode()
+        self.requests += 1
+        engine = parse_qs(url.query).get("engine", ["auto"])[0]
+        try:
+            return 200, await self.solve(url.path, engine, body)
+        except ValueError as e:
+            return 400, json.dumps({"error": str(e)}).encode()
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, json.dumps({"error": "request body too large"}).encode()
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.handle(method, target, body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, cache_bytes=CACHE_MAX_BYTES):
+    service = SolveService(workers, cache_bytes)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Serving on http://{host}:{port} ({workers or os.cpu_count()} workers)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m algorithms.service",
+                                     description="Serve /closest-pair and /multiply over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="solver processes (default: CPU count)")
+    parser.add_argument("--cache-mb", type=float, default=CACHE_MAX_BYTES / 2**20,
+                        help="result cache size limit in MiB")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, int(args.cache_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# algorithms/trace.py
+"""Step traces recorded once so visualizations can replay them without recomputation."""
+
+import math
+from array import array
+from bisect import bisect_left
+
+
+class Trace:
+    """Recorded step events plus the generator's return value."""
+
+    def __init__(self, events, result):
+        self.events = events
+        self.result = result
+
+    def __len__(self):
+        return len(self.events)
+
+    def __getitem__(self, index):
+        return self.events[index]
+
+    def __iter__(self):
+        return iter(self.events)
+
+
+def record_trace(gen):
+    """Drain a step generator (``closest_pair(..., visualize=True)``, ``karatsuba_steps``) into a Trace."""
+    events = []
+    while True:
+        try:
+            events.append(next(gen))
+        except StopIteration as stop:
+            return Trace(events, stop.value)
+
+
+# ----------------------------- COMPACT COLUMNAR TRACES -----------------------------
+# Instead of one dict per step holding copied point lists or huge integers, each
+# event is a fixed-width row of typed columns that refers to shared data by index
+# (a range of the x-sorted point array, a node ID). Decoding back to the dict
+# format of the step generators happens only for the step being shown.
+
+NO_INDEX = -1
+
+
+class ClosestPairTrace:
+    """Closest pair steps as columns referencing one shared x-sorted point array.
+
+    Column meaning per event kind:
+
+    - split: ``a``/``b`` bound the subproblem range, ``x`` is the split line
+    - bruteforce: ``a``/``b`` bound the block, ``value`` is the best distance
+    - compare: ``p``/``q`` are the compared points, ``value`` their distance
+    - strip: ``a``/``b`` give offset and length in ``strip_pool``, ``p``/``q``
+      the current best pair (or NO_INDEX), ``x`` the split line, ``value`` the best
+    - result: ``p``/``q`` are the closest pair, ``value`` its distance
+    - summary: a subproblem solved below the recorded level of detail;
+      ``a``/``b`` bound it, ``p``/``q``/``value`` give its best pair and
+      ``x`` is unused; its counters live in the ``summary_*`` columns
+    """
+
+    KINDS = ('split', 'bruteforce', 'compare', 'strip', 'result', 'summary')
+    SPLIT, BRUTEFORCE, COMPARE, STRIP, RESULT, SUMMARY = range(6)
+
+    def __init__(self, points=None):
+        self.points = points
+        self.kind = array('B')
+        self.a = array('i')
+        self.b = array('i')
+        self.p = array('i')
+        self.q = array('i')
+        self.x = array('d')
+        self.value = array('d')
+        self.strip_pool = array('i')
+        # One row per summary event, in event order
+        self.summary_event = array('i')
+        self.summary_depth = array('H')
+        self.summary_comparisons = array('q')
+        self.summary_strip_points = array('q')
+        self.summary_calls = array('q')
+        self.result = None
+
+    def add(self, kind, a=NO_INDEX, b=NO_INDEX, p=NO_INDEX, q=NO_INDEX, x=math.nan, value=math.nan):
+        self.kind.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+        self.p.append(p)
+        self.q.append(q)
+        self.x.append(x)
+        self.value.append(value)
+
+    def add_summary(self, lo, hi, p, q, best, depth, comparisons, strip_points, calls):
+        self.summary_event.append(len(self.kind))
+        self.summary_depth.append(depth)
+        self.summary_comparisons.append(comparisons)
+        self.summary_strip_points.append(strip_points)
+        self.summary_calls.append(calls)
+        self.add(self.SUMMARY, lo, hi, p, q, value=best)
+
+    def add_strip(self, indices):
+        """Store strip member indices once; returns their offset in ``strip_pool``."""
+        offset = len(self.strip_pool)
+        self.strip_pool.extend(indices)
+        return offset
+
+    def nbytes(self):
+        columns = (self.kind, self.a, self.b, self.p, self.q, self.x, self.value, self.strip_pool,
+                   self.summary_event, self.summary_depth, self.summary_comparisons,
+                   self.summary_strip_points, self.summary_calls)
+        points = getattr(self.points, 'nbytes', 0)
+        return sum(c.itemsize * len(c) for c in columns) + points
+
+    def _point(self, i):
+        return tuple(self.points[i].tolist())
+
+    def _pair(self, i):
+        if self.p[i] == NO_INDEX:
+            return None
+        return self._point(self.p[i]), self._point(self.q[i])
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, i):
+        """Decode event i into the dict format yielded by ``closest_pair``."""
+        kind = self.kind[i]
+        if kind == self.SPLIT:
+            lo, hi = self.a[i], self.b[i]
+            mid = lo + (hi - lo) // 2
+            return {"type": "split", "x": self.x[i],
+                    "left": self.points[lo:mid], "right": self.points[mid:hi]}
+        if kind == self.BRUTEFORCE:
+            return {"type": "bruteforce", "points": self.points[self.a[i]:self.b[i]],
+                    "best": self.value[i]}
+        if kind == self.COMPARE:
+            return {"type": "compare", "pair": self._pair(i), "dist": self.value[i]}
+        if kind == self.STRIP:
+            members = self.strip_pool[self.a[i]:self.a[i] + self.b[i]]
+            return {"type": "strip", "pair": self._pair(i), "x": self.x[i],
+                    "strip": self.points[list(members)], "best": self.value[i]}
+        if kind == self.SUMMARY:
+            row = bisect_left(self.summary_event, i)
+            return {"type": "summary", "points": self.points[self.a[i]:self.b[i]],
+                    "pair": self._pair(i), "best": self.value[i],
+                    "depth": self.summary_depth[row],
+                    "comparisons": self.summary_comparisons[row],
+                    "strip_points": self.summary_strip_points[row],
+                    "subproblems": self.summary_calls[row]}
+        return {"type": "result", "pair": self._pair(i), "best": self.value[i]}
+
+
+class KaratsubaTrace:
+    """Karatsuba steps as (kind, node ID) rows over a table of recursion nodes.
+
+    Each node stores its operands once; split parts, subproducts and products
+    are recomputed from them when an event is decoded.
+    """
+
+    KINDS = ('base', 'split', 'combine')
+    BASE, SPLIT, COMBINE = range(3)
+
+    def __init__(self):
+        self.kind = array('B')
+        self.node = array('i')
+        self.node_x = []
+        self.node_y = []
+        self.parent = array('i')
+        self.depth = array('H')
+        self.split_digits = array('i')
+        # Child node IDs holding the low (z0), high (z2) and mixed (z1) products
+        self.child_low = array('i')
+        self.child_high = array('i')
+        self.child_mid = array('i')
+        self.result = None
+        self._subtree_end = None
+        self._levels = None
+
+    def add_node(self, x, y, parent, depth):
+        self.node_x.append(x)
+        self.node_y.append(y)
+        self.parent.append(parent)
+        self.depth.append(depth)
+        self.split_digits.append(NO_INDEX)
+        self.child_low.append(NO_INDEX)
+        self.child_high.append(NO_INDEX)
+        self.child_mid.append(NO_INDEX)
+        return len(self.node_x) - 1
+
+    def add(self, kind, node):
+        self.kind.append(kind)
+        self.node.append(node)
+
+    def nbytes(self):
+        columns = (self.kind, self.node, self.parent, self.depth, self.split_digits,
+                   self.child_low, self.child_high, self.child_mid)
+        operands = sum(x.bit_length() + y.bit_length() for x, y in zip(self.node_x, self.node_y)) // 8
+        return sum(c.itemsize * len(c) for c in columns) + operands + 2 * 36 * len(self.node_x)
+
+    def _product(self, node):
+        return self.node_x[node] * self.node_y[node]
+
+    # Nodes are numbered in preorder, so a subtree is a contiguous ID range
+
+    def subtree_end(self, node):
+        """One past the last node ID in node's subtree."""
+        if self._subtree_end is None:
+            ends = array('i', [len(self.node_x)]) * len(self.node_x)
+            open_nodes = []
+            for v, d in enumerate(self.depth):
+                while open_nodes and self.depth[open_nodes[-1]] >= d:
+                    ends[open_nodes.pop()] = v
+                open_nodes.append(v)
+            self._subtree_end = ends
+        return self._subtree_end[node]
+
+    def nodes_within(self, root, levels):
+        """Preorder IDs of root's subtree down to ``levels`` below root."""
+        limit = self.depth[root] + levels
+        depth = self.depth
+        return [v for v in range(root, self.subtree_end(root)) if depth[v] <= limit]
+
+    def events_within(self, max_depth):
+        """Indices of the events whose node is at most ``max_depth`` deep."""
+        depth, node = self.depth, self.node
+        return [i for i in range(len(self.kind)) if depth[node[i]] <= max_depth]
+
+    def is_leaf(self, node):
+        return self.split_digits[node] == NO_INDEX
+
+    def level_stats(self):
+        """Per-depth aggregates: subproblems, base cases and the largest operand in digits."""
+        if self._levels is None:
+            levels = []
+            for v, d in enumerate(self.depth):
+                if d == len(levels):
+                    levels.append({"depth": d, "subproblems": 0, "base_cases": 0, "max_digits": 0})
+                row = levels[d]
+                row["subproblems"] += 1
+                row["base_cases"] += self.is_leaf(v)
+                digits = len(str(max(self.node_x[v], self.node_y[v])))
+                row["max_digits"] = max(row["max_digits"], digits)
+            self._levels = levels
+        return self._levels
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, i):
+        """Decode event i into the dict format yielded by ``karatsuba_steps``."""
+        node = self.node[i]
+        x, y = self.node_x[node], self.node_y[node]
+        meta = {"node": node, "depth": self.depth[node]}
+        kind = self.kind[i]
+        if kind == self.BASE:
+            return {"type": "base", "x": x, "y": y, "product": x * y, **meta}
+        if kind == self.SPLIT:
+            power = 10 ** self.split_digits[node]
+            high_x, low_x = divmod(x, power)
+            high_y, low_y = divmod(y, power)
+            return {"type": "split", "x": x, "y": y,
+                    "high_x": high_x, "low_x": low_x,
+                    "high_y": high_y, "low_y": low_y, **meta}
+        return {"type": "combine", "x": x, "y": y,
+                "z2": self._product(self.child_high[node]),
+                "z1": self._product(self.child_mid[node]),
+                "z0": self._product(self.child_low[node]),
+                "product": x * y, **meta}
@@ -1,10 +1,36 @@
 # app.py
+import hashlib
+import os
+import sys
+import threading
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import time
-from algorithms.closest_pair import parse_points_file_content, closest_pair
-from algorithms.karatsuba import parse_integers_file_content, karatsuba_steps
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from algorithms.cache import DiskStore, ResultCache
+from algorithms.closest_pair import (METRICS, all_nearest_neighbors, closest_pair_iterative, closest_pair_nd,
+                                     k_closest_pairs, parse_points_file_content, parse_vectors_file_content,
+                                     record_closest_pair)
+from algorithms.karatsuba import karatsuba, parse_integers_file_content, record_karatsuba
+from algorithms.instrument import Instrumentation
+from visualization import DISPLAY_MAX_POINTS, ClosestPairRenderer, render_neighbors_png, render_vectors_png
+
+# Rendered animation frames kept across reruns and sessions (LRU-evicted)
+FRAME_CACHE_SIZE = 2048
+# Most recent Karatsuba steps listed under the animation
+KARATSUBA_HISTORY_ROWS = 25
+# Karatsuba recursion-tree nodes rendered per page
+TREE_PAGE_NODES = 120
+# Digits kept at each end of a long integer in step text
+NUMBER_EDGE_DIGITS = 6
+# Seconds between progress refreshes of a background computation
+PROGRESS_POLL_SECONDS = 0.25
+# Shared cache of parsed inputs, results and traces; the disk tier is used only
+# when DCV_CACHE_DIR is set
+MEMORY_CACHE_BYTES = int(float(os.environ.get("DCV_CACHE_MB", 256)) * 2**20)
+DISK_CACHE_BYTES = int(float(os.environ.get("DCV_DISK_CACHE_MB", 1024)) * 2**20)
+
+# Uploaded integers and products beyond 4300 digits are parsed and shown in decimal
+sys.set_int_max_str_digits(0)
 
 
 st.set_page_config(page_title="D&C Visualizer", layout="wide")
@@ -144,9 +170,12 @@ with left_col:
     st.markdown("""
     - **Closest Pair**: lines `x y` or first line `N` then `N` lines of `x y`  
     - **Integer Multiplication**: lines `a b` or a single line `a b`  
+    - **Closest Pair in d dimensions**: lines of `d` coordinates, e.g. `x y z`  
     """, unsafe_allow_html=True)
 
-    algo = st.radio("Choose algorithm", ("Closest Pair (points)", "Integer Multiplication (Karatsuba)"),
+    algo = st.radio("Choose algorithm", ("Closest Pair (points)", "Integer Multiplication (Karatsuba)",
+                                         "Nearest Neighbors & k Closest Pairs (points)",
+                                         "Closest Pair in d Dimensions (vectors)"),
                     index=0, key="algo_choice")
 
     run_button = st.button("Begin Visualization", use_container_width=True)
@@ -155,6 +184,15 @@ with left_col:
     st.subheader("Display Options")
     show_steps = st.checkbox("Show textual steps while visualizing", value=True)
     delay = st.slider("Animation delay (seconds/frame)", 0.05, 1.0, 0.25, 0.05)
+    trace_depth = st.slider("Recursion depth traced step by step", 0, 20, 8,
+                            help="Deeper subproblems still run in full but are shown as one summary step "
+                                 "(closest pair) or skipped by the animation (Karatsuba).")
+    tree_levels = st.slider("Karatsuba tree levels shown", 1, 12, 3)
+    k_pairs = st.number_input("k closest pairs", min_value=1, max_value=1_000_000, value=10)
+    metric = st.selectbox("Distance metric (d dimensions)", METRICS)
+    show_instrumentation = st.checkbox("Show instrumentation panel", value=False,
+                                       help="Re-runs the reference algorithm with counters and phase timers.")
+    cache_container = st.container()
 
     st.markdown("---")
     st.markdown("**Sample files**: Option 02: Paste text below and press Begin.")
@@ -174,127 +212,435 @@ with left_col:
 
 with right_col:
     st.subheader("Visualization")
+    job_container = st.container()
+    player_container = st.container()
     viz_placeholder = st.empty()
     steps_placeholder = st.empty()
     info_placeholder = st.empty()
-
-# Utility: small plotting helpers
-def plot_points(points, highlights=None, split_x=None, title=None):
-    fig, ax = plt.subplots(figsize=(6,6))
-    ax.set_facecolor("#F5E6D3")  
-    ax.tick_params(colors="#6B4C3B")  
-    ax.spines['bottom'].set_color('#6B4C3B')  
-    ax.spines['left'].set_color('#6B4C3B')
-    ax.spines['top'].set_color('#F5E6D3')  
-    ax.spines['right'].set_color('#F5E6D3')  
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    ax.scatter(xs, ys, s=30, c='#CBB28A', edgecolors='#8C6A4A', linewidths=0.6)
-    if highlights:
-        ax.scatter([highlights[0][0], highlights[1][0]],
-                   [highlights[0][1], highlights[1][1]],
-                   s=80, c='#FFD580', edgecolors='#D4A373', linewidths=1.2)
-        ax.plot([highlights[0][0], highlights[1][0]], [highlights[0][1], highlights[1][1]], color='#FFD580', linewidth=1.5)
-    if split_x is not None:
-        ax.axvline(split_x, color='#6B4C3B', linestyle='--', linewidth=1)
-    if title:
-        ax.set_title(title, color="#6B4C3B", fontfamily='Poppins', fontweight=500) 
-    plt.tight_layout()
-    return fig
-
-def visualize_closest_pair(content: str, visualize=False):
-    pts = parse_points_file_content(content)
+    tree_container = st.container()
+    instrumentation_container = st.container()
+
+def content_key(content: str):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+@st.cache_resource(show_spinner=False)
+def shared_cache():
+    """Parsed inputs, results and traces keyed by content hash, shared by every session."""
+    directory = os.environ.get("DCV_CACHE_DIR")
+    return ResultCache(MEMORY_CACHE_BYTES, DiskStore(directory, DISK_CACHE_BYTES) if directory else None)
+
+def parse_points(content):
+    return shared_cache().get_or_compute("parsed", ("points", content_key(content)),
+                                         lambda: parse_points_file_content(content))
+
+def parse_integers(content):
+    return shared_cache().get_or_compute("parsed", ("integers", content_key(content)),
+                                         lambda: parse_integers_file_content(content))
+
+def parse_vectors(content):
+    return shared_cache().get_or_compute("parsed", ("vectors", content_key(content)),
+                                         lambda: parse_vectors_file_content(content))
+
+def closest_pair_trace(key, depth, pts, progress=None):
+    """Step trace of closest_pair for one input, recorded once and shared across sessions."""
+    return shared_cache().get_or_compute("trace", ("closest_pair", key, depth),
+                                         lambda: record_closest_pair(pts, max_depth=depth, progress=progress))
+
+def karatsuba_trace(key, x, y, progress=None):
+    return shared_cache().get_or_compute("trace", ("karatsuba", key),
+                                         lambda: record_karatsuba(x, y, progress=progress))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def karatsuba_tree_nodes(key, root, levels, _trace):
+    return _trace.nodes_within(root, levels)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def karatsuba_animation_events(key, depth, _trace):
+    return _trace.events_within(depth)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def closest_pair_renderer(key, _pts):
+    """Figure with the base scatter drawn once per input; steps only update overlays."""
+    return ClosestPairRenderer(_pts)
+
+@st.cache_data(max_entries=FRAME_CACHE_SIZE, show_spinner=False)
+def closest_pair_frame(key, depth, index, _renderer, _step):
+    """PNG of one closest pair step, keyed by input hash + step index."""
+    return _renderer.render_png(_step)
+
+def describe_closest_pair_step(step):
+    if step['type'] == 'split':
+        return f"Split at x = **{step['x']:.3f}** into left ({len(step['left'])}) / right ({len(step['right'])})"
+    if step['type'] == 'bruteforce':
+        return f"Brute force on {len(step['points'])} points. Best = **{step['best']:.4f}**"
+    if step['type'] == 'compare':
+        return f"Comparing points: {step['pair'][0]} and {step['pair'][1]} → d = **{step['dist']:.4f}**"
+    if step['type'] == 'strip':
+        return f"Strip around x={step['x']:.3f}, strip size={len(step['strip'])}, current best={step['best']:.4f}"
+    if step['type'] == 'summary':
+        return (f"Subproblem of {len(step['points'])} points at depth {step['depth']} solved in "
+                f"{step['subproblems']} calls: {step['comparisons']} comparisons, "
+                f"{step['strip_points']} strip points. Best = **{step['best']:.4f}**")
+    return f"**Result**: closest pair = {step['pair']} with distance **{step['best']:.4f}**"
+
+def visualize_closest_pair(content: str):
+    pts = parse_points(content)
     if len(pts) < 2:
         st.warning("Need at least 2 points.")
         return
 
-    # Option to subsample if file too large for animation
-    max_points = 200
-    if len(pts) > max_points:
-        st.info(f"Too many points for step-by-step animation ({len(pts)}). Subsampling to {max_points}.")
-        pts = pts[:max_points]
-
-    gen = closest_pair(pts, visualize=True)
-
-    last_highlight = None
-    # step loop
-    for step in gen:
-        if show_steps:
-            steps_placeholder.markdown("### Steps")
-        if step['type'] == 'split':
-            # plot points and split line
-            fig = plot_points(pts, highlights=None, split_x=step['x'], title=f"Splitting at x={step['x']:.2f}")
-            viz_placeholder.pyplot(fig)
-            if show_steps:
-                steps_placeholder.write(f"Split at x = **{step['x']:.3f}** into left ({len(step['left'])}) / right ({len(step['right'])})")
-        elif step['type'] == 'bruteforce':
-            fig = plot_points(step['points'], title="Brute force block (small set)")
-            viz_placeholder.pyplot(fig)
-            if show_steps:
-                steps_placeholder.write(f"Brute force on {len(step['points'])} points. Best = **{step['best']:.4f}**")
-        elif step['type'] == 'compare':
-            fig = plot_points(pts, highlights=step['pair'], title=f"Comparing pair dist={step['dist']:.4f}")
-            viz_placeholder.pyplot(fig)
-            if show_steps:
-                steps_placeholder.write(f"Comparing points: {step['pair'][0]} and {step['pair'][1]} → d = **{step['dist']:.4f}**")
-        elif step['type'] == 'strip':
-            fig = plot_points(pts, highlights=step['pair'], split_x=step['x'], title=f"Strip check, best = {step['best']:.4f}")
-            viz_placeholder.pyplot(fig)
-            if show_steps:
-                steps_placeholder.write(f"Strip around x={step['x']:.3f}, strip size={len(step['strip'])}, current best={step['best']:.4f}")
-        elif step['type'] == 'result':
-            fig = plot_points(pts, highlights=step['pair'], title=f"Final: d={step['best']:.4f}")
-            viz_placeholder.pyplot(fig)
-            if show_steps:
-                steps_placeholder.write(f"**Result**: closest pair = {step['pair']} with distance **{step['best']:.4f}**")
-        else:
-            # fallback
-            viz_placeholder.write(step)
-        time.sleep(delay)
-
-    info_placeholder.markdown("### Visualization complete")
-
-def visualize_karatsuba(content, viz_placeholder, steps_placeholder, info_placeholder, delay):
+    if len(pts) > DISPLAY_MAX_POINTS:
+        st.info(f"Running on all {len(pts)} points; the plot shows a decimated cloud of at most {DISPLAY_MAX_POINTS}.")
+
+    # Replays of the same input reuse the recorded trace and rendered frames
+    key = content_key(content)
+    depth = trace_depth
+    start_job("closest_pair", (key, depth), lambda progress: closest_pair_trace(key, depth, pts, progress),
+              key=key, depth=depth, pts=pts)
+
+def show_closest_pair_frame(player, cursor, at_end):
+    step = player["trace"][cursor]
+    renderer = closest_pair_renderer(player["key"], player["pts"])
+    st.image(closest_pair_frame(player["key"], player["depth"], cursor, renderer, step))
+    if show_steps:
+        st.markdown("### Steps")
+        st.write(describe_closest_pair_step(step))
+    if at_end:
+        st.markdown("### Visualization complete")
+
+def short_int(value):
+    """Integer as text, eliding the middle of long numbers."""
+    digits = str(abs(value))
+    if len(digits) <= 2 * NUMBER_EDGE_DIGITS + 3:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    return f"{sign}{digits[:NUMBER_EDGE_DIGITS]}…{digits[-NUMBER_EDGE_DIGITS:]} ({len(digits)} digits)"
+
+def describe_karatsuba_step(step):
+    if step["type"] == "base":
+        return f"Base case: {short_int(step['x'])} × {short_int(step['y'])} = **{short_int(step['product'])}**"
+    if step["type"] == "split":
+        return (f"Split (depth {step['depth']}): x → ({short_int(step['high_x'])}, {short_int(step['low_x'])}), "
+                f"y → ({short_int(step['high_y'])}, {short_int(step['low_y'])})")
+    return (f"Combine (depth {step['depth']}): z2={short_int(step['z2'])}, z1={short_int(step['z1'])}, "
+            f"z0={short_int(step['z0'])} → **{short_int(step['product'])}**")
+
+def visualize_karatsuba(content):
     try:
-        x, y = parse_integers_file_content(content)
+        x, y = parse_integers(content)
     except Exception as e:
         st.error(f"Error parsing input: {e}")
         return
 
-    viz_placeholder.markdown(f"### Visualizing Karatsuba: **{x} × {y}**")
-
-    gen = karatsuba_steps(x, y)
-    history = []
-
-    for step in gen:
-
-        if step["type"] == "base":
-            viz_placeholder.markdown(
-                f"**Base case:** {step['x']} × {step['y']} = **{step['product']}**"
-            )
-
-        elif step["type"] == "split":
-            viz_placeholder.markdown(
-                f"**Split Step:**<br>"
-                f"x={step['x']} → ({step['high_x']}, {step['low_x']})<br>"
-                f"y={step['y']} → ({step['high_y']}, {step['low_y']})",
-                unsafe_allow_html=True
-            )
+    key = content_key(content)
+    depth = trace_depth
+    start_job("karatsuba", (key, depth), lambda progress: karatsuba_trace(key, x, y, progress),
+              key=key, depth=depth, title=f"{short_int(x)} × {short_int(y)}")
+
+def show_karatsuba_frame(player, cursor, at_end):
+    trace, events = player["trace"], player["events"]
+    st.markdown(f"### Visualizing Karatsuba: **{player['title']}**")
+    if len(events) < len(trace):
+        st.info(f"Animating the {len(events)} steps down to depth {player['depth']} "
+                f"of {len(trace)}; the recursion tree below covers every level.")
+    index = events[cursor]
+    st.markdown(f"**Step {index + 1}/{len(trace)}** · {describe_karatsuba_step(trace[index])}")
+    if show_steps:
+        # Only a fixed window of formatted steps is rendered per frame
+        history = events[max(0, cursor - KARATSUBA_HISTORY_ROWS + 1):cursor + 1]
+        st.markdown("\n".join(f"- {describe_karatsuba_step(trace[i])}" for i in history))
+    if at_end:
+        st.markdown(f"### Final product: **{short_int(trace.result)}**")
+
+def karatsuba_node_label(trace, node):
+    x, y = trace.node_x[node], trace.node_y[node]
+    label = f"#{node} · depth {trace.depth[node]} · {short_int(x)} × {short_int(y)} = {short_int(x * y)}"
+    if not trace.is_leaf(node):
+        label += f" · split at 10^{trace.split_digits[node]}"
+    return label
+
+def karatsuba_tree_html(trace, nodes, last_level):
+    """Nested <details> blocks for a preorder run of nodes; nodes at last_level are not expandable."""
+    parts, open_depths = [], []
+    for node in nodes:
+        depth = trace.depth[node]
+        while open_depths and open_depths[-1] >= depth:
+            parts.append("</details>")
+            open_depths.pop()
+        label = karatsuba_node_label(trace, node)
+        if trace.is_leaf(node) or depth >= last_level:
+            parts.append(f"<div style='margin-left:1.2em'>{label}</div>")
+        else:
+            parts.append(f"<details style='margin-left:1.2em'><summary>{label}</summary>")
+            open_depths.append(depth)
+    parts.append("</details>" * len(open_depths))
+    return "".join(parts)
+
+def show_karatsuba_tree(player):
+    """Paged, depth-limited recursion tree plus per-level aggregates for one recorded trace."""
+    key, trace = player["key"], player["trace"]
+
+    with tree_container:
+        st.markdown("### Recursion tree")
+        st.dataframe(trace.level_stats(), hide_index=True)
+        root = st.number_input("Subtree root node", 0, len(trace.node_x) - 1, 0)
+        nodes = karatsuba_tree_nodes(key, root, tree_levels, trace)
+        pages = max(1, -(-len(nodes) // TREE_PAGE_NODES))
+        page = st.number_input(f"Page (of {pages})", 1, pages, 1)
+        start = (page - 1) * TREE_PAGE_NODES
+        st.caption(f"Nodes {start + 1}–{min(start + TREE_PAGE_NODES, len(nodes))} of {len(nodes)} "
+                   f"within {tree_levels} levels of node {root}")
+        page_nodes = nodes[start:start + TREE_PAGE_NODES]
+        st.markdown(karatsuba_tree_html(trace, page_nodes, trace.depth[root] + tree_levels),
+                    unsafe_allow_html=True)
+
+def show_instrumentation_panel(stats, derived):
+    """Counters, maxima and phase timers of one instrumented run."""
+    data = stats.as_dict()
+    with instrumentation_container.expander("Instrumentation", expanded=True):
+        metrics = {**data["counters"], **{f"max {k}": v for k, v in data["maxima"].items()}, **derived}
+        columns = st.columns(4)
+        for i, (name, value) in enumerate(metrics.items()):
+            columns[i % 4].metric(name.replace("_", " "), f"{value:,.2f}" if isinstance(value, float) else f"{value:,}")
+        total = sum(data["timers_s"].values()) or 1.0
+        st.dataframe([{"phase": name, "ms": seconds * 1e3, "share": f"{seconds / total:.0%}"}
+                      for name, seconds in data["timers_s"].items()], hide_index=True)
+        st.download_button("Download JSON", stats.to_json(indent=2), file_name="instrumentation.json",
+                           mime="application/json")
+
+def instrument_closest_pair(content):
+    pts = parse_points(content)
+    stats = Instrumentation()
+    closest_pair_iterative(pts, stats=stats)
+    n = max(len(pts), 2)
+    show_instrumentation_panel(stats, {"comparisons per point": stats.counters.get("comparisons", 0) / n,
+                                       "depth / log2 n": stats.maxima.get("depth", 0) / np.log2(n)})
+
+def instrument_karatsuba(content):
+    try:
+        x, y = parse_integers(content)
+    except Exception:
+        return
+    stats = Instrumentation()
+    karatsuba(x, y, stats=stats)
+    digits = max(stats.maxima.get("digits", 1), 2)
+    show_instrumentation_panel(stats, {"calls / digits^log2(3)": stats.counters["calls"] / digits ** np.log2(3)})
+
+def neighbor_queries(key, k, pts):
+    def compute():
+        neighbors, distances = all_nearest_neighbors(pts)
+        return neighbors, distances, k_closest_pairs(pts, k)
+    return shared_cache().get_or_compute("result", ("neighbors", key, k), compute)
+
+def visualize_neighbors(content):
+    pts = np.asarray(parse_points(content), dtype=np.float64).reshape(-1, 2)
+    if len(pts) < 2:
+        st.warning("Need at least 2 points.")
+        return
+    neighbors, distances, pairs = neighbor_queries(content_key(content), int(k_pairs), pts)
+    viz_placeholder.image(render_neighbors_png(pts, neighbors, pairs))
+    if show_steps:
+        rows = [{"rank": r + 1, "p": str(p), "q": str(q), "distance": d} for r, ((p, q), d) in enumerate(pairs[:100])]
+        steps_placeholder.dataframe(rows, hide_index=True)
+    info_placeholder.markdown(
+        f"### Nearest-neighbour distance: median **{np.median(distances):.4f}**, "
+        f"max **{distances.max():.4f}** over {len(pts)} points")
+
+def vector_closest_pair(key, metric, pts):
+    return shared_cache().get_or_compute("result", ("vectors", key, metric), lambda: closest_pair_nd(pts, metric))
+
+def visualize_vectors(content):
+    try:
+        pts = parse_vectors(content)
+    except ValueError as e:
+        st.error(f"Error parsing input: {e}")
+        return
+    if len(pts) < 2:
+        st.warning("Need at least 2 points.")
+        return
+    pair, dist = vector_closest_pair(content_key(content), metric, pts)
+    dim = pts.shape[1]
+    shown = "first three coordinates" if dim > 3 else f"{dim}D"
+    viz_placeholder.image(render_vectors_png(pts, pair, f"Closest pair ({metric}, {shown}): d={dist:.4f}"))
+    info_placeholder.markdown(f"### Closest pair of {len(pts)} points in {dim}D: {pair[0]} and {pair[1]}, "
+                              f"{metric} distance **{dist:.4f}**")
+
+def show_cache_stats():
+    """Hit/miss counters of the shared cache since the server started."""
+    stats = shared_cache().stats()
+    with cache_container.expander("Shared cache"):
+        rows = []
+        for kind, counts in stats["kinds"].items():
+            lookups = sum(counts.values())
+            hits = counts["memory_hits"] + counts["disk_hits"]
+            rows.append({"kind": kind, "memory hits": counts["memory_hits"], "disk hits": counts["disk_hits"],
+                         "misses": counts["misses"], "hit rate": f"{hits / lookups:.0%}"})
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        memory = stats["memory"]
+        columns = st.columns(3)
+        columns[0].metric("memory", f"{memory['bytes'] / 2**20:,.1f} MiB")
+        columns[1].metric("entries", f"{memory['entries']:,}")
+        columns[2].metric("evictions", f"{memory['evictions']:,}")
+        disk = stats["disk"]
+        if disk is not None:
+            st.caption(f"Disk: {disk['bytes'] / 2**20:,.1f} MiB, {disk['evictions']:,} evictions")
+        else:
+            st.caption("Disk tier off (set DCV_CACHE_DIR to enable)")
+
+# -------------------- BACKGROUND JOBS AND PLAYBACK --------------------
+# Traces are recorded on a background thread while the page polls its progress,
+# then replayed from a cursor kept in session state, so reruns never block on
+# the computation and the animation can be paused, stepped and scrubbed.
+
+class JobCancelled(Exception):
+    pass
+
+class TraceJob:
+    """Records one trace on a background thread with progress reporting and cancellation."""
+
+    def __init__(self, kind, ident, record, details):
+        self.kind = kind
+        self.ident = ident
+        self.details = details
+        self.progress = 0.0
+        self.trace = None
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(record,), daemon=True)
+        # Lets the cached recorders run on this thread like in the script thread
+        add_script_run_ctx(self._thread, get_script_run_ctx())
+        self._thread.start()
+
+    def _report(self, fraction):
+        if self._cancel.is_set():
+            raise JobCancelled
+        self.progress = min(max(fraction, 0.0), 1.0)
+
+    def _run(self, record):
+        try:
+            self.trace = record(self._report)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+def stop_playback():
+    """Cancel any running computation and drop the current player."""
+    job = st.session_state.pop("job", None)
+    if job is not None:
+        job.cancel()
+    st.session_state.pop("player", None)
+
+def start_job(kind, ident, record, **details):
+    """Record a trace in the background; a click on the same input and depth keeps the running job."""
+    job = st.session_state.get("job")
+    if job is not None and not job.done and (job.kind, job.ident) == (kind, ident):
+        return
+    stop_playback()
+    st.session_state["job"] = TraceJob(kind, ident, record, details)
 
-        elif step["type"] == "combine":
-            viz_placeholder.markdown(
-                f"**Combine Step:**<br>"
-                f"z2={step['z2']}, z1={step['z1']}, z0={step['z0']} → product={step['product']}",
-                unsafe_allow_html=True
-            )
+def finish_job():
+    """Turn a finished job into a player (or report why it stopped)."""
+    job = st.session_state.get("job")
+    if job is None or not job.done:
+        return
+    del st.session_state["job"]
+    if job.error is not None:
+        st.error(f"Computation failed: {job.error}")
+    elif job.cancelled or job.trace is None:
+        st.info("Computation cancelled.")
+    else:
+        player = {"kind": job.kind, "trace": job.trace, "playing": True, **job.details}
+        if job.kind == "karatsuba":
+            player["events"] = karatsuba_animation_events(player["key"], player["depth"], job.trace)
+        else:
+            player["events"] = range(len(job.trace))
+        st.session_state["player"] = player
+        st.session_state["player_cursor"] = 0
 
-        history.append(step)
-        if steps_placeholder:
-            steps_placeholder.write(history)
+def show_job_progress():
+    if st.session_state.get("job") is None:
+        return
 
-        time.sleep(delay)
+    @st.fragment(run_every=PROGRESS_POLL_SECONDS)
+    def progress_view():
+        job = st.session_state.get("job")
+        if job is None or job.done:
+            st.rerun()
+        label = "Cancelling…" if job.cancelled else f"Recording steps… {job.progress:.0%}"
+        st.progress(job.progress, text=label)
+        st.button("Cancel", on_click=job.cancel, disabled=job.cancelled)
+
+    with job_container:
+        progress_view()
+
+def player_step(delta):
+    player = st.session_state["player"]
+    player["playing"] = False
+    last = len(player["events"]) - 1
+    st.session_state["player_cursor"] = min(max(st.session_state["player_cursor"] + delta, 0), last)
+
+def player_toggle():
+    player = st.session_state["player"]
+    if not player["playing"] and st.session_state["player_cursor"] >= len(player["events"]) - 1:
+        st.session_state["player_cursor"] = 0
+    player["playing"] = not player["playing"]
+
+def player_restart():
+    st.session_state["player"]["playing"] = False
+    st.session_state["player_cursor"] = 0
+
+def player_pause():
+    st.session_state["player"]["playing"] = False
+
+def show_player():
+    player = st.session_state.get("player")
+    if player is None:
+        return
+    ticking = player["playing"]
+
+    # Ticks every delay seconds only while playing; each tick advances the cursor
+    @st.fragment(run_every=delay if ticking else None)
+    def player_view():
+        if player["playing"] != ticking:
+            st.rerun()
+        last = len(player["events"]) - 1
+        if player["playing"]:
+            if st.session_state["player_cursor"] < last:
+                st.session_state["player_cursor"] += 1
+            else:
+                player["playing"] = False
+                st.rerun()
+        cursor = st.session_state["player_cursor"]
+
+        controls = st.columns(4)
+        controls[0].button("⏮ Restart", key="player_restart", on_click=player_restart, width="stretch")
+        controls[1].button("◀ Step", key="player_back", on_click=player_step, args=(-1,), width="stretch")
+        controls[2].button("⏸ Pause" if player["playing"] else "▶ Play", key="player_play",
+                           on_click=player_toggle, width="stretch")
+        controls[3].button("Step ▶", key="player_forward", on_click=player_step, args=(1,), width="stretch")
+        if last > 0:
+            st.slider("Step", 0, last, key="player_cursor", on_change=player_pause)
+
+        if player["kind"] == "karatsuba":
+            show_karatsuba_frame(player, cursor, cursor == last)
+        else:
+            show_closest_pair_frame(player, cursor, cursor == last)
 
-    info_placeholder.markdown(f"### Final product: **{x * y}**")
+    with player_container:
+        player_view()
 
 # -------------------- MAIN EVENT HANDLER --------------------
 
@@ -306,13 +652,30 @@ if run_button:
     else:
         if algo == "Closest Pair (points)":
             visualize_closest_pair(content)
+            if show_instrumentation:
+                instrument_closest_pair(content)
 
         elif algo == "Integer Multiplication (Karatsuba)":
-            visualize_karatsuba(
-                content,
-                viz_placeholder,
-                steps_placeholder,
-                info_placeholder,
-                delay
-            )
+            visualize_karatsuba(content)
+            if show_instrumentation:
+                instrument_karatsuba(content)
+
+        elif algo == "Nearest Neighbors & k Closest Pairs (points)":
+            stop_playback()
+            visualize_neighbors(content)
+
+        else:
+            stop_playback()
+            visualize_vectors(content)
+
+# The job and player live in session state, so every rerun (widget changes,
+# progress polls, player controls) picks them up here
+finish_job()
+show_job_progress()
+show_player()
+
+player = st.session_state.get("player")
+if player is not None and player["kind"] == "karatsuba" and algo == "Integer Multiplication (Karatsuba)":
+    show_karatsuba_tree(player)
 
+show_cache_stats()
@@ -0,0 +1,4 @@
+"""Timing harness for the closest pair and integer multiplication engines.
+
+Run ``python -m benchmarks --help`` from the repository root.
+"""
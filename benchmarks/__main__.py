@@ -0,0 +1,76 @@
+# benchmarks/__main__.py
+"""Command line entry point: ``python -m benchmarks``."""
+
+import argparse
+import json
+import sys
+
+from benchmarks.cases import CASES, SUITES
+from benchmarks.harness import (environment, find_regressions, format_record,
+                                run_suite, scaling_exponents)
+
+
+def _size(text):
+    return int(float(text))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark closest pair and multiplication engines.")
+    parser.add_argument("--suite", choices=[*SUITES, "all"], default="all")
+    parser.add_argument("--cases", help="comma-separated case names to run (default: all)")
+    parser.add_argument("--max-points", type=_size, default=10**6,
+                        help="largest point count to run (up to 1e7)")
+    parser.add_argument("--max-digits", type=_size, default=10**5,
+                        help="largest operand size in digits to run (up to 1e6)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory run")
+    parser.add_argument("--output", "-o", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown versus the baseline, as a fraction")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    wanted = set(args.cases.split(",")) if args.cases else None
+    cases = [c for c in CASES if wanted is None or c.name in wanted]
+    limits = {"closest_pair": args.max_points, "multiply": args.max_digits}
+
+    results = []
+    for suite, (make_input, sizes) in SUITES.items():
+        if args.suite not in ("all", suite):
+            continue
+        sizes = [s for s in sizes if s <= limits[suite]]
+        results += run_suite(suite, cases, make_input, sizes, seed=args.seed, repeat=args.repeat,
+                             memory=not args.no_memory, log=lambda r: print(format_record(r), flush=True))
+
+    slopes = scaling_exponents(results)
+    if slopes:
+        print("\nScaling exponents (time ~ size^k):")
+        for name, k in sorted(slopes.items()):
+            print(f"  {name:>34}  k = {k:.2f}")
+
+    report = {"meta": {**environment(), "seed": args.seed, "repeat": args.repeat},
+              "results": results, "scaling": slopes}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['suite']}/{r['case']} n={r['size']}: "
+                  f"{r['wall_s']:.4f}s vs {r['baseline_s']:.4f}s ({r['slowdown']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/baselines.py
+"""Reference implementations the engines are timed against."""
+
+import math
+
+import numpy as np
+
+from algorithms.closest_pair import closest_pair_nd
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+BRUTE_BLOCK = 256
+# Which k-d tree kd_tree_closest_pair times: scipy's when installed, else the repo's own
+KD_BACKEND = "scipy" if cKDTree is not None else "kdtree"
+
+
+def brute_force_closest_pair(points):
+    """O(n^2) closest pair, vectorized one block of rows at a time."""
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n < 2:
+        return None, float('inf')
+    best = (0, 0, float('inf'))
+    for lo in range(0, n - 1, BRUTE_BLOCK):
+        block = pts[lo:lo + BRUTE_BLOCK]
+        d2 = ((block[:, None, :] - pts[None, lo:, :]) ** 2).sum(axis=2)
+        # Only pairs (i, j) with j > i
+        d2[np.tril_indices(len(block), 0, d2.shape[1])] = np.inf
+        k = int(np.argmin(d2))
+        i, j = divmod(k, d2.shape[1])
+        if d2[i, j] < best[2]:
+            best = (lo + i, lo + j, float(d2[i, j]))
+    p, q = tuple(pts[best[0]].tolist()), tuple(pts[best[1]].tolist())
+    return (p, q), math.dist(p, q)
+
+
+def sweep_closest_pair(points):
+    """Scipy-free sort-and-sweep closest pair.
+
+    After sorting by x, every point is compared with its k-th successor for
+    k = 1, 2, ... while any x-gap is still below the best distance, keeping only
+    the points that can still improve the answer.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n < 2:
+        return None, float('inf')
+    order = np.argsort(pts[:, 0], kind="stable")
+    sx = pts[order, 0]
+    sy = pts[order, 1]
+    best = (0, 1, float('inf'))
+    active = np.arange(n - 1)
+    k = 1
+    while len(active):
+        j = active + k
+        d2 = (sx[j] - sx[active]) ** 2 + (sy[j] - sy[active]) ** 2
+        m = int(np.argmin(d2))
+        if d2[m] < best[2]:
+            best = (int(active[m]), int(j[m]), float(d2[m]))
+        k += 1
+        keep = (active + k < n)
+        keep[keep] = sx[active[keep] + k] - sx[active[keep]] < math.sqrt(best[2])
+        active = active[keep]
+    p, q = tuple(pts[order[best[0]]].tolist()), tuple(pts[order[best[1]]].tolist())
+    return (p, q), math.dist(p, q)
+
+
+def kd_tree_closest_pair(points):
+    """Closest pair from a k-d tree nearest-neighbour query of every point.
+
+    Uses ``scipy.spatial.cKDTree`` when scipy is installed and the vectorized
+    k-d tree behind ``closest_pair_nd`` otherwise (see ``KD_BACKEND``).
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    if cKDTree is None:
+        return closest_pair_nd(pts)
+    if len(pts) < 2:
+        return None, float('inf')
+    # k=2: the first hit is the point itself, or an identical copy
+    dist, idx = cKDTree(pts).query(pts, k=2)
+    i = int(np.argmin(dist[:, 1]))
+    p, q = tuple(pts[i].tolist()), tuple(pts[idx[i, 1]].tolist())
+    return (p, q), math.dist(p, q)
@@ -0,0 +1,108 @@
+# benchmarks/cases.py
+"""Benchmark cases: input generators and the callables under test."""
+
+import itertools
+import math
+import random
+
+import numpy as np
+
+from algorithms.closest_pair import closest_pair, closest_pair_fast, closest_pair_grid, closest_pair_iterative
+from algorithms.closest_pair_index import ClosestPairIndex
+from algorithms.karatsuba import karatsuba, karatsuba_steps
+from algorithms.multiply import fft_multiply, karatsuba_binary, toom3
+from algorithms.trace import record_trace
+from benchmarks.baselines import KD_BACKEND, brute_force_closest_pair, kd_tree_closest_pair, sweep_closest_pair
+
+POINT_SIZES = (10**2, 10**3, 10**4, 10**5, 10**6, 10**7)
+DIGIT_SIZES = (10**2, 10**3, 10**4, 10**5, 10**6)
+
+
+def make_points(n, seed):
+    """n uniform points in the unit square."""
+    return np.random.default_rng(seed).random((n, 2))
+
+
+def make_integers(digits, seed):
+    """Two random integers of about ``digits`` decimal digits."""
+    rng = random.Random(seed)
+    bits = max(1, math.ceil(digits * math.log2(10)))
+    return rng.getrandbits(bits) | (1 << (bits - 1)), rng.getrandbits(bits) | (1 << (bits - 1))
+
+
+def _closest_pair(points):
+    return record_trace(closest_pair(list(map(tuple, points.tolist())))).result
+
+
+def _closest_pair_steps(points):
+    trace = record_trace(closest_pair(list(map(tuple, points.tolist())), visualize=True))
+    return trace.result, len(trace)
+
+
+def _closest_pair_sink(points):
+    """Reference steps delivered to a counting callback instead of yielded."""
+    counter = itertools.count()
+    result = closest_pair_iterative(list(map(tuple, points.tolist())), lambda step: next(counter))
+    return result, next(counter)
+
+
+def _index_updates(points, rounds=10, fraction=0.01):
+    """Build a ClosestPairIndex, then replace ``fraction`` of the points per round and query."""
+    rng = np.random.default_rng(0)
+    index = ClosestPairIndex(points)
+    batch = max(1, int(len(points) * fraction))
+    for _ in range(rounds):
+        index.delete_many(rng.choice(index.ids(), size=min(batch, len(index)), replace=False))
+        index.insert_many(rng.random((batch, 2)))
+        result = index.closest_pair()
+    return result
+
+
+def _karatsuba_steps(operands):
+    trace = record_trace(karatsuba_steps(*operands))
+    return trace.result, len(trace)
+
+
+def _builtin_multiply(operands):
+    x, y = operands
+    return x * y
+
+
+class Case:
+    """One timed callable.
+
+    ``max_size`` caps the input size for slow engines; ``counts_steps`` marks
+    callables returning ``(result, steps)``.
+    """
+
+    def __init__(self, suite, name, fn, max_size=None, counts_steps=False):
+        self.suite = suite
+        self.name = name
+        self.fn = fn
+        self.max_size = max_size
+        self.counts_steps = counts_steps
+
+
+CASES = [
+    Case("closest_pair", "closest_pair", _closest_pair, max_size=10**5),
+    Case("closest_pair", "closest_pair_steps", _closest_pair_steps, max_size=10**4, counts_steps=True),
+    Case("closest_pair", "closest_pair_sink", _closest_pair_sink, max_size=10**4, counts_steps=True),
+    Case("closest_pair", "closest_pair_fast", closest_pair_fast),
+    Case("closest_pair", "closest_pair_grid", closest_pair_grid),
+    Case("closest_pair", "index_updates", _index_updates, max_size=10**6),
+    Case("closest_pair", "brute_force", brute_force_closest_pair, max_size=10**4),
+    Case("closest_pair", "sweep", sweep_closest_pair),
+    # Named by backend, so the regression gate never compares scipy against the fallback
+    Case("closest_pair", f"kd_tree_{KD_BACKEND}", kd_tree_closest_pair),
+    Case("multiply", "karatsuba", lambda ops: karatsuba(*ops), max_size=10**3),
+    Case("multiply", "karatsuba_steps", _karatsuba_steps, max_size=10**3, counts_steps=True),
+    Case("multiply", "karatsuba_binary", lambda ops: karatsuba_binary(*ops)),
+    Case("multiply", "toom3", lambda ops: toom3(*ops)),
+    Case("multiply", "fft", lambda ops: fft_multiply(*ops)),
+    Case("multiply", "builtin", _builtin_multiply),
+]
+
+SUITES = {
+    "closest_pair": (make_points, POINT_SIZES),
+    "multiply": (make_integers, DIGIT_SIZES),
+}
@@ -0,0 +1,101 @@
+# benchmarks/harness.py
+"""Timing, peak memory, scaling fits and the regression gate."""
+
+import gc
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def measure(case, data, repeat=3, memory=True):
+    """Time ``case.fn(data)``; returns wall time (best of ``repeat``), peak bytes and steps."""
+    steps = None
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        out = case.fn(data)
+        best = min(best, time.perf_counter() - start)
+        if case.counts_steps:
+            steps = out[1]
+        del out
+
+    peak = None
+    if memory:
+        # Separate run: tracemalloc slows pure-Python code down too much to time it
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.fn(data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"wall_s": best, "peak_bytes": peak, "steps": steps}
+
+
+def run_suite(suite, cases, make_input, sizes, seed=0, repeat=3, memory=True, log=None):
+    """Run every case of a suite over the sizes it supports."""
+    results = []
+    for size in sizes:
+        todo = [c for c in cases if c.suite == suite and (c.max_size is None or size <= c.max_size)]
+        if not todo:
+            continue
+        data = make_input(size, seed)
+        for case in todo:
+            record = {"suite": suite, "case": case.name, "size": size}
+            record.update(measure(case, data, repeat=repeat, memory=memory))
+            results.append(record)
+            if log:
+                log(record)
+    return results
+
+
+def scaling_exponents(results):
+    """Least-squares slope of log(time) against log(size) per case."""
+    series = {}
+    for r in results:
+        if r["wall_s"] > 0:
+            series.setdefault((r["suite"], r["case"]), []).append((r["size"], r["wall_s"]))
+    slopes = {}
+    for key, pts in series.items():
+        if len(pts) >= 2:
+            xs = np.log([p[0] for p in pts])
+            ys = np.log([p[1] for p in pts])
+            slopes[f"{key[0]}/{key[1]}"] = float(np.polyfit(xs, ys, 1)[0])
+    return slopes
+
+
+def find_regressions(results, baseline, tolerance, min_seconds=1e-3):
+    """Results slower than ``baseline`` by more than ``tolerance`` (a fraction).
+
+    Timings under ``min_seconds`` in both runs are ignored as noise.
+    """
+    previous = {(r["suite"], r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = previous.get((r["suite"], r["case"], r["size"]))
+        if old is None or max(r["wall_s"], old["wall_s"]) < min_seconds:
+            continue
+        if r["wall_s"] > old["wall_s"] * (1 + tolerance):
+            regressions.append({**r, "baseline_s": old["wall_s"],
+                                "slowdown": r["wall_s"] / old["wall_s"]})
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def format_record(r):
+    mem = "-" if r["peak_bytes"] is None else f"{r['peak_bytes'] / 2**20:.1f} MiB"
+    steps = "" if r["steps"] is None else f"  steps={r['steps']}"
+    return f"{r['suite']:>12} {r['case']:>20} n={r['size']:<9} {r['wall_s'] * 1e3:10.2f} ms  {mem:>10}{steps}"
+
@@ -0,0 +1,88 @@
+# benchmarks/load_test.py
+"""Load test for the solve service: ``python -m benchmarks.load_test``.
+
+Opens ``--concurrency`` keep-alive connections that each POST the sample
+inputs from ``data/`` in turn and reports latency percentiles. With
+``--unique`` every request body is made distinct so the result cache is
+bypassed.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _sample_requests():
+    requests = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "inputs_closest_pair", "*.txt"))):
+        with open(path, "rb") as f:
+            requests.append(("/closest-pair", f.read()))
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "inputs_integer_multiplication", "*.txt"))):
+        with open(path, "rb") as f:
+            requests.append(("/multiply", f.read()))
+    return requests
+
+
+async def _client(host, port, requests, count, offset, unique, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for k in range(count):
+            path, body = requests[(offset + k) % len(requests)]
+            if unique and path == "/closest-pair":
+                # A trailing point far from the rest changes the cache key, not the answer
+                body = body.rstrip() + f"\n{1e12 + offset * count + k} 0\n".encode()
+            start = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                         + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            errors += [status] if status != 200 else []
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, requests_per_client, unique):
+    requests = _sample_requests()
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, requests, requests_per_client, c * requests_per_client, unique, latencies, errors)
+        for c in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1e3
+    return {"requests": len(latencies), "errors": len(errors), "seconds": elapsed,
+            "throughput_rps": len(latencies) / elapsed,
+            "p50_ms": float(np.percentile(ms, 50)), "p90_ms": float(np.percentile(ms, 90)),
+            "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="requests per connection")
+    parser.add_argument("--unique", action="store_true", help="make every closest pair body distinct")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.host, args.port, args.concurrency, args.requests, args.unique))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# conftest.py
+# Makes the top-level ``algorithms`` and ``visualization`` modules importable from tests/.
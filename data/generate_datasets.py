@@ -0,0 +1,160 @@
+# data/generate_datasets.py
+"""Reproducible synthetic datasets of any size.
+
+Points are generated and written a fixed-size chunk at a time, so even 100M
+point files never sit in memory; chunk k is drawn from its own generator seeded
+with (seed, k), which makes the output independent of how it is consumed.
+
+Examples (run from the repository root):
+    python data/generate_datasets.py points -n 100000000 --dist clustered --format npy -o pts.npy
+    python data/generate_datasets.py points -n 200 --dist uniform --integer -o input.txt
+    python data/generate_datasets.py integers --digits 1000000 -o big.txt
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+CHUNK_POINTS = 1 << 20
+CHUNK_DIGITS = 1 << 22
+
+DISTRIBUTIONS = ("uniform", "gaussian", "clustered", "collinear", "duplicates", "grid")
+
+# Odd 64-bit multipliers used to hash pool indices into coordinates
+_HASH_X = np.uint64(0x9E3779B97F4A7C15)
+_HASH_Y = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def _shape_params(dist, n, scale, seed, clusters):
+    """Per-dataset parameters drawn once (cluster centres, line endpoints...)."""
+    rng = np.random.default_rng([seed, 1 << 32])
+    if dist == "clustered":
+        return {"centres": rng.random((clusters, 2)) * scale, "sigma": scale / (20 * math.sqrt(clusters))}
+    if dist == "collinear":
+        return {"ends": rng.random((2, 2)) * scale}
+    if dist == "duplicates":
+        return {"pool": max(1, n // 10)}
+    if dist == "grid":
+        side = max(1, math.ceil(math.sqrt(n)))
+        return {"side": side, "spacing": scale / side}
+    return {}
+
+
+def _point_chunk(dist, start, count, scale, seed, params):
+    """Points [start, start + count) of the dataset as a float64 array."""
+    rng = np.random.default_rng([seed, start // CHUNK_POINTS])
+    if dist == "uniform":
+        return rng.random((count, 2)) * scale
+    if dist == "gaussian":
+        return rng.normal(scale / 2, scale / 8, (count, 2))
+    if dist == "clustered":
+        centres = params["centres"]
+        which = rng.integers(0, len(centres), count)
+        return centres[which] + rng.normal(0, params["sigma"], (count, 2))
+    if dist == "collinear":
+        a, b = params["ends"]
+        t = rng.random((count, 1))
+        return a + t * (b - a)
+    if dist == "duplicates":
+        # Every point is one of n // 10 hashed pool values, so most are repeated
+        idx = rng.integers(0, params["pool"], count).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            hx = (idx + np.uint64(1)) * _HASH_X
+            hy = (idx + np.uint64(1)) * _HASH_Y
+        return np.column_stack([hx >> np.uint64(11), hy >> np.uint64(11)]) * (scale / 2.0**53)
+    if dist == "grid":
+        i = np.arange(start, start + count)
+        return np.column_stack([i % params["side"], i // params["side"]]) * params["spacing"]
+    raise ValueError(f"Unknown distribution: {dist!r}")
+
+
+def iter_points(n, dist="uniform", seed=0, scale=10000.0, clusters=20, integer=False):
+    """Yield the dataset as consecutive (count, 2) float64 chunks."""
+    params = _shape_params(dist, n, scale, seed, clusters)
+    for start in range(0, n, CHUNK_POINTS):
+        chunk = _point_chunk(dist, start, min(CHUNK_POINTS, n - start), scale, seed, params)
+        yield np.rint(chunk) if integer else chunk
+
+
+def write_points(path, n, fmt="txt", header=True, integer=False, **kwargs):
+    """Write n points to path as text ("N then x y"), .npy or raw float64."""
+    chunks = iter_points(n, integer=integer, **kwargs)
+    if fmt == "npy":
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(n, 2))
+        start = 0
+        for chunk in chunks:
+            out[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        out.flush()
+        return
+    with open(path, "wb") as f:
+        if fmt == "raw":
+            for chunk in chunks:
+                chunk.astype("<f8").tofile(f)
+        elif fmt == "txt":
+            if header:
+                f.write(f"{n}\n".encode())
+            for chunk in chunks:
+                np.savetxt(f, chunk, fmt="%d" if integer else "%.17g")
+        else:
+            raise ValueError(f"Unknown output format: {fmt!r}")
+
+
+def write_integer(f, digits, rng):
+    """Write a random integer with exactly ``digits`` decimal digits."""
+    f.write(str(int(rng.integers(1, 10))).encode())
+    remaining = digits - 1
+    while remaining > 0:
+        count = min(CHUNK_DIGITS, remaining)
+        f.write((rng.integers(0, 10, count, dtype=np.uint8) + ord("0")).tobytes())
+        remaining -= count
+    f.write(b"\n")
+
+
+def write_integers(path, digits, digits2=None, seed=0):
+    """Write two random integers, one per line (the Karatsuba input format)."""
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        write_integer(f, digits, rng)
+        write_integer(f, digits2 or digits, rng)
+
+
+def _count(text):
+    return int(float(text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic closest pair / multiplication inputs.")
+    sub = parser.add_subparsers(dest="kind", required=True)
+
+    pts = sub.add_parser("points", help="point sets for closest pair")
+    pts.add_argument("-n", type=_count, required=True, help="number of points (e.g. 1e8)")
+    pts.add_argument("--dist", choices=DISTRIBUTIONS, default="uniform")
+    pts.add_argument("--format", choices=("txt", "npy", "raw"), default="txt")
+    pts.add_argument("--scale", type=float, default=10000.0, help="coordinate range")
+    pts.add_argument("--clusters", type=int, default=20, help="cluster count for --dist clustered")
+    pts.add_argument("--integer", action="store_true", help="round coordinates to integers")
+    pts.add_argument("--no-header", action="store_true", help="omit the leading N line in txt output")
+    pts.add_argument("--seed", type=int, default=0)
+    pts.add_argument("-o", "--output", required=True)
+
+    ints = sub.add_parser("integers", help="integer pairs for multiplication")
+    ints.add_argument("--digits", type=_count, required=True)
+    ints.add_argument("--digits2", type=_count, help="digits of the second operand (default: --digits)")
+    ints.add_argument("--seed", type=int, default=0)
+    ints.add_argument("-o", "--output", required=True)
+
+    args = parser.parse_args(argv)
+    if args.kind == "points":
+        write_points(args.output, args.n, fmt=args.format, header=not args.no_header,
+                     integer=args.integer, dist=args.dist, seed=args.seed,
+                     scale=args.scale, clusters=args.clusters)
+        print(f"Wrote {args.n} {args.dist} points to {args.output}")
+    else:
+        write_integers(args.output, args.digits, args.digits2, seed=args.seed)
+        print(f"Wrote a {args.digits}-digit integer pair to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
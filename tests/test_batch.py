@@ -0,0 +1,95 @@
+# tests/test_batch.py
+"""Batch APIs and the directory runner: per-item results in order, errors kept per item."""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from algorithms.batch import (BATCH_MIN_POOL_JOBS, closest_pair_many, iter_solve_files, main,
+                              multiply_many, solve_file)
+from algorithms.closest_pair import solve_closest_pair
+
+
+def _point_sets(count):
+    rng = np.random.default_rng(count)
+    return [rng.random((int(rng.integers(2, 300)), 2)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_closest_pair_many_in_input_order(workers):
+    sets = _point_sets(BATCH_MIN_POOL_JOBS + 2)
+    results = closest_pair_many(sets, method="fast", workers=workers)
+    assert results == [solve_closest_pair(points, "fast") for points in sets]
+
+
+def test_closest_pair_many_small_and_degenerate_sets():
+    sets = [[(0.0, 0.0)], [], [(0.0, 0.0), (3.0, 4.0)]]
+    assert closest_pair_many(sets, workers=1) == [(None, math.inf), (None, math.inf),
+                                                 (((0.0, 0.0), (3.0, 4.0)), 5.0)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_multiply_many_in_input_order(workers):
+    pairs = [(3**k, -(7**k) + 1) for k in range(0, 3000, 300)]
+    assert multiply_many(pairs, workers=workers) == [x * y for x, y in pairs]
+
+
+def test_malformed_set_raises_from_the_api():
+    sets = _point_sets(3) + [np.zeros((4, 3))]
+    with pytest.raises(ValueError):
+        closest_pair_many(sets, method="fast", workers=1)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    pts = rng.random((50, 2))
+    (tmp_path / "a_points.txt").write_text("\n".join(f"{x} {y}" for x, y in pts))
+    np.save(tmp_path / "b_points.npy", pts[:20])
+    (tmp_path / "c_product.txt").write_text(f"{3**200}\n{-(5**90)}\n")
+    # Three columns: not an (N, 2) array
+    np.save(tmp_path / "d_bad.npy", np.zeros((5, 3)))
+    return tmp_path, pts
+
+
+def test_solve_file_records(inputs):
+    root, pts = inputs
+    record = solve_file(root / "a_points.txt")
+    assert record["kind"] == "closest-pair" and record["n"] == 50 and record["skipped"] == 0
+    assert record["distance"] == pytest.approx(solve_closest_pair(pts)[1])
+    record = solve_file(root / "c_product.txt")
+    assert record["kind"] == "multiply" and record["product"] == str(3**200 * -(5**90))
+    assert record["digits"] == [len(str(3**200)), len(str(5**90))]
+    assert "error" in solve_file(root / "d_bad.npy")
+    # Forcing the wrong kind is an error of that item only
+    assert "error" in solve_file(root / "a_points.txt", kind="multiply")
+    assert "error" in solve_file(root / "missing.txt")
+
+
+def test_runner_streams_every_file_and_flags_the_bad_one(inputs, capsys):
+    root, pts = inputs
+    assert main([str(root), "--workers", "1"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["file"].rsplit("/", 1)[-1] for r in records] == ["a_points.txt", "b_points.npy",
+                                                                 "c_product.txt", "d_bad.npy"]
+    assert ["error" in r for r in records] == [False, False, False, True]
+    assert records[1]["distance"] == pytest.approx(solve_closest_pair(pts[:20])[1])
+    assert "(N, 2)" in records[3]["error"]
+
+
+def test_runner_writes_output_file(inputs, tmp_path_factory):
+    root, _ = inputs
+    out = tmp_path_factory.mktemp("out") / "results.jsonl"
+    good = [str(root / "a_points.txt"), str(root / "c_product.txt")]
+    assert main(good + ["--workers", "1", "-o", str(out)]) == 0
+    assert len(out.read_text().splitlines()) == 2
+
+
+def test_iter_solve_files_uses_the_pool_in_order(inputs):
+    root, _ = inputs
+    paths = [root / "b_points.npy", root / "c_product.txt", root / "d_bad.npy"] * 3
+    records = list(iter_solve_files(paths, workers=2))
+    assert [r["file"] for r in records] == [str(p) for p in paths]
+    assert ["error" in r for r in records] == [False, False, True] * 3
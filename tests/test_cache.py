@@ -0,0 +1,61 @@
+# tests/test_cache.py
+"""ResultCache tiers, sizing and recovery from stale disk entries."""
+
+import pickle
+
+import numpy as np
+
+from algorithms.cache import DiskStore, LRUCache, ResultCache, approximate_size
+from algorithms.closest_pair import record_closest_pair
+from algorithms.karatsuba import record_karatsuba
+
+
+def test_memory_only_cache_does_not_pickle(monkeypatch):
+    cache = ResultCache(max_bytes=1 << 20)
+    monkeypatch.setattr(pickle, "dumps", None)
+    value = cache.get_or_compute("result", "a", lambda: np.arange(1000))
+    assert cache.get_or_compute("result", "a", lambda: 1 / 0) is value
+    assert cache.stats()["kinds"]["result"] == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+    assert cache.stats()["memory"]["bytes"] == 8000
+
+
+def test_approximate_size():
+    pts = [tuple(p) for p in np.random.default_rng(0).random((5000, 2)).tolist()]
+    assert approximate_size(np.arange(10_000)) == 80_000
+    for trace in (record_closest_pair(pts[:500]), record_karatsuba(3 ** 200, 7 ** 150)):
+        assert approximate_size(trace) == trace.nbytes() > 0
+    # Extrapolated from a sample: a list slot plus a tuple of two floats per point
+    assert 100 * len(pts) < approximate_size(pts) < 200 * len(pts)
+
+
+def test_oversized_put_replaces_the_old_value(tmp_path):
+    cache = LRUCache(max_bytes=10)
+    cache.put("k", b"old")
+    cache.put("other", b"1234")
+    cache.put("k", b"x" * 11)
+    assert "k" not in cache and cache.get("k") is None
+    assert cache.nbytes == 4 and cache.get("other") == b"1234"
+    disk = DiskStore(str(tmp_path), 64)
+    disk.put("k", "old")
+    disk.put("k", "x" * 100)
+    assert disk.get("k") is None and disk.nbytes == 0
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    first = ResultCache(1 << 20, DiskStore(str(tmp_path), 1 << 20))
+    first.get_or_compute("parsed", "k", lambda: [1, 2, 3])
+    second = ResultCache(1 << 20, DiskStore(str(tmp_path), 1 << 20))
+    assert second.get_or_compute("parsed", "k", lambda: 1 / 0) == [1, 2, 3]
+    assert second.stats()["kinds"]["parsed"]["disk_hits"] == 1
+
+
+def test_stale_pickle_is_deleted_and_recomputed(tmp_path):
+    disk = DiskStore(str(tmp_path), 1 << 20)
+    # A pickle referring to a class that no longer exists
+    disk.put_bytes(("trace", "k"), pickle.dumps(ResultCache).replace(b"ResultCache", b"MissingCache"))
+    disk.put_bytes(("trace", "cut"), pickle.dumps(list(range(100)))[:20])
+    cache = ResultCache(1 << 20, disk)
+    assert cache.get_or_compute("trace", "k", lambda: "fresh") == "fresh"
+    assert cache.get_or_compute("trace", "cut", lambda: "fresh") == "fresh"
+    assert disk.get(("trace", "k")) == "fresh"
+    assert cache.stats()["kinds"]["trace"]["misses"] == 2
@@ -0,0 +1,102 @@
+# tests/test_closest_pair_exact.py
+"""closest_pair_exact against brute force: exact distances, duplicates and (i, j) tie-breaking."""
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import EXACT_MAX_COORD, FAST_LEAF_SIZE, closest_pair_exact
+
+
+def _brute_force(pts):
+    """(i, j, squared distance) of the lowest-index closest pair, in int64."""
+    i, j = np.triu_indices(len(pts), 1)
+    d2 = ((pts[i] - pts[j]) ** 2).sum(1)
+    k = np.lexsort((j, i, d2))[0]
+    return int(i[k]), int(j[k]), int(d2[k])
+
+
+def _check(pts):
+    pts = np.asarray(pts, dtype=np.int64)
+    i, j, d2 = _brute_force(pts)
+    pair, squared = closest_pair_exact(pts, squared=True)
+    assert squared == d2
+    assert pair == (tuple(pts[i].tolist()), tuple(pts[j].tolist()))
+
+
+def _distinct(rng, n, side):
+    flat = rng.choice(side * side, n, replace=False)
+    return np.column_stack([flat // side, flat % side])
+
+
+@pytest.mark.parametrize("n", [2, 3, FAST_LEAF_SIZE, FAST_LEAF_SIZE + 1, 2 * FAST_LEAF_SIZE + 1, 700, 1500])
+def test_uniform(n):
+    rng = np.random.default_rng(n)
+    _check(_distinct(rng, n, 10**6))
+
+
+@pytest.mark.parametrize("n", [FAST_LEAF_SIZE + 1, 300, 1500])
+def test_tied_lattice(n):
+    # Distinct points of a small lattice: most pairs tie at distance 1
+    rng = np.random.default_rng(n)
+    _check(_distinct(rng, n, 50))
+
+
+@pytest.mark.parametrize("axis", [0, 1])
+def test_collinear(axis):
+    rng = np.random.default_rng(axis)
+    line = np.zeros((900, 2), dtype=np.int64)
+    line[:, axis] = rng.permutation(900) * 3
+    _check(line)
+    # Two interleaved spacings, so the minimum occurs once among many near-ties
+    line[rng.integers(0, 900), axis] += 1
+    _check(line)
+
+
+def test_extreme_coordinates_are_exact():
+    rng = np.random.default_rng(0)
+    corners = np.array([[-EXACT_MAX_COORD, -EXACT_MAX_COORD], [EXACT_MAX_COORD, EXACT_MAX_COORD],
+                        [-EXACT_MAX_COORD, EXACT_MAX_COORD], [EXACT_MAX_COORD, -EXACT_MAX_COORD]])
+    _check(corners)
+    # Squared distances around 2^61 differ by 1 here, beyond float64 precision
+    pts = rng.integers(-EXACT_MAX_COORD, EXACT_MAX_COORD, (400, 2))
+    _check(pts)
+    _, squared = closest_pair_exact([(EXACT_MAX_COORD, 0), (-EXACT_MAX_COORD, 1)], squared=True)
+    assert squared == (2 * EXACT_MAX_COORD) ** 2 + 1
+
+
+@pytest.mark.parametrize("n", [2, 10, FAST_LEAF_SIZE + 1, 1000])
+def test_duplicates_return_lowest_index_pair(n):
+    rng = np.random.default_rng(n)
+    rows = _distinct(rng, max(2, n // 3), 1000)
+    pts = rows[rng.integers(0, len(rows), n)]
+    if len(np.unique(pts, axis=0)) == n:
+        pts[-1] = pts[0]
+    _check(pts)
+    pair, dist = closest_pair_exact(pts)
+    assert dist == 0 and pair[0] == pair[1]
+
+
+def test_duplicate_found_after_unrelated_pairs():
+    # The lowest (i, j) identical pair is not the first repeated key in sorted order
+    pts = [(5, 5), (0, 0), (9, 9), (5, 5), (0, 0), (9, 9)]
+    _check(pts)
+
+
+@pytest.mark.parametrize("value", [EXACT_MAX_COORD + 1, -EXACT_MAX_COORD - 1, 2**40])
+def test_rejects_coordinates_outside_range(value):
+    with pytest.raises(ValueError):
+        closest_pair_exact([(0, 0), (value, 0)])
+    with pytest.raises(ValueError):
+        closest_pair_exact([(0.0, 0.0), (0.0, float(value))])
+
+
+@pytest.mark.parametrize("points", [[(0.5, 0.0), (1.0, 1.0)], [(0.0, float("nan")), (1.0, 1.0)],
+                                    [("a", "b"), ("c", "d")]])
+def test_rejects_non_integer_coordinates(points):
+    with pytest.raises(ValueError):
+        closest_pair_exact(points)
+
+
+def test_accepts_integral_floats_at_the_limit():
+    pair, squared = closest_pair_exact([(float(EXACT_MAX_COORD), 0.0), (float(EXACT_MAX_COORD), 3.0)], squared=True)
+    assert squared == 9 and pair == ((EXACT_MAX_COORD, 0), (EXACT_MAX_COORD, 3))
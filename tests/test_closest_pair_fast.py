@@ -0,0 +1,69 @@
+# tests/test_closest_pair_fast.py
+"""closest_pair_fast against brute force around the leaf size and on degenerate inputs."""
+
+import math
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import FAST_LEAF_SIZE, closest_pair_fast
+
+
+def _brute_force(pts):
+    i, j = np.triu_indices(len(pts), 1)
+    return float(np.sqrt(((pts[i] - pts[j]) ** 2).sum(1)).min())
+
+
+def _check(pts):
+    pair, dist = closest_pair_fast(pts)
+    assert math.isclose(dist, _brute_force(pts), rel_tol=1e-12, abs_tol=0.0)
+    assert math.dist(*pair) == dist
+    rows = {tuple(p) for p in pts.tolist()}
+    assert pair[0] in rows and pair[1] in rows
+
+
+SIZES = [2, 3, FAST_LEAF_SIZE - 1, FAST_LEAF_SIZE, FAST_LEAF_SIZE + 1, 2 * FAST_LEAF_SIZE + 1, 1000]
+
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("seed", range(3))
+def test_uniform(n, seed):
+    _check(np.random.default_rng(seed).random((n, 2)))
+
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("axis", [0, 1])
+def test_collinear(n, axis):
+    rng = np.random.default_rng(n)
+    pts = np.zeros((n, 2))
+    pts[:, axis] = rng.random(n) * 100
+    _check(pts)
+    # Evenly spaced: every neighbouring pair ties
+    pts[:, axis] = rng.permutation(n) * 0.25
+    _check(pts)
+
+
+@pytest.mark.parametrize("n", SIZES[1:])
+def test_duplicates(n):
+    rng = np.random.default_rng(n)
+    pts = rng.random((n, 2))
+    pts[rng.integers(0, n)] = pts[rng.integers(0, n)]
+    _check(pts)
+    # Few distinct rows: zero distances everywhere
+    _check(rng.random((3, 2))[rng.integers(0, 3, n)])
+
+
+def test_duplicate_pair_straddles_the_split():
+    # The identical points sort to either side of the first split
+    n = 2 * FAST_LEAF_SIZE + 2
+    pts = np.column_stack([np.arange(n, dtype=float) * 10, np.zeros(n)])
+    pts[n // 2] = pts[n // 2 - 1]
+    pair, dist = closest_pair_fast(pts)
+    assert dist == 0 and pair[0] == pair[1] == tuple(pts[n // 2 - 1])
+
+
+def test_fewer_than_two_points():
+    assert closest_pair_fast(np.empty((0, 2))) == (None, float("inf"))
+    assert closest_pair_fast([(1.0, 2.0)]) == (None, float("inf"))
+    with pytest.raises(ValueError):
+        closest_pair_fast([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)])
@@ -0,0 +1,79 @@
+# tests/test_closest_pair_grid.py
+"""closest_pair_grid and the solve_closest_pair auto switch against brute force."""
+
+import math
+
+import numpy as np
+import pytest
+
+import algorithms.closest_pair as cp
+from algorithms.closest_pair import GRID_MIN_POINTS, closest_pair_grid, solve_closest_pair
+from algorithms.instrument import Instrumentation
+
+
+def _brute_force(pts):
+    """Smallest pairwise distance, a block of rows at a time."""
+    best = math.inf
+    for lo in range(0, len(pts) - 1, 512):
+        block = pts[lo:lo + 512]
+        d2 = ((block[:, None, :] - pts[None, :, :]) ** 2).sum(-1)
+        d2[np.arange(len(block)), lo + np.arange(len(block))] = math.inf
+        best = min(best, float(d2.min()))
+    return math.sqrt(best)
+
+
+def _inputs(rng, n):
+    yield "uniform", rng.random((n, 2)) * 1000
+    yield "duplicates", np.repeat(rng.random((n // 4, 2)), 4, axis=0)[rng.permutation(n // 4 * 4)]
+    centres = rng.random((5, 2)) * 1e6
+    yield "clustered", centres[rng.integers(0, 5, n)] + rng.normal(0, 1e-3, (n, 2))
+    yield "lattice", rng.integers(0, int(math.sqrt(n)) + 3, (n, 2)).astype(float)
+    yield "line", np.column_stack([rng.permutation(n) * 0.5, np.zeros(n)])
+
+
+def _check(pts, pair, dist):
+    assert math.isclose(dist, _brute_force(pts), rel_tol=1e-12, abs_tol=0.0)
+    assert math.dist(*pair) == dist
+    rows = {tuple(p) for p in pts.tolist()}
+    assert pair[0] in rows and pair[1] in rows
+
+
+@pytest.mark.parametrize("n", [2, 50, 2000])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_grid_matches_brute_force(n, seed):
+    rng = np.random.default_rng(seed)
+    for _, pts in _inputs(rng, n):
+        if len(pts) >= 2:
+            _check(pts, *closest_pair_grid(pts, seed=seed))
+
+
+def test_auto_switch_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for name, pts in _inputs(rng, GRID_MIN_POINTS + 100):
+        stats = Instrumentation()
+        _check(pts, *solve_closest_pair(pts, "auto", stats))
+        # From GRID_MIN_POINTS upwards auto samples for the grid
+        assert "sample_points" in stats.counters, name
+    small = rng.random((GRID_MIN_POINTS - 1, 2))
+    stats = Instrumentation()
+    _check(small, *solve_closest_pair(small, "auto", stats))
+    assert "sample_points" not in stats.counters
+
+
+def test_clustered_input_falls_back(monkeypatch):
+    monkeypatch.setattr(cp, "GRID_MAX_PAIRS_PER_POINT", 0)
+    pts = np.random.default_rng(3).random((3000, 2))
+    stats = Instrumentation()
+    _check(pts, *closest_pair_grid(pts, stats=stats))
+    assert stats.counters["fallbacks"] == 1
+
+
+def test_no_candidate_pair_falls_back(monkeypatch):
+    # A grid that yields no pair in neighbouring cells must not index order[-1]
+    monkeypatch.setattr(cp, "_cell_pairs_min", lambda *args: (-1, -1, float("inf")))
+    pts = np.random.default_rng(4).random((3000, 2))
+    stats = Instrumentation()
+    _check(pts, *closest_pair_grid(pts, stats=stats))
+    assert stats.counters["fallbacks"] == 1
+    big = np.random.default_rng(5).random((GRID_MIN_POINTS, 2))
+    _check(big, *solve_closest_pair(big, "auto"))
@@ -0,0 +1,106 @@
+# tests/test_closest_pair_index.py
+"""ClosestPairIndex against the static closest pair after random update sequences."""
+
+import math
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import closest_pair_fast
+from algorithms.closest_pair_index import ClosestPairIndex
+
+
+def _random_updates(seed, lattice, steps=60):
+    """Apply seeded random inserts/deletes, checking the index after every batch."""
+    rng = np.random.default_rng(seed)
+    index = ClosestPairIndex()
+    live = {}
+    for _ in range(steps):
+        if rng.random() < 0.55 or len(live) < 3:
+            batch = int(rng.integers(1, 40))
+            pts = rng.integers(0, 30, (batch, 2)).astype(float) if lattice else rng.random((batch, 2))
+            if rng.random() < 0.3:
+                ids = [index.insert(p) for p in pts]
+            else:
+                ids = index.insert_many(pts).tolist()
+            for point_id, p in zip(ids, pts):
+                assert point_id not in live
+                live[point_id] = tuple(p)
+        else:
+            batch = int(rng.integers(1, max(2, len(live) // 2)))
+            gone = rng.choice(list(live), size=min(batch, len(live)), replace=False).tolist()
+            if rng.random() < 0.3:
+                for point_id in gone:
+                    index.delete(point_id)
+            else:
+                index.delete_many(gone)
+            for point_id in gone:
+                del live[point_id]
+
+        assert len(index) == len(live)
+        pair, dist = index.closest_pair()
+        expected = closest_pair_fast(list(live.values()))[1] if len(live) >= 2 else float('inf')
+        assert dist == expected or math.isclose(dist, expected)
+        if pair is not None:
+            i, j, d = index.closest_pair_ids()
+            assert math.isclose(math.dist(live[i], live[j]), d)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_updates_uniform(seed):
+    _random_updates(seed, lattice=False)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_updates_lattice(seed):
+    # Few distinct coordinates: many ties and duplicate points
+    _random_updates(seed, lattice=True)
+
+
+def test_large_batches_and_slot_reuse():
+    rng = np.random.default_rng(42)
+    pts = rng.random((50_000, 2))
+    index = ClosestPairIndex(pts)
+    assert math.isclose(index.closest_pair()[1], closest_pair_fast(pts)[1])
+
+    gone = rng.choice(len(pts), size=40_000, replace=False)
+    index.delete_many(gone)
+    kept = np.setdiff1d(np.arange(len(pts)), gone)
+    assert math.isclose(index.closest_pair()[1], closest_pair_fast(pts[kept])[1])
+
+    # Purged slots are reused and must report the new coordinates
+    fresh = rng.random((20_000, 2))
+    ids = index.insert_many(fresh)
+    for point_id, p in zip(ids[:100].tolist(), fresh[:100]):
+        assert index.point(point_id) == tuple(p)
+    everything = np.concatenate([pts[kept], fresh])
+    assert math.isclose(index.closest_pair()[1], closest_pair_fast(everything)[1])
+
+
+def test_unknown_ids_raise():
+    index = ClosestPairIndex([(0.0, 0.0), (1.0, 0.0)])
+    with pytest.raises(KeyError):
+        index.delete(5)
+    index.delete(0)
+    with pytest.raises(KeyError):
+        index.delete(0)
+    assert index.closest_pair() == (None, float('inf'))
+
+
+def test_star_delete_requeries_every_owner(monkeypatch):
+    # Each point sits closer to the centre than to any earlier point, so all of
+    # them record the centre, and deleting it orphans every one of them
+    m = 200
+    angles = np.arange(m) * 2.399963
+    radii = 3.0 ** -np.arange(1, m + 1) * 1e6
+    star = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+    index = ClosestPairIndex()
+    centre = index.insert((0.0, 0.0))
+    for p in star:
+        index.insert(p)
+    queried = []
+    find = index._find_neighbors
+    monkeypatch.setattr(index, "_find_neighbors", lambda ids: (queried.append(len(ids)), find(ids)))
+    index.delete(centre)
+    assert queried == [m]
+    assert math.isclose(index.closest_pair()[1], closest_pair_fast(star)[1])
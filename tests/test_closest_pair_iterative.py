@@ -0,0 +1,39 @@
+# tests/test_closest_pair_iterative.py
+"""closest_pair_iterative against the recursive step generator."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from algorithms.closest_pair import closest_pair, closest_pair_iterative
+from algorithms.trace import record_trace
+
+
+def _key(step):
+    return step["type"], repr({k: v for k, v in step.items() if k != "type"})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_same_result_and_steps_as_generator(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 80)
+    spread = rng.choice([2, 5, 100, None])
+    if spread is None:
+        points = [(rng.random(), rng.random()) for _ in range(n)]
+    else:
+        points = [(rng.randint(0, spread), rng.randint(0, spread)) for _ in range(n)]
+
+    trace = record_trace(closest_pair(points, visualize=True))
+    expected, expected_steps = trace.result, trace.events
+    steps = []
+    assert closest_pair_iterative(points, steps.append) == expected
+    assert record_trace(closest_pair(points)).result == expected
+    # Same steps, bottom-up order; only the result step keeps its place
+    assert Counter(map(_key, steps)) == Counter(map(_key, expected_steps))
+    assert steps[-1] == expected_steps[-1]
+
+
+def test_deep_inputs_do_not_recurse():
+    points = [(0.0, float(i)) for i in range(200_000)]
+    assert closest_pair_iterative(points)[1] == 1.0
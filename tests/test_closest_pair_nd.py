@@ -0,0 +1,64 @@
+# tests/test_closest_pair_nd.py
+"""closest_pair_nd against brute force for every metric and several dimensions."""
+
+import math
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import METRICS, closest_pair_nd
+
+
+def _brute_force(pts, metric):
+    """(i, j, distance) of the lowest-index closest pair."""
+    diff = np.abs(pts[:, None, :] - pts[None, :, :])
+    if metric == "euclidean":
+        dist = np.sqrt((diff ** 2).sum(-1))
+    elif metric == "manhattan":
+        dist = diff.sum(-1)
+    else:
+        dist = diff.max(-1)
+    i, j = np.triu_indices(len(pts), 1)
+    k = np.lexsort((j, i, dist[i, j]))[0]
+    return int(i[k]), int(j[k]), float(dist[i[k], j[k]])
+
+
+def _inputs(rng, d):
+    yield rng.random((2, d))
+    yield rng.random((37, d))
+    yield rng.random((600, d))
+    # Small integer grid: many ties
+    yield rng.integers(0, 6, (400, d)).astype(float)
+    # Every point repeated
+    yield np.repeat(rng.random((150, d)), 2, axis=0)[rng.permutation(300)]
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("d", [1, 2, 3, 5, 8])
+def test_matches_brute_force(metric, d):
+    rng = np.random.default_rng(d)
+    for pts in _inputs(rng, d):
+        i, j, expected = _brute_force(pts, metric)
+        pair, dist = closest_pair_nd(pts, metric)
+        assert math.isclose(dist, expected, rel_tol=1e-12)
+        if expected == 0:
+            # Ties at zero go to the lowest index pair
+            assert pair == (tuple(pts[i]), tuple(pts[j]))
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_heavy_duplicates(metric):
+    # Ten distinct rows shared by 40k points used to list every zero-distance pair
+    rng = np.random.default_rng(0)
+    rows = rng.random((10, 3))
+    pts = rows[rng.integers(0, 10, 40_000)]
+    pair, dist = closest_pair_nd(pts, metric)
+    j = 1 + int(np.flatnonzero((pts[1:] == pts[0]).all(axis=1))[0])
+    assert dist == 0 and pair == (tuple(pts[0]), tuple(pts[j]))
+
+
+def test_fewer_than_two_points():
+    assert closest_pair_nd(np.empty((0, 3))) == (None, float('inf'))
+    assert closest_pair_nd([(1.0, 2.0, 3.0)]) == (None, float('inf'))
+    with pytest.raises(ValueError):
+        closest_pair_nd([(0.0, 0.0)], metric="cosine")
@@ -0,0 +1,83 @@
+# tests/test_closest_pair_parallel.py
+"""closest_pair_parallel's shared-memory slabs and boundary merge against brute force."""
+
+import math
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import closest_pair_fast, closest_pair_parallel
+
+
+def _brute_force(pts):
+    d = np.sqrt(((pts[:, None, :] - pts[None, :, :]) ** 2).sum(-1))
+    i, j = np.triu_indices(len(pts), 1)
+    return float(d[i, j].min())
+
+
+@pytest.fixture
+def segments(monkeypatch):
+    """Names of the shared-memory segments created by the parent process."""
+    names = []
+    original = shared_memory.SharedMemory
+
+    class Recording(original):
+        def __init__(self, name=None, create=False, size=0):
+            super().__init__(name, create, size)
+            if create:
+                names.append(self.name)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", Recording)
+    return names
+
+
+def _lattice_across_boundary():
+    """30 x 20 unit lattice; one point of column 9 moves next to column 10, across the first of 3 slabs."""
+    xs, ys = np.meshgrid(np.arange(30.0), np.arange(20.0), indexing="ij")
+    pts = np.column_stack([xs.ravel(), ys.ravel()])
+    pts[9 * 20 + 5, 0] = 9.7
+    return pts
+
+
+def _check(pts, slabs, segments):
+    pair, dist = closest_pair_parallel(pts, workers=2, slabs=slabs, min_points=0)
+    assert len(segments) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=segments.pop())
+    assert math.isclose(dist, _brute_force(pts), rel_tol=1e-12)
+    assert math.isclose(dist, closest_pair_fast(pts)[1], rel_tol=1e-12)
+    assert math.dist(*pair) == dist
+    rows = {tuple(p) for p in pts.tolist()}
+    assert pair[0] in rows and pair[1] in rows
+    return pair, dist
+
+
+@pytest.mark.parametrize("slabs", [3, 4, 7])
+def test_uniform(slabs, segments):
+    pts = np.random.default_rng(slabs).random((3000, 2))
+    _check(pts, slabs, segments)
+
+
+def test_closest_pair_crosses_slab_boundary(segments):
+    pair, dist = _check(_lattice_across_boundary(), 3, segments)
+    assert sorted(pair) == [(9.7, 5.0), (10.0, 5.0)]
+
+
+@pytest.mark.parametrize("slabs", [3, 5])
+def test_tied_lattice(slabs, segments):
+    xs, ys = np.meshgrid(np.arange(40.0), np.arange(25.0), indexing="ij")
+    pts = np.column_stack([xs.ravel(), ys.ravel()])
+    _, dist = _check(pts, slabs, segments)
+    assert dist == 1.0
+
+
+def test_segment_unlinked_when_a_worker_fails(segments):
+    class Broken:
+        def submit(self, *args):
+            raise RuntimeError("pool is gone")
+
+    with pytest.raises(RuntimeError):
+        closest_pair_parallel(np.random.default_rng(0).random((100, 2)), slabs=3, executor=Broken(), min_points=0)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=segments.pop())
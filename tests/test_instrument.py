@@ -0,0 +1,54 @@
+# tests/test_instrument.py
+"""Engines give the same answers with instrumentation on, and count what they do."""
+
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import CLOSEST_PAIR_METHODS, closest_pair_iterative, solve_closest_pair
+from algorithms.instrument import Instrumentation
+from algorithms.karatsuba import karatsuba
+from algorithms.multiply import MULTIPLY_METHODS, multiply
+
+
+@pytest.mark.parametrize("method", sorted(CLOSEST_PAIR_METHODS))
+def test_closest_pair_engines(method):
+    pts = np.random.default_rng(0).integers(0, 10**6, (20_000, 2)).astype(float)
+    stats = Instrumentation()
+    assert solve_closest_pair(pts, method, stats) == solve_closest_pair(pts, method)
+    assert stats.counters["points"] == len(pts)
+    assert stats.counters["comparisons"] > 0
+    assert stats.timers
+
+
+def test_reference_closest_pair_counters():
+    rng = random.Random(1)
+    pts = [(rng.random(), rng.random()) for _ in range(1000)]
+    stats = Instrumentation()
+    steps = []
+    assert closest_pair_iterative(pts, steps.append, stats) == closest_pair_iterative(pts)
+    compares = sum(step["type"] == "compare" for step in steps)
+    assert stats.counters["comparisons"] == compares
+    assert stats.counters["base_cases"] == sum(step["type"] == "bruteforce" for step in steps) // 2
+    assert stats.counters["calls"] == stats.counters["base_cases"] + sum(step["type"] == "split" for step in steps)
+    # 1000 points halve nine times before every part has at most 3
+    assert stats.maxima["depth"] == 9
+
+
+@pytest.mark.parametrize("method", sorted(MULTIPLY_METHODS))
+def test_multiply_engines(method):
+    rng = random.Random(2)
+    bits = 3_000 if method == "reference" else 200_000
+    x, y = rng.getrandbits(bits), -rng.getrandbits(bits)
+    stats = Instrumentation()
+    assert multiply(x, y, method, stats) == x * y
+    assert stats.counters["calls"] >= 1
+
+
+def test_reference_karatsuba_depth_and_digits():
+    stats = Instrumentation()
+    assert karatsuba(10**64 - 1, 10**64 - 3, stats=stats) == (10**64 - 1) * (10**64 - 3)
+    assert stats.maxima["digits"] == 64
+    assert stats.depth == 0 and stats.maxima["depth"] >= 6
+    assert set(stats.timers) == {"digit_count", "split", "recombine"}
@@ -0,0 +1,63 @@
+# tests/test_load_points.py
+"""load_points on .npy and text inputs."""
+
+import io
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import load_points
+
+
+def _npy(arr):
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    buf.seek(0)
+    return buf
+
+
+def test_npy_round_trip():
+    pts = np.random.default_rng(0).random((100, 2))
+    loaded, skipped = load_points(_npy(pts))
+    assert np.array_equal(loaded, pts) and skipped == 0
+
+
+@pytest.mark.parametrize("shape", [(10, 3), (10, 1), (20,)])
+def test_npy_must_be_n_by_2(shape):
+    with pytest.raises(ValueError):
+        load_points(_npy(np.zeros(shape)))
+
+
+def test_text_skips_lines_that_are_not_pairs():
+    loaded, skipped = load_points(io.BytesIO(b"1 2\n3 4 5\n6 7\n"))
+    assert loaded.tolist() == [[1.0, 2.0], [6.0, 7.0]] and skipped == 1
+
+
+def test_pipe_is_read_not_mapped():
+    rfd, wfd = os.pipe()
+    with os.fdopen(wfd, "wb") as w:
+        w.write(b"1 2\n3 4\n")
+    with os.fdopen(rfd, "rb") as r:
+        loaded, skipped = load_points(r)
+    assert loaded.tolist() == [[1.0, 2.0], [3.0, 4.0]] and skipped == 0
+
+
+def test_subprocess_stdin_pipe():
+    script = ("import sys; from algorithms.closest_pair import load_points; "
+              "print(len(load_points(sys.stdin.buffer)[0]))")
+    data = b"".join(b"%d %d\n" % (i, 2 * i) for i in range(50_000))
+    out = subprocess.run([sys.executable, "-c", script], input=data, capture_output=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert out.stdout.strip() == b"50000"
+
+
+def test_partly_consumed_file_starts_at_current_position(tmp_path):
+    path = tmp_path / "points.txt"
+    path.write_bytes(b"x y\n1 2\n3 4\n")
+    with open(path, "rb") as f:
+        f.readline()
+        loaded, skipped = load_points(f)
+    assert loaded.tolist() == [[1.0, 2.0], [3.0, 4.0]] and skipped == 0
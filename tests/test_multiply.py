@@ -0,0 +1,69 @@
+# tests/test_multiply.py
+"""FixedMultiplier and karatsuba_parallel against native multiplication."""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from algorithms.instrument import Instrumentation
+from algorithms.multiply import FIXED_FFT_MIN_BITS, FixedMultiplier, KaratsubaMemo, karatsuba_parallel
+
+
+@pytest.mark.parametrize("bits", [100, 10_000, FIXED_FFT_MIN_BITS, 200_000])
+def test_fixed_multiplier_matches_native(bits):
+    rng = random.Random(bits)
+    constant = rng.getrandbits(bits) | 1
+    fixed = FixedMultiplier(constant, memo=KaratsubaMemo())
+    operands = [0, 1, -3, rng.getrandbits(bits // 3), -rng.getrandbits(bits),
+                rng.getrandbits(bits) << 7, rng.getrandbits(5 * bits)]
+    for x in operands:
+        assert fixed(x) == x * constant
+        assert FixedMultiplier(-constant)(x) == -x * constant
+    assert fixed.stats()["calls"] == len(operands)
+
+
+def test_fixed_multiplier_reuses_spectrum():
+    rng = random.Random(0)
+    constant = rng.getrandbits(2 * FIXED_FFT_MIN_BITS)
+    fixed = FixedMultiplier(constant)
+    for _ in range(3):
+        x = rng.getrandbits(2 * FIXED_FFT_MIN_BITS)
+        assert fixed(x) == x * constant
+    assert fixed.stats()["spectra_reused"] >= 2
+
+
+class _CountingPool(ProcessPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with _CountingPool() as executor:
+        yield executor
+
+
+@pytest.mark.parametrize("x_bits, y_bits", [(20_000, 20_000), (20_000, 7_000), (9_000, 30_000)])
+@pytest.mark.parametrize("signs", [(1, 1), (-1, 1), (1, -1), (-1, -1)])
+def test_karatsuba_parallel_uses_the_pool(pool, x_bits, y_bits, signs):
+    rng = random.Random(x_bits ^ y_bits)
+    x = signs[0] * (rng.getrandbits(x_bits) | 1 << (x_bits - 1))
+    y = signs[1] * (rng.getrandbits(y_bits) | 1 << (y_bits - 1))
+    before = pool.submitted
+    stats = Instrumentation()
+    assert karatsuba_parallel(x, y, depth=2, min_bits=512, executor=pool, stats=stats) == x * y
+    assert pool.submitted - before == stats.counters["leaves"] > 1
+    if x_bits == y_bits:
+        assert stats.counters["leaves"] == 9
+
+
+def test_karatsuba_parallel_zero_and_small(pool):
+    big = random.Random(0).getrandbits(10_000)
+    for x, y in [(0, big), (-big, 0), (1, -big), (-7, -big)]:
+        assert karatsuba_parallel(x, y, depth=2, min_bits=512, executor=pool) == x * y
@@ -0,0 +1,80 @@
+# tests/test_neighbor_queries.py
+"""all_nearest_neighbors and k_closest_pairs against brute force, including repeated points."""
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import METRICS, all_nearest_neighbors, k_closest_pairs
+
+
+def _distance_matrix(pts, metric):
+    diff = np.abs(pts[:, None, :] - pts[None, :, :])
+    if metric == "euclidean":
+        return np.sqrt((diff ** 2).sum(-1))
+    if metric == "manhattan":
+        return diff.sum(-1)
+    return diff.max(-1)
+
+
+def _brute_k_closest(pts, k, metric):
+    dist = _distance_matrix(pts, metric)
+    i, j = np.triu_indices(len(pts), 1)
+    order = np.lexsort((j, i, dist[i, j]))[:k]
+    return [((tuple(pts[a]), tuple(pts[b])), dist[a, b]) for a, b in zip(i[order], j[order])]
+
+
+def _check(pts, metric, ks):
+    dist = _distance_matrix(pts, metric)
+    np.fill_diagonal(dist, np.inf)
+    neighbors, distances = all_nearest_neighbors(pts, metric)
+    # argmin picks the lowest index among tied neighbours
+    assert (neighbors == dist.argmin(axis=1)).all()
+    assert np.allclose(distances, dist.min(axis=1))
+    for k in ks:
+        got = k_closest_pairs(pts, k, metric)
+        expected = _brute_k_closest(pts, k, metric)
+        assert [pair for pair, _ in got] == [pair for pair, _ in expected]
+        assert np.allclose([d for _, d in got], [d for _, d in expected])
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("d", [1, 2, 3, 5])
+def test_random_points(metric, d):
+    rng = np.random.default_rng(d)
+    _check(rng.random((300, d)), metric, [1, 7, 150, 900])
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_lattice_of_repeated_points(metric):
+    # 3x3 lattice, 120 copies per site: 64k zero-distance pairs before any positive one
+    rng = np.random.default_rng(1)
+    sites = np.array([(x, y) for x in range(3) for y in range(3)], dtype=float)
+    pts = sites[rng.integers(0, len(sites), 1080)]
+    zero = int(sum(c * (c - 1) // 2 for c in np.unique(pts, axis=0, return_counts=True)[1]))
+    _check(pts, metric, [1, 500, zero, zero + 1, zero + 5000])
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_heavy_duplicates_scale(metric):
+    # Ten distinct values among 200k points used to make every query list all its copies
+    rng = np.random.default_rng(2)
+    values = rng.integers(0, 10, 200_000)
+    pts = np.stack([values, values * 2], axis=1).astype(float)
+    neighbors, distances = all_nearest_neighbors(pts, metric)
+    first = {}
+    for i, value in enumerate(values[:1000].tolist()):
+        first.setdefault(value, i)
+    assert (distances == 0).all()
+    for i, value in enumerate(values[:1000].tolist()):
+        if i == first[value]:
+            assert neighbors[i] == i + 1 + int(np.flatnonzero(values[i + 1:] == value)[0])
+        else:
+            assert neighbors[i] == first[value]
+    pairs = k_closest_pairs(pts, 100_000, metric)
+    assert len(pairs) == 100_000 and all(d == 0 for _, d in pairs)
+
+
+def test_fewer_than_two_points():
+    neighbors, distances = all_nearest_neighbors(np.empty((1, 2)))
+    assert neighbors.tolist() == [-1] and distances.tolist() == [np.inf]
+    assert k_closest_pairs([(0.0, 0.0)], 3) == []
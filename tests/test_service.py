@@ -0,0 +1,142 @@
+# tests/test_service.py
+"""The HTTP solve service in-process: routing, bad input, body limits, coalescing and caching."""
+
+import asyncio
+import json
+
+import pytest
+
+import algorithms.service as service_module
+from algorithms.closest_pair import parse_points_file_content, solve_closest_pair
+from algorithms.service import SolveService
+
+POINTS = "0 0\n5 5\n1 1\n9 0\n5 6.5\n"
+
+
+@pytest.fixture(scope="module")
+def service():
+    svc = SolveService(workers=1)
+    yield svc
+    svc.pool.shutdown()
+
+
+async def _request(port, method, target, body=b"", headers=None):
+    """One HTTP/1.1 request on a fresh connection; returns (status, headers, JSON body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = {"Content-Length": len(body), "Connection": "close", **(headers or {})}
+    writer.write(f"{method} {target} HTTP/1.1\r\n".encode()
+                 + "".join(f"{k}: {v}\r\n" for k, v in head.items()).encode() + b"\r\n" + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    payload = await reader.readexactly(int(response_headers["content-length"]))
+    writer.close()
+    await writer.wait_closed()
+    return status, response_headers, json.loads(payload)
+
+
+def _serve(service, scenario):
+    """Run scenario(port) against the service on an ephemeral port."""
+    async def main():
+        server = await asyncio.start_server(service.serve_connection, "127.0.0.1", 0)
+        async with server:
+            return await scenario(server.sockets[0].getsockname()[1])
+
+    return asyncio.run(main())
+
+
+def test_closest_pair_request(service):
+    status, headers, result = _serve(service, lambda port: _request(port, "POST", "/closest-pair",
+                                                                    POINTS.encode()))
+    assert status == 200 and headers["content-type"] == "application/json"
+    pair, dist = solve_closest_pair(parse_points_file_content(POINTS))
+    assert result == {"n": 5, "pair": [list(p) for p in pair], "distance": dist}
+
+
+def test_multiply_request_with_engine(service):
+    x, y = 3**500, -(7**400)
+    status, _, result = _serve(service, lambda port: _request(port, "POST", "/multiply?engine=karatsuba",
+                                                              f"{x}\n{y}\n".encode()))
+    assert status == 200 and result == {"product": str(x * y)}
+
+
+@pytest.mark.parametrize("target, body", [
+    ("/multiply", b"12\nnot a number\n"),
+    ("/multiply", b"1\n2\n3\n"),
+    ("/closest-pair", b"\xff\xfe 1 2\n"),
+    ("/closest-pair?engine=no-such-engine", POINTS.encode()),
+])
+def test_malformed_body_is_400(service, target, body):
+    status, _, result = _serve(service, lambda port: _request(port, "POST", target, body))
+    assert status == 400 and result["error"]
+
+
+def test_routing_errors(service):
+    async def scenario(port):
+        return [await _request(port, "POST", "/nope", b"1 2"),
+                await _request(port, "GET", "/closest-pair"),
+                await _request(port, "GET", "/stats")]
+
+    (missing, _, _), (wrong_method, _, _), (stats, _, counters) = _serve(service, scenario)
+    assert (missing, wrong_method, stats) == (404, 405, 200)
+    assert set(counters) == {"requests", "coalesced", "inflight", "cache"}
+
+
+def test_oversized_body_is_413_without_reading_it(service, monkeypatch):
+    monkeypatch.setattr(service_module, "MAX_BODY_BYTES", 64)
+    requests = service.requests
+
+    async def scenario(port):
+        # Only the headers are sent: the server must answer without waiting for the body
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /closest-pair HTTP/1.1\r\nContent-Length: 65\r\n\r\n")
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+        return response, await _request(port, "POST", "/closest-pair", b"0 0\n3 4\n" * 9)
+
+    response, (status, _, result) = _serve(service, scenario)
+    assert response.startswith(b"HTTP/1.1 413 ") and b"Connection: close" in response
+    assert status == 413 and "too large" in result["error"]
+    assert service.requests == requests
+
+
+def test_keep_alive_and_cache(service):
+    body = "".join(f"{i} {i * i % 97}\n" for i in range(300)).encode()
+
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for _ in range(3):
+            writer.write(b"POST /closest-pair HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+            assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            responses.append(await reader.readexactly(length))
+        writer.close()
+        return responses
+
+    hits = service.cache.stats()["hits"]
+    responses = _serve(service, scenario)
+    assert responses[0] == responses[1] == responses[2]
+    assert service.cache.stats()["hits"] == hits + 2
+
+
+def test_identical_requests_in_flight_are_coalesced(service):
+    body = b"".join(b"%d %d\n" % (i, (i * 7919) % 10007) for i in range(20000))
+
+    async def scenario():
+        before = service.coalesced
+        results = await asyncio.gather(*(service.handle("POST", "/closest-pair?engine=fast", body)
+                                         for _ in range(4)))
+        return results, service.coalesced - before
+
+    results, coalesced = asyncio.run(scenario())
+    assert coalesced == 3 and all(r == results[0] for r in results)
+    assert results[0][0] == 200 and not service.inflight
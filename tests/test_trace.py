@@ -0,0 +1,168 @@
+# tests/test_trace.py
+"""Compact traces decode to exactly the step streams of the generators they record."""
+
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.closest_pair import closest_pair, closest_pair_iterative, record_closest_pair
+from algorithms.instrument import Instrumentation
+from algorithms.karatsuba import karatsuba_steps, record_karatsuba
+from algorithms.trace import NO_INDEX, ClosestPairTrace, record_trace
+
+
+def _plain(value):
+    """Point arrays and point lists as lists of tuples, so decoded and generated steps compare equal."""
+    if isinstance(value, np.ndarray):
+        return [tuple(p) for p in value.tolist()]
+    if isinstance(value, list):
+        return [tuple(p) for p in value]
+    return value
+
+
+def _steps(events):
+    return [{k: _plain(v) for k, v in step.items()} for step in events]
+
+
+def _points(seed, n, lattice=False):
+    rng = random.Random(seed)
+    if lattice:
+        return [(float(rng.randrange(6)), float(rng.randrange(6))) for _ in range(n)]
+    return [(rng.random(), rng.random()) for _ in range(n)]
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 4, 7, 50, 300])
+@pytest.mark.parametrize("lattice", [False, True])
+def test_closest_pair_trace_decodes_to_generator_steps(n, lattice):
+    pts = _points(n, n, lattice)
+    expected = record_trace(closest_pair(list(pts), visualize=True))
+    trace = record_closest_pair(pts)
+    assert len(trace) == len(expected)
+    assert _steps(trace) == _steps(expected)
+    assert trace.result == expected.result
+
+
+def test_closest_pair_columns_round_trip():
+    # Rows written through add/add_strip decode back to the same values
+    points = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 2.0), (3.0, 1.0)])
+    trace = ClosestPairTrace(points)
+    T = ClosestPairTrace
+    trace.add(T.SPLIT, 0, 4, x=1.0)
+    trace.add(T.BRUTEFORCE, 0, 2, value=1.0)
+    trace.add(T.COMPARE, p=0, q=1, value=1.0)
+    offset = trace.add_strip([1, 3, 2])
+    trace.add(T.STRIP, offset, 3, x=1.0, value=1.0)
+    trace.add(T.STRIP, offset, 3, 1, 2, x=1.0, value=2.0)
+    trace.add(T.RESULT, p=0, q=1, value=1.0)
+    assert _steps(trace) == [
+        {"type": "split", "x": 1.0, "left": [(0.0, 0.0), (1.0, 0.0)], "right": [(1.0, 2.0), (3.0, 1.0)]},
+        {"type": "bruteforce", "points": [(0.0, 0.0), (1.0, 0.0)], "best": 1.0},
+        {"type": "compare", "pair": ((0.0, 0.0), (1.0, 0.0)), "dist": 1.0},
+        {"type": "strip", "pair": None, "x": 1.0, "strip": [(1.0, 0.0), (3.0, 1.0), (1.0, 2.0)], "best": 1.0},
+        {"type": "strip", "pair": ((1.0, 0.0), (1.0, 2.0)), "x": 1.0,
+         "strip": [(1.0, 0.0), (3.0, 1.0), (1.0, 2.0)], "best": 2.0},
+        {"type": "result", "pair": ((0.0, 0.0), (1.0, 0.0)), "best": 1.0},
+    ]
+    assert list(trace.p) == [NO_INDEX, NO_INDEX, 0, NO_INDEX, 1, 0]
+    # Six fixed-width rows of 33 bytes, three pooled strip indices and the shared points
+    assert trace.nbytes() == 6 * 33 + 3 * 4 + points.nbytes
+
+
+@pytest.mark.parametrize("x, y", [(0, 7), (5, 9), (1234, 5678), (10**40 + 17, 3**70), (99, 10**12 + 1)])
+def test_karatsuba_trace_decodes_to_generator_steps(x, y):
+    expected = record_trace(karatsuba_steps(x, y))
+    trace = record_karatsuba(x, y)
+    decoded = [{k: v for k, v in step.items() if k not in ("node", "depth")} for step in trace]
+    assert decoded == expected.events
+    assert trace.result == expected.result == x * y
+    # Node metadata is consistent with the recursion tree
+    assert all(trace.depth[trace.parent[v]] + 1 == trace.depth[v] for v in range(1, len(trace.node_x)))
+
+
+def _totals(steps):
+    """Comparisons, strip points and subproblems of a decoded closest pair trace, summaries included."""
+    compares = sum(s["type"] == "compare" for s in steps)
+    calls = sum(s["type"] == "split" for s in steps) + sum(s["type"] == "bruteforce" for s in steps) // 2
+    strip_points = sum(len(s["strip"]) for s in steps if s["type"] == "strip" and s["pair"] is None)
+    for s in steps:
+        if s["type"] == "summary":
+            compares += s["comparisons"]
+            calls += s["subproblems"]
+            strip_points += s["strip_points"]
+    return compares, calls, strip_points
+
+
+@pytest.mark.parametrize("options", [{"max_depth": 0}, {"max_depth": 2}, {"max_depth": 5},
+                                     {"min_size": 40}, {"max_depth": 3, "min_size": 100}])
+def test_summaries_account_for_the_skipped_work(options):
+    # Points with distinct x, so every strip of two or more points is shown
+    rng = random.Random(1)
+    pts = [(i + rng.random() * 0.5, rng.random() * 50) for i in range(500)]
+    full = _steps(record_closest_pair(pts))
+    trace = record_closest_pair(pts, **options)
+    steps = _steps(trace)
+    summaries = [s for s in steps if s["type"] == "summary"]
+    assert summaries and len(steps) < len(full)
+    assert trace.result == record_closest_pair(pts).result
+    assert steps[-1] == full[-1]
+    assert _totals(steps)[:2] == _totals(full)[:2]
+    # Strips of fewer than two points are not shown, so each split shown may hide one point
+    stats = Instrumentation()
+    closest_pair_iterative(pts, stats=stats)
+    strip_points = _totals(steps)[2]
+    shown_splits = sum(s["type"] == "split" for s in steps)
+    assert stats.counters["strip_points"] - shown_splits <= strip_points <= stats.counters["strip_points"]
+    # Every branch reaches a summarized subproblem, and those partition the points
+    assert sum(len(s["points"]) for s in summaries) == len(pts)
+    for s in summaries:
+        assert s["subproblems"] >= 1 and s["comparisons"] >= 1
+        if "max_depth" in options and "min_size" not in options:
+            assert s["depth"] == options["max_depth"] + 1
+
+
+def test_summary_best_pair_matches_its_subproblem():
+    pts = _points(3, 200)
+    trace = record_closest_pair(pts, max_depth=1)
+    for step in _steps(trace):
+        if step["type"] == "summary":
+            sub = record_closest_pair(step["points"]).result
+            assert step["best"] == sub[1]
+            assert sorted(step["pair"]) == sorted(sub[0])
+
+
+@pytest.mark.parametrize("options", [{}, {"max_depth": 1}, {"min_size": 64}])
+def test_closest_pair_progress_is_monotonic_and_ends_at_one(options):
+    pts = _points(4, 400)
+    seen = []
+    trace = record_closest_pair(pts, progress=seen.append, **options)
+    assert seen == sorted(seen) and seen[-1] == 1.0
+    assert 0 < seen[0] < 1
+    # Called once per base case, summarized or not
+    assert len(seen) == sum(s["type"] == "bruteforce" for s in record_closest_pair(pts)) // 2
+    assert trace.result == record_closest_pair(pts).result
+
+
+def test_closest_pair_progress_can_abort():
+    class Stop(Exception):
+        pass
+
+    def progress(fraction):
+        if fraction > 0.5:
+            raise Stop
+
+    with pytest.raises(Stop):
+        record_closest_pair(_points(5, 300), progress=progress)
+
+
+def test_karatsuba_progress_and_level_stats():
+    x, y = 3**400, 7**300
+    seen = []
+    trace = record_karatsuba(x, y, progress=seen.append)
+    assert all(a < b for a, b in zip(seen, seen[1:]))
+    assert seen[-1] == pytest.approx(1.0)
+    levels = trace.level_stats()
+    assert [row["depth"] for row in levels] == list(range(len(levels)))
+    assert sum(row["subproblems"] for row in levels) == len(trace.node_x)
+    assert sum(row["base_cases"] for row in levels) == sum(s["type"] == "base" for s in trace)
+    assert levels[0] == {"depth": 0, "subproblems": 1, "base_cases": 0, "max_digits": len(str(max(x, y)))}
@@ -0,0 +1,242 @@
+# visualization.py
+"""Persistent matplotlib renderer for the closest pair animation.
+
+The figure, axes styling and the scatter of the input points are drawn once
+and cached as a background bitmap; each step only redraws a handful of
+animated artists (highlighted pair, split line, strip band, brute-force block,
+title) on top of it and encodes the canvas buffer as PNG. Large clouds are
+decimated for display only; the algorithm always runs on every point.
+"""
+
+import io
+import math
+import threading
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from PIL import Image
+
+BACKGROUND = "#F5E6D3"
+INK = "#6B4C3B"
+POINT_FILL = "#CBB28A"
+POINT_EDGE = "#8C6A4A"
+HIGHLIGHT = "#FFD580"
+HIGHLIGHT_EDGE = "#D4A373"
+
+# Most points drawn for the whole cloud and for a highlighted block
+DISPLAY_MAX_POINTS = 5000
+BLOCK_MAX_POINTS = 1500
+# Most k-closest-pair segments drawn
+PAIRS_MAX_DRAWN = 1000
+
+
+def decimate_indices(points, max_points):
+    """Indices of at most ~max_points points, one per cell of a uniform grid."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(pts) <= max_points:
+        return np.arange(len(pts))
+    side = max(1, int(math.sqrt(max_points)))
+    lo = pts.min(axis=0)
+    span = np.ptp(pts, axis=0)
+    span[span == 0] = 1.0
+    cells = np.minimum(((pts - lo) / span * side).astype(np.int64), side - 1)
+    _, keep = np.unique(cells[:, 0] * side + cells[:, 1], return_index=True)
+    return np.sort(keep)
+
+
+def decimate_points(points, max_points):
+    """Keep at most ~max_points points, one per cell of a uniform grid.
+
+    Unlike taking a prefix this preserves the shape, extent and outliers of
+    the cloud.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return pts[decimate_indices(pts, max_points)]
+
+
+def _marker_size(n):
+    """Shrink markers as the cloud grows so dense inputs stay readable."""
+    return 30 if n <= 500 else max(2.0, 30 * math.sqrt(500 / n))
+
+
+class ClosestPairRenderer:
+    """Renders closest pair step events for one fixed point set."""
+
+    def __init__(self, points, figsize=(6, 6), dpi=100, max_points=DISPLAY_MAX_POINTS):
+        pts = decimate_points(points, max_points)
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.lock = threading.Lock()
+
+        ax = self.ax = _styled_axes(self.fig)
+        size = _marker_size(len(pts))
+        ax.scatter(pts[:, 0], pts[:, 1], s=size, c=POINT_FILL, edgecolors=POINT_EDGE, linewidths=0.6)
+        # Freeze the limits so the cached background stays valid
+        ax.set_xlim(ax.get_xlim())
+        ax.set_ylim(ax.get_ylim())
+
+        self.band = Rectangle((0, 0), 0, 1, transform=ax.get_xaxis_transform(),
+                              color=HIGHLIGHT, alpha=0.25, animated=True)
+        ax.add_patch(self.band)
+        self.split = ax.axvline(0, color=INK, linestyle='--', linewidth=1, animated=True)
+        self.block = ax.scatter([], [], s=max(size, 12), c=POINT_EDGE, animated=True)
+        self.pair_line, = ax.plot([], [], color=HIGHLIGHT, linewidth=1.5, animated=True)
+        self.pair_points = ax.scatter([], [], s=80, c=HIGHLIGHT, edgecolors=HIGHLIGHT_EDGE,
+                                      linewidths=1.2, animated=True)
+        self.title = ax.set_title(" ", color=INK, fontfamily="Poppins", fontweight=500)
+        self.title.set_animated(True)
+        self.artists = (self.band, self.split, self.block, self.pair_line, self.pair_points, self.title)
+
+        self.fig.tight_layout()
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _show_pair(self, pair):
+        if pair is None:
+            self.pair_line.set_visible(False)
+            self.pair_points.set_visible(False)
+            return
+        (x1, y1), (x2, y2) = pair
+        self.pair_line.set_data([x1, x2], [y1, y2])
+        self.pair_points.set_offsets([[x1, y1], [x2, y2]])
+        self.pair_line.set_visible(True)
+        self.pair_points.set_visible(True)
+
+    def _show_split(self, x, half_width=None):
+        self.split.set_visible(x is not None)
+        self.band.set_visible(x is not None and half_width is not None and math.isfinite(half_width))
+        if x is None:
+            return
+        self.split.set_xdata([x, x])
+        if self.band.get_visible():
+            self.band.set_x(x - half_width)
+            self.band.set_width(2 * half_width)
+
+    def _update(self, step):
+        kind = step['type']
+        self.block.set_visible(kind in ('bruteforce', 'summary'))
+        if kind == 'split':
+            self._show_pair(None)
+            self._show_split(step['x'])
+            self.title.set_text(f"Splitting at x={step['x']:.2f}")
+        elif kind == 'bruteforce':
+            self.block.set_offsets(np.asarray(step['points'], dtype=np.float64).reshape(-1, 2))
+            self._show_pair(None)
+            self._show_split(None)
+            self.title.set_text("Brute force block (small set)")
+        elif kind == 'summary':
+            self.block.set_offsets(decimate_points(step['points'], BLOCK_MAX_POINTS))
+            self._show_pair(step['pair'])
+            self._show_split(None)
+            self.title.set_text(f"{len(step['points'])} points solved, best = {step['best']:.4f}")
+        elif kind == 'compare':
+            self._show_pair(step['pair'])
+            self._show_split(None)
+            self.title.set_text(f"Comparing pair dist={step['dist']:.4f}")
+        elif kind == 'strip':
+            self._show_pair(step['pair'])
+            self._show_split(step['x'], step['best'])
+            self.title.set_text(f"Strip check, best = {step['best']:.4f}")
+        else:
+            self._show_pair(step['pair'])
+            self._show_split(None)
+            self.title.set_text(f"Final: d={step['best']:.4f}")
+
+    def render_rgba(self, step):
+        """Draw one step over the cached background; returns an (H, W, 4) uint8 array."""
+        with self.lock:
+            self._update(step)
+            self.canvas.restore_region(self.background)
+            for artist in self.artists:
+                if artist.get_visible():
+                    self.ax.draw_artist(artist)
+            return np.array(self.canvas.buffer_rgba())
+
+    def render_png(self, step):
+        """Draw one step and encode it as PNG bytes."""
+        buf = io.BytesIO()
+        Image.fromarray(self.render_rgba(step)).save(buf, format="png", compress_level=1)
+        return buf.getvalue()
+
+
+def _styled_axes(fig):
+    ax = fig.add_subplot()
+    ax.set_facecolor(BACKGROUND)
+    ax.tick_params(colors=INK)
+    ax.spines['bottom'].set_color(INK)
+    ax.spines['left'].set_color(INK)
+    ax.spines['top'].set_color(BACKGROUND)
+    ax.spines['right'].set_color(BACKGROUND)
+    return ax
+
+
+def render_neighbors_png(points, neighbors, pairs, figsize=(6, 6), dpi=100, max_points=DISPLAY_MAX_POINTS):
+    """Static plot of nearest-neighbour links and highlighted closest pairs as PNG bytes.
+
+    ``neighbors`` is the index array from ``all_nearest_neighbors``; links are
+    drawn for the displayed (decimated) points only. ``pairs`` is the
+    ``k_closest_pairs`` result, of which the first ``PAIRS_MAX_DRAWN`` are drawn.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    shown = decimate_indices(pts, max_points)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = _styled_axes(fig)
+
+    links = np.stack([pts[shown], pts[neighbors[shown]]], axis=1)
+    ax.add_collection(LineCollection(links, colors=POINT_EDGE, linewidths=0.6, alpha=0.6))
+    size = _marker_size(len(shown))
+    ax.scatter(pts[shown, 0], pts[shown, 1], s=size, c=POINT_FILL, edgecolors=POINT_EDGE, linewidths=0.6)
+    if pairs:
+        segments = np.array([pair for pair, _ in pairs[:PAIRS_MAX_DRAWN]], dtype=np.float64)
+        ax.add_collection(LineCollection(segments, colors=HIGHLIGHT, linewidths=2.0))
+        ends = segments.reshape(-1, 2)
+        ax.scatter(ends[:, 0], ends[:, 1], s=max(size, 20), c=HIGHLIGHT, edgecolors=HIGHLIGHT_EDGE, linewidths=1.0)
+    ax.set_title(f"Nearest neighbours and {len(pairs)} closest pairs", color=INK,
+                 fontfamily="Poppins", fontweight=500)
+    fig.tight_layout()
+    canvas.draw()
+    buf = io.BytesIO()
+    Image.fromarray(np.array(canvas.buffer_rgba())).save(buf, format="png", compress_level=1)
+    return buf.getvalue()
+
+
+def render_vectors_png(points, pair, title, figsize=(6, 6), dpi=100, max_points=DISPLAY_MAX_POINTS):
+    """Static scatter of an (N, d) array with ``pair`` highlighted, as PNG bytes.
+
+    Three or more dimensions are drawn as a 3D scatter of the first three
+    coordinates; large inputs are thinned to an even subsample for display.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    if pts.shape[1] == 1:
+        pts = np.column_stack([pts[:, 0], np.zeros(len(pts))])
+    if len(pts) > max_points:
+        pts = pts[np.linspace(0, len(pts) - 1, max_points).astype(np.int64)]
+    three_d = pts.shape[1] >= 3
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    if three_d:
+        ax = fig.add_subplot(projection="3d")
+        ax.set_facecolor(BACKGROUND)
+        ax.tick_params(colors=INK)
+    else:
+        ax = _styled_axes(fig)
+    axes = slice(0, 3 if three_d else 2)
+    coords = pts[:, axes].T
+    ax.scatter(*coords, s=_marker_size(len(pts)), c=POINT_FILL, edgecolors=POINT_EDGE, linewidths=0.6)
+    if pair is not None:
+        ends = np.array(pair, dtype=np.float64).reshape(2, -1)
+        if ends.shape[1] == 1:
+            ends = np.column_stack([ends[:, 0], np.zeros(2)])
+        ends = ends[:, axes].T
+        ax.plot(*ends, color=HIGHLIGHT, linewidth=2.0)
+        ax.scatter(*ends, s=80, c=HIGHLIGHT, edgecolors=HIGHLIGHT_EDGE, linewidths=1.2)
+    ax.set_title(title, color=INK, fontfamily="Poppins", fontweight=500)
+    fig.tight_layout()
+    canvas.draw()
+    buf = io.BytesIO()
+    Image.fromarray(np.array(canvas.buffer_rgba())).save(buf, format="png", compress_level=1)
+    return buf.getvalue()